@@ -1,8 +1,9 @@
 """Main Flask application for Coaching Portal."""
 
+import hashlib
 import logging
 import os
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session
+from flask import Flask, render_template, request, jsonify, redirect, url_for, session, g
 from flask_cors import CORS
 from functools import wraps
 
@@ -55,12 +56,12 @@ def create_app():
     client_service = None
     
     try:
-        from services.google_sheets_service import GoogleSheetsService
+        from services.storage_backend import create_storage_backend
         from services.email_service import EmailService
         from services.ai_service import AIService
         from services.client_service import ClientService
         
-        sheets_service = GoogleSheetsService()
+        sheets_service = create_storage_backend()
         email_service = EmailService()
         ai_service = AIService()
         client_service = ClientService(sheets_service, email_service, ai_service)
@@ -68,6 +69,51 @@ def create_app():
     except Exception as e:
         logger.warning(f"Services not available: {e}")
     
+    from services.client_service import SubmissionNotSaved
+    from services.idempotency import IdempotencyConflict, IdempotencyStore
+    idempotency_store = IdempotencyStore(
+        max_entries=app.config.get("IDEMPOTENCY_MAX_KEYS", 1000),
+        ttl=app.config.get("IDEMPOTENCY_TTL_SECONDS", 86400)
+    )
+    
+    def idempotent(f):
+        """Replay the stored response for a repeated Idempotency-Key instead of running again."""
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = request.headers.get("Idempotency-Key", "").strip()
+            if not key:
+                return f(*args, **kwargs)
+            if len(key) > 255:
+                return jsonify({"error": "Idempotency-Key is too long"}), 400
+            
+            def handle():
+                response = app.make_response(f(*args, **kwargs))
+                return response.get_data(), response.status_code, response.mimetype
+            
+            try:
+                (data, status, mimetype), replayed = idempotency_store.run(
+                    (request.path, key),
+                    hashlib.sha256(request.get_data()).hexdigest(),
+                    handle,
+                    # Once anything may have been written the response is kept, whatever
+                    # its status, so a retry cannot write the submission twice
+                    keep=lambda result: not g.get("submission_not_saved", False)
+                )
+            except IdempotencyConflict:
+                return jsonify({"error": "Idempotency-Key was already used for a different submission"}), 422
+            
+            response = app.response_class(data, status=status, mimetype=mimetype)
+            if replayed:
+                logger.info(f"Replayed response for Idempotency-Key {key} on {request.path}")
+                response.headers["Idempotent-Replayed"] = "true"
+            return response
+        return decorated_function
+    
+    def not_saved(error, status):
+        """Error response for a submission that wrote nothing (its Idempotency-Key may be retried)."""
+        g.submission_not_saved = True
+        return jsonify({"error": str(error)}), status
+    
     # ===== ROUTES =====
     
     @app.route("/", methods=["GET"])
@@ -124,7 +170,8 @@ def create_app():
     def success_page():
         """Display success page after form submission."""
         form_type = request.args.get('type', 'default')
-        return render_template("success.html", form_type=form_type)
+        email_job = request.args.get('email_job', '')
+        return render_template("success.html", form_type=form_type, email_job=email_job)
     
     @app.route("/api/clients", methods=["GET"])
     @login_required
@@ -133,14 +180,22 @@ def create_app():
         if not sheets_service:
             return jsonify({"error": "Service not available"}), 503
         try:
-            clients = sheets_service.get_all_clients()
+            # ?fields=name,email,... reads only the columns the caller needs
+            fields = request.args.get("fields")
+            if fields:
+                clients = sheets_service.get_client_columns([f.strip() for f in fields.split(",") if f.strip()])
+            else:
+                clients = sheets_service.get_all_clients()
             return jsonify({"status": "success", "clients": clients}), 200
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
         except Exception as e:
             logger.error(f"Error: {e}")
             return jsonify({"error": str(e)}), 500
     
     @app.route("/api/clients/new", methods=["POST"])
     @login_required
+    @idempotent
     def submit_new_client():
         """Process new client registration."""
         try:
@@ -148,21 +203,25 @@ def create_app():
             
             data = request.get_json()
             if not data:
-                return jsonify({"error": "No data provided"}), 400
+                return not_saved("No data provided", 400)
             
             form_data = NewClientFormData(**data)
             
             if not client_service:
-                return jsonify({"error": "Service not available"}), 503
+                return not_saved("Service not available", 503)
             
             result = client_service.process_new_client_registration(form_data)
             return jsonify(result), 201
+        except (ValueError, SubmissionNotSaved) as e:
+            logger.error(f"Error: {e}")
+            return not_saved(e, 500)
         except Exception as e:
             logger.error(f"Error: {e}")
             return jsonify({"error": str(e)}), 500
     
     @app.route("/api/clients/existing-session", methods=["POST"])
     @login_required
+    @idempotent
     def submit_existing_client_session():
         """Process existing client session."""
         try:
@@ -170,15 +229,18 @@ def create_app():
             
             data = request.get_json()
             if not data:
-                return jsonify({"error": "No data provided"}), 400
+                return not_saved("No data provided", 400)
             
             form_data = ExistingClientFormData(**data)
             
             if not client_service:
-                return jsonify({"error": "Service not available"}), 503
+                return not_saved("Service not available", 503)
             
             result = client_service.process_existing_client_session(form_data)
             return jsonify(result), 201
+        except (ValueError, SubmissionNotSaved) as e:
+            logger.error(f"Error: {e}")
+            return not_saved(e, 500)
         except Exception as e:
             logger.error(f"Error: {e}")
             return jsonify({"error": str(e)}), 500
@@ -190,31 +252,42 @@ def create_app():
         if not client_service or not sheets_service:
             return jsonify({"error": "Service not available"}), 503
         try:
-            client = sheets_service.get_client_by_name(client_name)
-            if not client:
+            balance = sheets_service.get_client_balance(client_name)
+            if not balance:
                 return jsonify({"error": "Client not found"}), 404
             
-            sessions = sheets_service.get_client_history(client_name)
-            total_collected = sum(float(s.get('amount_collected', 0)) for s in sessions)
-            total_package = float(client.get('amount_paid', 0))
-            payment_method = client.get('payment_method', 'upfront_deposit')
-            
-            # Calculate remaining balance based on payment method
-            if payment_method == 'pay_per_session':
-                remaining = 0  # Pay-per-session shows no negative balance
-            else:
-                remaining = total_package - total_collected
-            
             return jsonify({
                 "status": "success",
-                "total_package": total_package,
-                "total_collected": total_collected,
-                "remaining_balance": remaining
+                "total_package": balance["total_package"],
+                "total_collected": balance["total_collected"],
+                "remaining_balance": balance["remaining_balance"]
             }), 200
         except Exception as e:
             logger.error(f"Error getting client balance: {e}")
             return jsonify({"error": str(e)}), 500
     
+    @app.route("/api/email-jobs/<string:job_id>", methods=["GET"])
+    @login_required
+    def get_email_job(job_id):
+        """Get the delivery status of a background email."""
+        if not client_service:
+            return jsonify({"error": "Service not available"}), 503
+        
+        job = client_service.email_pipeline.get(job_id)
+        if not job:
+            return jsonify({"error": "Email job not found"}), 404
+        return jsonify({"status": "success", "job": job}), 200
+    
+    @app.route("/api/sheets/quota", methods=["GET"])
+    @login_required
+    def get_sheets_quota():
+        """Get Sheets API scheduler queue depth, wait times and retries."""
+        scheduler = getattr(sheets_service, "scheduler", None)
+        if not scheduler:
+            return jsonify({"error": "Sheets API scheduler not in use"}), 503
+        
+        return jsonify({"status": "success", **scheduler.stats()}), 200
+    
     @app.errorhandler(404)
     def not_found(error):
         return jsonify({"error": "Not found"}), 404
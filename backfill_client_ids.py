@@ -5,6 +5,7 @@ import sys
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from config import Config
+from services.quota_scheduler import get_scheduler
 
 # Initialize service
 creds = service_account.Credentials.from_service_account_file(
@@ -12,12 +13,13 @@ creds = service_account.Credentials.from_service_account_file(
     scopes=['https://www.googleapis.com/auth/spreadsheets']
 )
 service = build('sheets', 'v4', credentials=creds)
+scheduler = get_scheduler()
 
 # Read all client data
-result = service.spreadsheets().values().get(
+result = scheduler.execute(service.spreadsheets().values().get(
     spreadsheetId=Config.GOOGLE_CLIENTS_SHEET_ID,
     range='A:K'
-).execute()
+))
 values = result.get('values', [])
 
 # Generate Client IDs for rows without them
@@ -34,10 +36,10 @@ for idx, row in enumerate(values[1:], start=2):  # Skip header
 # Batch update all Client IDs
 if updates:
     batch_body = {'data': updates, 'valueInputOption': 'USER_ENTERED'}
-    service.spreadsheets().values().batchUpdate(
+    scheduler.execute(service.spreadsheets().values().batchUpdate(
         spreadsheetId=Config.GOOGLE_CLIENTS_SHEET_ID,
         body=batch_body
-    ).execute()
+    ), write=True)
     print()
     print('Successfully updated {} clients with Client IDs'.format(len(updates)))
 else:
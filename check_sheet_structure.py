@@ -15,10 +15,10 @@ try:
     sheets = GoogleSheetsService()
 
     # Get rows from sheet
-    result = sheets.service.spreadsheets().values().get(
+    result = sheets.execute(sheets.service.spreadsheets().values().get(
         spreadsheetId=sheets.clients_sheet_id,
         range='1:6'
-    ).execute()
+    ))
 
     values = result.get('values', [])
     for i, row in enumerate(values):
@@ -20,7 +20,7 @@ for i, client in enumerate(clients, 1):
     
     # Mark test entries for deletion
     if name in ["Michael Oh", "TestClient"]:
-        rows_to_delete.append(i + 1)  # +2 because row 1 is header, enumerate starts at 1
+        rows_to_delete.append(client['row_number'])  # Real sheet row (skipped rows included)
         print(f"   ^ MARKED FOR DELETION (test entry)")
 
 print("="*60)
@@ -1,6 +1,7 @@
 """Configuration management for Coaching Portal application."""
 
 import os
+import tempfile
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -25,16 +26,93 @@ class Config:
     OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
     ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
     
+    # Sheets API client: "discovery" (googleapiclient) or "rest" (pooled keep-alive
+    # HTTP session, see sheets_rest_client); SHEETS_HTTP_POOL_SIZE caps open connections
+    SHEETS_CLIENT = os.getenv("SHEETS_CLIENT", "discovery").lower()
+    SHEETS_HTTP_POOL_SIZE = int(os.getenv("SHEETS_HTTP_POOL_SIZE", "10"))
+    
     # Deployment configuration
     DEPLOYMENT_URL = os.getenv("DEPLOYMENT_URL", "http://localhost:5000")
     
+    # Offline mode: answer Sheets API calls from an in-process fake holding synthetic
+    # data, with optional latency/jitter and 429 quota errors (see fake_sheets_service)
+    FAKE_SHEETS = os.getenv("FAKE_SHEETS", "False").lower() == "true"
+    FAKE_SHEETS_LATENCY_MS = int(os.getenv("FAKE_SHEETS_LATENCY_MS", "0"))
+    FAKE_SHEETS_JITTER_MS = int(os.getenv("FAKE_SHEETS_JITTER_MS", "0"))
+    FAKE_SHEETS_QUOTA_ERROR_RATE = float(os.getenv("FAKE_SHEETS_QUOTA_ERROR_RATE", "0"))
+    FAKE_SHEETS_REQUESTS_PER_MINUTE = int(os.getenv("FAKE_SHEETS_REQUESTS_PER_MINUTE", "0"))
+    FAKE_SHEETS_CLIENTS = int(os.getenv("FAKE_SHEETS_CLIENTS", "50"))
+    FAKE_SHEETS_SESSIONS = int(os.getenv("FAKE_SHEETS_SESSIONS", "500"))
+    FAKE_SHEETS_SEED = int(os.getenv("FAKE_SHEETS_SEED", "0"))
+    
+    # Storage backend: "sheets" (Google Sheets) or "local" (SQLite file, no Google calls)
+    STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "sheets")
+    LOCAL_STORAGE_PATH = os.getenv("LOCAL_STORAGE_PATH", str(Path(__file__).parent / "data" / "coaching_portal.db"))
+    
     # Cache configuration
     CLIENT_CACHE_TTL = 30  # 30 seconds (reduced for frequent updates)
+    # Stale-while-revalidate: past the TTL, serve the cached client list for up to
+    # this many seconds while a background thread refreshes it (0 disables)
+    CLIENT_CACHE_STALE_TTL = int(os.getenv("CLIENT_CACHE_STALE_TTL", "300"))
+    SESSION_CACHE_TTL = 30  # 30 seconds, Sessions sheet is re-read at most this often
+    # Parsed clients/sessions are snapshotted here so a cold start can answer from
+    # disk while it revalidates against the sheet ("" disables snapshots)
+    CACHE_SNAPSHOT_DIR = os.getenv("CACHE_SNAPSHOT_DIR", "")
+    # Snapshots older than this many seconds are never loaded or served
+    CACHE_SNAPSHOT_MAX_AGE = int(os.getenv("CACHE_SNAPSHOT_MAX_AGE", "900"))
+    # Replica mode: mirror both sheets into this SQLite file and serve reads from
+    # it; the Sheets API is then only used for writes and the sync loop ("" disables)
+    SHEETS_REPLICA_PATH = os.getenv("SHEETS_REPLICA_PATH", "")
+    SHEETS_REPLICA_SYNC_INTERVAL = int(os.getenv("SHEETS_REPLICA_SYNC_INTERVAL", "30"))
+    
+    # Sheets API quota scheduling: requests queue for per-minute read/write tokens
+    # (0 = unlimited) and throttled/unavailable responses are retried with backoff
+    SHEETS_READS_PER_MINUTE = int(os.getenv("SHEETS_READS_PER_MINUTE", "60"))
+    SHEETS_WRITES_PER_MINUTE = int(os.getenv("SHEETS_WRITES_PER_MINUTE", "60"))
+    SHEETS_MAX_RETRIES = int(os.getenv("SHEETS_MAX_RETRIES", "5"))
+    
+    # Change detection before refetching a sheet: "drive" (Drive file version),
+    # "counter" (a cell at SHEETS_CHANGE_COUNTER_RANGE in each spreadsheet that the
+    # portal rewrites on every write) or "" to always refetch. Data is refetched
+    # regardless once it is older than SHEETS_CHANGE_MAX_SKIP_AGE seconds
+    SHEETS_CHANGE_DETECTION = os.getenv("SHEETS_CHANGE_DETECTION", "").lower()
+    SHEETS_CHANGE_COUNTER_RANGE = os.getenv("SHEETS_CHANGE_COUNTER_RANGE", "Meta!A1")
+    SHEETS_CHANGE_MAX_SKIP_AGE = int(os.getenv("SHEETS_CHANGE_MAX_SKIP_AGE", "600"))
+    
+    # Write-behind appends: rows submitted within this window (or until the batch
+    # reaches the max size) go to the sheet in one multi-row append (0 disables waiting)
+    APPEND_BATCH_WINDOW_MS = int(os.getenv("APPEND_BATCH_WINDOW_MS", "50"))
+    APPEND_BATCH_MAX_ROWS = int(os.getenv("APPEND_BATCH_MAX_ROWS", "25"))
+    
+    # Number allocation (contract / invoice numbers)
+    # Block size > 1 lets each worker claim several numbers per reservation (may leave gaps)
+    NUMBER_BLOCK_SIZE = int(os.getenv("NUMBER_BLOCK_SIZE", "1"))
+    # Shared high-water files so gunicorn workers never issue duplicates ("" = per process)
+    NUMBER_STATE_DIR = os.getenv("NUMBER_STATE_DIR", os.path.join(tempfile.gettempdir(), "coaching-portal-numbers"))
     
     # Email configuration (SMTP)
     GMAIL_SENDER_EMAIL = os.getenv("GMAIL_SENDER_EMAIL")
     GMAIL_APP_PASSWORD = os.getenv("GMAIL_APP_PASSWORD")
     GMAIL_SENDER_NAME = os.getenv("GMAIL_SENDER_NAME", "Michael Oh")
+    # Emails are queued in this SQLite file and generated/sent by background workers;
+    # the last EMAIL_JOB_HISTORY jobs stay pollable at /api/email-jobs/<id>. It lives in
+    # data/ next to the local database so queued emails survive a reboot
+    EMAIL_QUEUE_PATH = os.getenv("EMAIL_QUEUE_PATH", str(Path(__file__).parent / "data" / "email_queue.db"))
+    EMAIL_WORKERS = int(os.getenv("EMAIL_WORKERS", "2"))
+    EMAIL_JOB_HISTORY = int(os.getenv("EMAIL_JOB_HISTORY", "500"))
+    # Failed sends are retried after EMAIL_RETRY_BASE_SECONDS, doubling each time;
+    # after EMAIL_MAX_ATTEMPTS the job moves to the dead-letter table (replay_email_jobs.py)
+    EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+    EMAIL_RETRY_BASE_SECONDS = float(os.getenv("EMAIL_RETRY_BASE_SECONDS", "30"))
+    # Serverless hosts (Vercel) freeze background threads once the response is sent
+    # and give every instance its own /tmp, so there each email is generated and sent
+    # before the form POST returns, with one attempt (on by default when VERCEL is set)
+    EMAIL_INLINE = os.getenv("EMAIL_INLINE", "true" if os.getenv("VERCEL") else "false").lower() == "true"
+    
+    # Idempotency-Key replays for the form POSTs: the last IDEMPOTENCY_MAX_KEYS
+    # responses are kept for IDEMPOTENCY_TTL_SECONDS (per process)
+    IDEMPOTENCY_MAX_KEYS = int(os.getenv("IDEMPOTENCY_MAX_KEYS", "1000"))
+    IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
 
     # CORS configuration
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "*")
@@ -11,10 +11,10 @@ service = GoogleSheetsService()
 
 # Get the current data
 print("Reading current sheet structure...")
-result = service.service.spreadsheets().values().get(
+result = service.execute(service.service.spreadsheets().values().get(
     spreadsheetId=service.clients_sheet_id,
     range='A:K'
-).execute()
+))
 
 values = result.get('values', [])
 
@@ -41,7 +41,7 @@ print(f"Expected headers: {correct_headers}\n")
 
 # Clear the entire sheet first
 print("Clearing sheet...")
-service.service.spreadsheets().batchUpdate(
+service.execute(service.service.spreadsheets().batchUpdate(
     spreadsheetId=service.clients_sheet_id,
     body={
         'requests': [
@@ -55,18 +55,18 @@ service.service.spreadsheets().batchUpdate(
             }
         ]
     }
-).execute()
+), write=True)
 
 print("✓ Sheet cleared\n")
 
 # Rewrite headers
 print("Writing correct headers...")
-service.service.spreadsheets().values().update(
+service.execute(service.service.spreadsheets().values().update(
     spreadsheetId=service.clients_sheet_id,
     range='A1:K1',
     valueInputOption='USER_ENTERED',
     body={'values': [correct_headers]}
-).execute()
+), write=True)
 
 print("✓ Headers updated\n")
 
@@ -106,18 +106,17 @@ if len(values) > 1:
     
     # Write the cleaned data back
     if cleaned_rows:
-        service.service.spreadsheets().values().append(
+        service.execute(service.service.spreadsheets().values().append(
             spreadsheetId=service.clients_sheet_id,
             range='A2:K',
             valueInputOption='USER_ENTERED',
             body={'values': cleaned_rows}
-        ).execute()
+        ), write=True, idempotent=False)
         
         print(f"✓ Restored {len(cleaned_rows)} rows with correct structure\n")
 
 # Clear the cache
-service.client_cache = {}
-service.cache_timestamp = None
+service._invalidate_client_cache()
 
 print("="*80)
 print("SHEET STRUCTURE FIXED")
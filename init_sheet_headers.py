@@ -47,12 +47,12 @@ print(f"Headers: {clients_headers}")
 
 try:
     # Add headers to Clients sheet (row 1)
-    service.service.spreadsheets().values().update(
+    service.execute(service.service.spreadsheets().values().update(
         spreadsheetId=service.clients_sheet_id,
         range='A1:K1',
         valueInputOption='USER_ENTERED',
         body={'values': [clients_headers]}
-    ).execute()
+    ), write=True)
     print("✓ Clients sheet headers added successfully!")
 except Exception as e:
     print(f"✗ Error adding Clients headers: {e}")
@@ -62,12 +62,12 @@ print(f"Headers: {sessions_headers}")
 
 try:
     # Add headers to Sessions sheet (row 1)
-    service.service.spreadsheets().values().update(
+    service.execute(service.service.spreadsheets().values().update(
         spreadsheetId=service.sessions_sheet_id,
         range='A1:J1',
         valueInputOption='USER_ENTERED',
         body={'values': [sessions_headers]}
-    ).execute()
+    ), write=True)
     print("✓ Sessions sheet headers added successfully!")
 except Exception as e:
     print(f"✗ Error adding Sessions headers: {e}")
@@ -0,0 +1,22 @@
+"""Config overrides shared by the offline test scripts."""
+
+import tempfile
+
+from config import Config
+
+
+def use_offline_config(**overrides):
+    """Point Config at the fake sheet IDs and keep tests away from real snapshots, replicas and number state.
+
+    Call at the top of a test module, before building any service; keyword
+    arguments set further Config attributes.
+    """
+    Config.GOOGLE_CLIENTS_SHEET_ID = "clients"
+    Config.GOOGLE_SESSIONS_SHEET_ID = "sessions"
+    Config.CACHE_SNAPSHOT_DIR = ""
+    Config.SHEETS_REPLICA_PATH = ""
+    Config.SHEETS_READS_PER_MINUTE = 0
+    Config.SHEETS_WRITES_PER_MINUTE = 0
+    Config.NUMBER_STATE_DIR = tempfile.mkdtemp(prefix="coaching-portal-test-")
+    for name, value in overrides.items():
+        setattr(Config, name, value)
@@ -0,0 +1,32 @@
+"""List dead-lettered email jobs and put them back in the queue.
+
+Usage:
+    python replay_email_jobs.py            # list dead letters
+    python replay_email_jobs.py --all      # replay every dead letter
+    python replay_email_jobs.py ID [ID...] # replay the given jobs
+
+Replayed jobs are sent by the running portal's email workers.
+"""
+
+import sys
+from datetime import datetime
+
+from config import Config
+from services.email_queue import EmailJobStore
+
+store = EmailJobStore(Config.EMAIL_QUEUE_PATH)
+args = sys.argv[1:]
+
+if not args:
+    dead_letters = store.dead_letters()
+    if not dead_letters:
+        print('No dead-lettered email jobs in {}'.format(Config.EMAIL_QUEUE_PATH))
+    for job in dead_letters:
+        failed_at = datetime.fromtimestamp(job['failed_at']).strftime('%Y-%m-%d %H:%M')
+        print('{}  {:8} {:30} {} attempts, failed {}: {}'.format(
+            job['id'], job['kind'], job['recipient'], job['attempts'], failed_at, job['error']
+        ))
+    sys.exit(0)
+
+replayed = store.replay(None if args == ['--all'] else args)
+print('Re-queued {} email job(s)'.format(replayed))
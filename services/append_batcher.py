@@ -0,0 +1,77 @@
+"""Write-behind batching of row appends for the Google Sheets service."""
+
+import threading
+from typing import Any, Callable, List, Optional
+
+
+class _Batch:
+    """Rows waiting to be appended together, and the outcome once flushed."""
+
+    def __init__(self):
+        self.rows: List[List[Any]] = []
+        self.closed = threading.Event()
+        self.done = threading.Event()
+        self.results: Optional[List[Any]] = None
+        self.error: Optional[BaseException] = None
+
+
+class AppendBatcher:
+    """Coalesces rows submitted within a short window into one multi-row append.
+
+    The first caller of a batch waits up to ``window`` seconds (or until
+    ``max_rows`` rows have joined), then calls ``flush(rows)`` once for the
+    whole batch. ``flush`` returns one result per row (e.g. its updatedRange),
+    and every caller gets back the result for its own row, or the exception
+    if the append failed. Batches are flushed one at a time, in order.
+    """
+
+    def __init__(self, flush: Callable[[List[List[Any]]], List[Any]], window: float, max_rows: int):
+        """Initialize batcher."""
+        self.flush = flush
+        self.window = max(0.0, window)
+        self.max_rows = max(1, max_rows)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._pending: Optional[_Batch] = None
+
+    def submit(self, row: List[Any]) -> Any:
+        """Queue a row, wait for its batch to be appended and return the row's result."""
+        with self._lock:
+            batch = self._pending
+            leader = batch is None
+            if leader:
+                batch = self._pending = _Batch()
+            index = len(batch.rows)
+            batch.rows.append(row)
+            if len(batch.rows) >= self.max_rows:
+                # Full: later rows start the next batch
+                self._pending = None
+                batch.closed.set()
+
+        if leader:
+            self._run(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.results[index]
+
+    def _run(self, batch: _Batch):
+        """Wait out the window, close the batch and flush it (leader only)."""
+        if self.window:
+            batch.closed.wait(self.window)
+        with self._lock:
+            if self._pending is batch:
+                self._pending = None
+
+        try:
+            with self._flush_lock:
+                results = self.flush(batch.rows)
+            if len(results) != len(batch.rows):
+                raise RuntimeError(f"Append flush returned {len(results)} results for {len(batch.rows)} rows")
+            batch.results = results
+        except BaseException as e:
+            batch.error = e
+        finally:
+            batch.done.set()
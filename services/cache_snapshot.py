@@ -0,0 +1,84 @@
+"""On-disk snapshots of the parsed sheet caches for fast cold starts."""
+
+import json
+import logging
+import os
+import struct
+import tempfile
+import time
+import zlib
+from typing import Any, Dict, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheSnapshot:
+    """Reads and writes compressed cache snapshots in a directory.
+
+    Each snapshot is a small binary header (magic, format version, save time)
+    followed by zlib-compressed JSON. Snapshots with another format version,
+    a damaged body or older than ``max_age`` seconds are ignored.
+    """
+
+    MAGIC = b"CPSNAP"
+    FORMAT_VERSION = 1
+    _HEADER = struct.Struct(">6sHd")
+
+    def __init__(self, directory: str, max_age: float):
+        """Initialize snapshot store."""
+        self.directory = directory
+        self.max_age = max_age
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, f"{name}.snap")
+
+    def save(self, name: str, payload: Dict[str, Any]):
+        """Atomically write a snapshot; failures are logged, never raised."""
+        try:
+            body = zlib.compress(json.dumps(payload, separators=(",", ":")).encode("utf-8"), 6)
+            header = self._HEADER.pack(self.MAGIC, self.FORMAT_VERSION, time.time())
+
+            os.makedirs(self.directory, exist_ok=True)
+            # Write beside the target and rename so readers never see a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f".{name}-")
+            try:
+                with os.fdopen(fd, "wb") as handle:
+                    handle.write(header + body)
+                os.replace(tmp_path, self._path(name))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            logger.debug(f"Saved {name} cache snapshot ({len(body)} bytes)")
+        except Exception as e:
+            logger.warning(f"Could not save {name} cache snapshot: {e}")
+
+    def load(self, name: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (payload, age in seconds) for a usable snapshot, else None."""
+        try:
+            with open(self._path(name), "rb") as handle:
+                data = handle.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"Could not read {name} cache snapshot: {e}")
+            return None
+
+        try:
+            magic, version, saved_at = self._HEADER.unpack_from(data)
+            if magic != self.MAGIC or version != self.FORMAT_VERSION:
+                logger.info(f"Ignoring {name} cache snapshot with unknown format")
+                return None
+
+            age = max(0.0, time.time() - saved_at)
+            if age >= self.max_age:
+                logger.info(f"Ignoring {name} cache snapshot, {age:.0f}s old")
+                return None
+
+            payload = json.loads(zlib.decompress(data[self._HEADER.size:]).decode("utf-8"))
+        except (struct.error, zlib.error, ValueError) as e:
+            logger.warning(f"Ignoring damaged {name} cache snapshot: {e}")
+            return None
+
+        return payload, age
@@ -0,0 +1,87 @@
+"""Cheap change signals checked before refetching a Google Sheet."""
+
+import logging
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeDetector(ABC):
+    """Returns a token that changes whenever a spreadsheet may have changed.
+
+    A refresh compares the token with the one seen at the last load and skips
+    the download when they match. ``token`` returns None when no signal is
+    available, which always means "refetch".
+    """
+
+    @abstractmethod
+    def token(self, spreadsheet_id: str, http=None) -> Optional[str]:
+        """Current change token for a spreadsheet, or None to force a refetch."""
+
+    def record_write(self, spreadsheet_id: str):
+        """Called after the portal itself writes to a spreadsheet."""
+
+
+class DriveVersionDetector(ChangeDetector):
+    """Uses the Drive file ``version``, which goes up on every edit by anyone.
+
+    Covered by the drive scope the service already requests. ``drive`` is a
+    Drive v3 service (or the fake, whose files() resource mimics it).
+    """
+
+    def __init__(self, drive):
+        """Initialize detector."""
+        self.drive = drive
+
+    def token(self, spreadsheet_id: str, http=None) -> Optional[str]:
+        try:
+            request = self.drive.files().get(fileId=spreadsheet_id, fields="version", supportsAllDrives=True)
+            result = request.execute(http=http) if http else request.execute()
+        except HttpError as e:
+            logger.warning(f"Drive version check failed for {spreadsheet_id}, refetching: {e}")
+            return None
+        return result.get("version")
+
+
+class CounterCellDetector(ChangeDetector):
+    """Uses a cell the portal rewrites with a fresh value after each of its writes.
+
+    Costs one single-cell read per check and one single-cell write per write
+    batch. Edits made by hand in the sheet do not touch the cell; they are
+    picked up by the periodic full refetch (SHEETS_CHANGE_MAX_SKIP_AGE).
+    """
+
+    def __init__(self, service, execute: Callable[..., Dict[str, Any]], a1_range: str):
+        """Initialize detector."""
+        self.service = service
+        self.execute = execute
+        self.range = a1_range
+
+    def token(self, spreadsheet_id: str, http=None) -> Optional[str]:
+        try:
+            result = self.execute(self.service.spreadsheets().values().get(
+                spreadsheetId=spreadsheet_id,
+                range=self.range
+            ), http=http)
+        except HttpError as e:
+            logger.warning(f"Change counter {self.range} unreadable in {spreadsheet_id}, refetching: {e}")
+            return None
+        values = result.get("values", [])
+        return values[0][0] if values and values[0] else ""
+
+    def record_write(self, spreadsheet_id: str):
+        try:
+            self.execute(self.service.spreadsheets().values().update(
+                spreadsheetId=spreadsheet_id,
+                range=self.range,
+                valueInputOption="RAW",
+                body={"values": [[uuid.uuid4().hex]]}
+            ), write=True)
+        except HttpError as e:
+            # Other processes may keep serving their cache until its TTL runs out
+            logger.warning(f"Could not bump change counter {self.range} in {spreadsheet_id}: {e}")
@@ -1,10 +1,15 @@
 """Client service for high-level client management."""
 
 import logging
+from contextlib import nullcontext
 from typing import Dict, Any, Optional
 
+from config import Config
 from models import NewClientFormData, ExistingClientFormData, EmailContent
-from services.google_sheets_service import GoogleSheetsService
+from services.storage_backend import StorageBackend, remaining_balance
+from services.unit_of_work import UnitOfWork
+from services.email_pipeline import EmailPipeline
+from services.email_queue import EmailJobStore
 from services.email_service import EmailService
 from services.ai_service import AIService
 
@@ -12,24 +17,47 @@ from services.ai_service import AIService
 logger = logging.getLogger(__name__)
 
 
+class SubmissionNotSaved(Exception):
+    """A form submission failed before its unit of work committed, so submitting it again is safe.
+    
+    Validation failures are raised as ValueError and never commit either.
+    """
+
+
 class ClientService:
     """High-level service for client management and orchestration."""
     
     def __init__(self,
-                 sheets_service: GoogleSheetsService,
+                 sheets_service: StorageBackend,
                  email_service: EmailService,
-                 ai_service: AIService):
+                 ai_service: AIService,
+                 email_pipeline: Optional[EmailPipeline] = None):
         """Initialize client service with dependencies."""
         self.sheets_service = sheets_service
         self.email_service = email_service
         self.ai_service = ai_service
+        # Emails are queued durably and generated/sent by the pipeline's workers
+        # (or before the request returns, with EMAIL_INLINE on serverless hosts)
+        self.email_pipeline = email_pipeline or EmailPipeline(
+            email_service,
+            EmailJobStore(Config.EMAIL_QUEUE_PATH),
+            workers=Config.EMAIL_WORKERS,
+            history=Config.EMAIL_JOB_HISTORY,
+            max_attempts=Config.EMAIL_MAX_ATTEMPTS,
+            retry_base=Config.EMAIL_RETRY_BASE_SECONDS,
+            inline=Config.EMAIL_INLINE
+        )
+        self.email_pipeline.register("welcome", self._build_welcome_email)
+        self.email_pipeline.register("invoice", self._build_invoice_email)
     
-    def validate_new_client_data(self, data: NewClientFormData) -> tuple[bool, str]:
+    def validate_new_client_data(self, data: NewClientFormData,
+                                 uow: Optional[UnitOfWork] = None) -> tuple[bool, str]:
         """Validate new client data."""
+        storage = uow or self.sheets_service
         try:
             # Check for duplicate client (with timeout protection)
             try:
-                duplicate = self.sheets_service.check_duplicate_client(data.name, data.email)
+                duplicate = storage.check_duplicate_client(data.name, data.email)
                 if duplicate:
                     return False, f"A client with this name or email already exists"
             except Exception as check_error:
@@ -43,11 +71,13 @@ class ClientService:
             logger.error(f"Error validating client data: {e}")
             return False, f"Validation error: {str(e)}"
     
-    def validate_session_data(self, data: ExistingClientFormData) -> tuple[bool, str]:
+    def validate_session_data(self, data: ExistingClientFormData,
+                              uow: Optional[UnitOfWork] = None) -> tuple[bool, str]:
         """Validate session data."""
+        storage = uow or self.sheets_service
         try:
             # Check if client exists
-            client = self.sheets_service.get_client_by_name(data.client_name)
+            client = storage.get_client_by_name(data.client_name)
             if not client:
                 return False, f"Client '{data.client_name}' not found"
             
@@ -58,70 +88,85 @@ class ClientService:
             logger.error(f"Error validating session data: {e}")
             return False, f"Validation error: {str(e)}"
     
-    def process_new_client_registration(self, form_data: NewClientFormData) -> Dict[str, Any]:
-        """Process a new client registration."""
+    def process_new_client_registration(self, form_data: NewClientFormData,
+                                        uow: Optional[UnitOfWork] = None) -> Dict[str, Any]:
+        """Process a new client registration (in the caller's unit of work, if given)."""
         try:
-            # Validate data
-            is_valid, message = self.validate_new_client_data(form_data)
-            if not is_valid:
-                raise ValueError(message)
-            
-            # Prepare client data (Contract Number will be auto-generated)
-            client_data = {
-                "name": form_data.name,
-                "email": form_data.email,
-                "address": form_data.address or "",
-                "contact": form_data.contact or "",
-                "package_type": form_data.package_type,
-                "payment_method": form_data.payment_method,
-                "start_date": form_data.start_date,
-                "end_date": form_data.end_date,
-                "amount_paid": form_data.amount_paid,
-                "notes": form_data.notes or ""
-            }
-            
-            # Add to Google Sheets
-            sheets_result = self.sheets_service.add_new_client(client_data)
-            logger.info(f"New client added to sheets: {form_data.name}")
-            
-            # Generate welcome email using template
-            welcome_email_html = self.ai_service._get_welcome_email_template(client_data)
-            logger.info(f"✓ Generated welcome email for {form_data.name}")
-
-            # Log email content for verification (since Gmail API may not be configured)
-            logger.info(f"Email would be sent to: {form_data.email}")
-            logger.info(f"Subject: Welcome to Your Coaching Program, {form_data.name}!")
-
-            # Try to send email (will fail gracefully if not configured)
-            try:
-                email_content = EmailContent(
-                    recipient_email=form_data.email,
-                    subject=f"Welcome to Your Coaching Program, {form_data.name}!",
-                    body=f"Welcome {form_data.name}! We're excited to have you in our coaching program.",
-                    html_body=welcome_email_html
-                )
-
-                email_sent = self.email_service.send_email(email_content)
-                if email_sent:
-                    logger.info(f"✓ Welcome email sent to {form_data.email}")
-            except Exception as e:
-                logger.warning(f"⚠ Email not sent (service not configured): {str(e)[:100]}")
-            
-            return {
-                "status": "success",
-                "client_name": form_data.name,
-                "client_email": form_data.email,
-                "message": "Client registered successfully",
-                "sheets_result": sheets_result
-            }
+            with nullcontext(uow) if uow else UnitOfWork(self.sheets_service) as uow:
+                return self._register_new_client(form_data, uow)
         
         except ValueError as e:
             logger.warning(f"Validation error in process_new_client_registration: {e}")
             raise
         except Exception as e:
             logger.error(f"Error processing new client registration: {e}")
+            if uow is None or not uow.committed:
+                raise SubmissionNotSaved(str(e)) from e
             raise
     
+    def _register_new_client(self, form_data: NewClientFormData, uow: UnitOfWork) -> Dict[str, Any]:
+        """Registration steps, with reads and writes going through the request's unit of work."""
+        # Validate data
+        is_valid, message = self.validate_new_client_data(form_data, uow)
+        if not is_valid:
+            raise ValueError(message)
+        
+        # Prepare client data (Contract Number will be auto-generated)
+        client_data = {
+            "name": form_data.name,
+            "email": form_data.email,
+            "address": form_data.address or "",
+            "contact": form_data.contact or "",
+            "package_type": form_data.package_type,
+            "payment_method": form_data.payment_method,
+            "start_date": form_data.start_date,
+            "end_date": form_data.end_date,
+            "amount_paid": form_data.amount_paid,
+            "notes": form_data.notes or ""
+        }
+        
+        # The welcome email only needs the form data: draft it while the row is written
+        draft = self.email_pipeline.draft("welcome", dict(client_data))
+        
+        # Add to Google Sheets
+        uow.add_new_client(client_data)
+        try:
+            sheets_result = uow.commit()["clients"][0]
+        except Exception:
+            draft.cancel()
+            raise
+        logger.info(f"New client added to sheets: {form_data.name}")
+        
+        # Welcome email is sent in the background
+        email_job_id = self.email_pipeline.submit("welcome", form_data.email, client_data, draft=draft)
+        
+        return {
+            "status": "success",
+            "client_name": form_data.name,
+            "client_email": form_data.email,
+            "message": "Client registered successfully",
+            "sheets_result": sheets_result,
+            "email_job_id": email_job_id
+        }
+    
+    def _build_welcome_email(self, client_data: Dict[str, Any]) -> EmailContent:
+        """Render a queued welcome email job."""
+        return EmailContent(
+            recipient_email=client_data["email"],
+            subject=f"Welcome to Your Coaching Program, {client_data['name']}!",
+            body=f"Welcome {client_data['name']}! We're excited to have you in our coaching program.",
+            html_body=self.ai_service._get_welcome_email_template(client_data)
+        )
+    
+    def _build_invoice_email(self, session_data: Dict[str, Any]) -> EmailContent:
+        """Render a queued invoice email job."""
+        return EmailContent(
+            recipient_email=session_data["recipient_email"],
+            subject=f"Coaching Session Invoice - {session_data['session_date']}",
+            body=f"Thank you for your coaching session on {session_data['session_date']}.",
+            html_body=self._generate_invoice_email_html(session_data)
+        )
+    
     def _generate_invoice_email_html(self, session_data: Dict[str, Any]) -> str:
         """Generate hardcoded invoice email HTML template."""
         name = session_data.get('client_name', 'Valued Client')
@@ -206,91 +251,85 @@ class ClientService:
         </html>
         """
     
-    def process_existing_client_session(self, form_data: ExistingClientFormData) -> Dict[str, Any]:
-        """Process an existing client coaching session."""
+    def process_existing_client_session(self, form_data: ExistingClientFormData,
+                                        uow: Optional[UnitOfWork] = None) -> Dict[str, Any]:
+        """Process an existing client coaching session (in the caller's unit of work, if given)."""
         try:
-            # Validate data
-            is_valid, message = self.validate_session_data(form_data)
-            if not is_valid:
-                raise ValueError(message)
-            
-            # Get client info
-            client = self.sheets_service.get_client_by_name(form_data.client_name)
-            
-            # Prepare session data
-            session_data = {
-                "client_name": form_data.client_name,
-                "coaching_type": form_data.coaching_type,
-                "coaching_hours": form_data.coaching_hours,
-                "amount_collected": form_data.amount_collected,
-                "session_date": form_data.session_date,
-                "notes": form_data.notes or ""
-            }
-            
-            # Add session to Google Sheets
-            sheets_result = self.sheets_service.add_session(session_data)
-            logger.info(f"Session added for client: {form_data.client_name}")
-            
-            # Calculate balance information for invoice email
-            total_package = float(client.get('amount_paid', 0))
-            payment_method = client.get('payment_method', 'upfront_deposit')
-            sessions = self.sheets_service.get_client_history(form_data.client_name)
-            total_collected = sum(float(s.get('amount_collected', 0)) for s in sessions)
-            
-            # Calculate remaining balance based on payment method
-            if payment_method == 'pay_per_session':
-                remaining_balance = 0  # Pay-per-session shows no negative balance
-            else:
-                remaining_balance = total_package - total_collected
-            
-            # Add balance info to session data for email
-            session_data['total_package'] = total_package
-            session_data['total_collected'] = total_collected
-            session_data['remaining_balance'] = remaining_balance
-            
-            # Update client end date if provided
-            if form_data.new_end_date:
-                self.sheets_service.update_client_end_date(
-                    form_data.client_name,
-                    form_data.new_end_date
-                )
-                logger.info(f"Updated end date for client: {form_data.client_name}")
-            
-            # Generate invoice email using hardcoded template
-            invoice_email_html = self._generate_invoice_email_html(session_data)
-            logger.info(f"✓ Generated invoice email for {form_data.client_name}")
-
-            # Log email content for verification
-            logger.info(f"Email would be sent to: {client.get('email')}")
-            logger.info(f"Subject: Coaching Session Invoice - {form_data.session_date}")
-
-            # Try to send email (will fail gracefully if not configured)
-            try:
-                email_content = EmailContent(
-                    recipient_email=client.get("email", ""),
-                    subject=f"Coaching Session Invoice - {form_data.session_date}",
-                    body=f"Thank you for your coaching session on {form_data.session_date}.",
-                    html_body=invoice_email_html
-                )
-
-                email_sent = self.email_service.send_email(email_content)
-                if email_sent:
-                    logger.info(f"✓ Invoice email sent to {client.get('email')}")
-            except Exception as e:
-                logger.warning(f"⚠ Email not sent (service not configured): {str(e)[:100]}")
-            
-            return {
-                "status": "success",
-                "client_name": form_data.client_name,
-                "session_date": form_data.session_date,
-                "amount_collected": form_data.amount_collected,
-                "message": "Session recorded successfully",
-                "sheets_result": sheets_result
-            }
+            with nullcontext(uow) if uow else UnitOfWork(self.sheets_service) as uow:
+                return self._record_session(form_data, uow)
         
         except ValueError as e:
             logger.warning(f"Validation error in process_existing_client_session: {e}")
             raise
         except Exception as e:
             logger.error(f"Error processing existing client session: {e}")
+            if uow is None or not uow.committed:
+                raise SubmissionNotSaved(str(e)) from e
             raise
+    
+    def _record_session(self, form_data: ExistingClientFormData, uow: UnitOfWork) -> Dict[str, Any]:
+        """Session steps, with reads and writes going through the request's unit of work."""
+        # Load clients and sessions up front: one concurrent round-trip per sheet
+        uow.refresh_caches(clients=True, sessions=True)
+        
+        # Validate data
+        is_valid, message = self.validate_session_data(form_data, uow)
+        if not is_valid:
+            raise ValueError(message)
+        
+        # Get client info (memoized by the validation above)
+        client = uow.get_client_by_name(form_data.client_name)
+        
+        # Prepare session data
+        session_data = {
+            "client_name": form_data.client_name,
+            "coaching_type": form_data.coaching_type,
+            "coaching_hours": form_data.coaching_hours,
+            "amount_collected": form_data.amount_collected,
+            "session_date": form_data.session_date,
+            "notes": form_data.notes or ""
+        }
+        
+        # Balance for the invoice email, counting this session on top of the totals
+        # loaded above, so the invoice can be drafted while the session is written
+        balance = uow.get_client_balance(form_data.client_name)
+        total_package = balance["total_package"]
+        total_collected = balance["total_collected"] + form_data.amount_collected
+        invoice_data = dict(
+            session_data,
+            recipient_email=client.get("email", ""),
+            total_package=total_package,
+            total_collected=total_collected,
+            remaining_balance=remaining_balance(
+                client.get("payment_method", "upfront_deposit"), total_package, total_collected
+            )
+        )
+        draft = self.email_pipeline.draft("invoice", invoice_data)
+        
+        # End date and session row go out together at commit (end date first)
+        uow.add_session(session_data)
+        if form_data.new_end_date:
+            uow.update_client(form_data.client_name, end_date=form_data.new_end_date)
+        try:
+            sheets_result = uow.commit()["sessions"][0]
+        except Exception:
+            draft.cancel()
+            raise
+        logger.info(f"Session added for client: {form_data.client_name}")
+        if form_data.new_end_date:
+            logger.info(f"Updated end date for client: {form_data.client_name}")
+        
+        # Invoice email is sent in the background
+        email_job_id = self.email_pipeline.submit(
+            "invoice", invoice_data["recipient_email"], invoice_data, draft=draft
+        )
+        
+        return {
+            "status": "success",
+            "client_name": form_data.client_name,
+            "session_date": form_data.session_date,
+            "amount_collected": form_data.amount_collected,
+            "message": "Session recorded successfully",
+            "sheets_result": sheets_result,
+            "email_job_id": email_job_id
+        }
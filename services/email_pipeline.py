@@ -0,0 +1,203 @@
+"""Background generation and delivery of client emails."""
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from models import EmailContent
+from services.email_queue import EmailJobStore, SENDING, SENT, SKIPPED
+
+
+logger = logging.getLogger(__name__)
+
+
+class EmailPipeline:
+    """Generates and sends emails from a durable job queue on a pool of worker threads.
+
+    ``submit`` records a job (a kind plus a JSON payload) and returns its id
+    straight away. A worker later turns the payload into an email with the
+    builder registered for its kind, then sends it. Failed attempts are
+    retried with exponential backoff; after ``max_attempts`` the job goes to
+    the dead-letter table, from where replay_email_jobs.py can re-queue it.
+
+    Callers may start rendering with ``draft`` before the job exists (while
+    the sheet write is in flight) and hand the draft to ``submit``; the
+    worker then sends the draft instead of rendering the payload again.
+
+    With ``inline`` (serverless hosts, where threads do not outlive the
+    response) no workers are started: ``submit`` generates and sends the job
+    before returning, with a single attempt; a failure is dead-lettered.
+    """
+
+    def __init__(self,
+                 email_service,
+                 store: EmailJobStore,
+                 workers: int = 2,
+                 history: int = 500,
+                 max_attempts: int = 5,
+                 retry_base: float = 30.0,
+                 retry_max: float = 3600.0,
+                 lease: float = 300.0,
+                 poll_interval: float = 5.0,
+                 draft_workers: int = 4,
+                 inline: bool = False):
+        """Initialize pipeline and start its workers."""
+        self.email_service = email_service
+        self.store = store
+        self.inline = inline
+        self.history = max(1, history)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.lease = lease
+        self.poll_interval = poll_interval
+        self._builders: Dict[str, Callable[[Dict[str, Any]], EmailContent]] = {}
+        # Drafts for jobs submitted by this process, by job id (not persisted:
+        # after a restart the worker renders from the payload instead)
+        self._drafts: "OrderedDict[str, Future]" = OrderedDict()
+        self._drafts_lock = threading.Lock()
+        self._draft_executor = ThreadPoolExecutor(
+            max_workers=max(1, draft_workers), thread_name_prefix="email-draft"
+        )
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._workers = [] if inline else [
+            threading.Thread(target=self._work, name=f"email-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    def register(self, kind: str, builder: Callable[[Dict[str, Any]], EmailContent]):
+        """Set the function that renders jobs of this kind from their payload."""
+        self._builders[kind] = builder
+        self._wakeup.set()
+
+    def draft(self, kind: str, payload: Dict[str, Any]) -> Future:
+        """Start rendering an email now; cancel the future to discard it."""
+        return self._draft_executor.submit(self._builders[kind], payload)
+
+    def submit(self, kind: str, recipient: str, payload: Dict[str, Any],
+               draft: Optional[Future] = None) -> str:
+        """Queue an email, optionally with its draft; returns the job id to poll."""
+        job_id = uuid.uuid4().hex
+        if draft is not None:
+            with self._drafts_lock:
+                self._drafts[job_id] = draft
+                # Jobs claimed by another process never collect their draft
+                while len(self._drafts) > self.history:
+                    self._drafts.popitem(last=False)[1].cancel()
+        try:
+            self.store.enqueue(kind, recipient, payload, history=self.history, job_id=job_id)
+        except Exception:
+            self._take_draft(job_id)
+            raise
+        logger.info(f"Queued {kind} email {job_id} for {recipient}")
+        if self.inline:
+            self._run_now(job_id)
+        else:
+            self._wakeup.set()
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, or None if unknown (or long forgotten)."""
+        job = self.store.get(job_id)
+        if not job:
+            return None
+        return {
+            "id": job["id"],
+            "kind": job["kind"],
+            "recipient": job["recipient"],
+            "status": job["status"],
+            "attempts": job["attempts"],
+            "error": job["error"],
+            "created_at": datetime.utcfromtimestamp(job["created_at"]).isoformat(),
+            "updated_at": datetime.utcfromtimestamp(job["updated_at"]).isoformat()
+        }
+
+    def shutdown(self, wait: bool = True):
+        """Stop the workers; jobs still queued stay in the store for the next start."""
+        self._stopping.set()
+        self._wakeup.set()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+        self._draft_executor.shutdown(wait=wait)
+
+    def _take_draft(self, job_id: str) -> Optional[Future]:
+        with self._drafts_lock:
+            return self._drafts.pop(job_id, None)
+
+    def _retry_delay(self, attempts: int) -> float:
+        return min(self.retry_max, self.retry_base * 2 ** (attempts - 1))
+
+    def _work(self):
+        """Worker loop: claim due jobs until shut down, sleeping while the queue is idle."""
+        while not self._stopping.is_set():
+            self._wakeup.clear()
+            try:
+                job = self.store.claim(self.lease) if self._builders else None
+            except Exception as e:
+                logger.error(f"Could not claim an email job: {e}")
+                job = None
+
+            if job is None:
+                try:
+                    due_in = self.store.next_due_in()
+                except Exception:
+                    due_in = None
+                timeout = self.poll_interval if due_in is None else min(self.poll_interval, due_in)
+                self._wakeup.wait(timeout)
+                continue
+
+            try:
+                self._run(job)
+            except Exception as e:
+                # The store was unreachable; the lease runs out and the job is claimed again
+                logger.error(f"Email job {job['id']} could not be updated: {e}")
+
+    def _run_now(self, job_id: str):
+        """Inline mode: generate and send a just-queued job on the calling thread."""
+        try:
+            job = self.store.claim(self.lease, job_id=job_id)
+            if job is not None:
+                self._run(job)
+        except Exception as e:
+            logger.error(f"Email job {job_id} could not be run inline: {e}")
+
+    def _run(self, job: Dict[str, Any]):
+        """Generate and send one claimed job."""
+        job_id = job["id"]
+        draft = self._take_draft(job_id)
+        try:
+            builder = self._builders.get(job["kind"])
+            if builder is None:
+                raise ValueError(f"No email builder registered for {job['kind']!r}")
+            if draft is not None and not draft.cancelled():
+                content = draft.result()
+            else:
+                content = builder(job["payload"])
+
+            if not self.email_service.is_configured():
+                logger.info(f"Email {job_id} not sent (SMTP not configured): {content.subject}")
+                self.store.set_status(job_id, SKIPPED, "Email delivery is not configured")
+                return
+
+            self.store.set_status(job_id, SENDING)
+            if not self.email_service.send_email(content):
+                raise RuntimeError("SMTP delivery failed")
+            self.store.set_status(job_id, SENT)
+        except Exception as e:
+            error = str(e)[:200]
+            # Inline jobs get one attempt: nothing would be left running to retry them
+            if job["attempts"] >= self.max_attempts or self.inline:
+                logger.error(f"Email job {job_id} dead-lettered after {job['attempts']} attempts: {error}")
+                self.store.dead_letter(job_id, error)
+            else:
+                delay = self._retry_delay(job["attempts"])
+                logger.warning(f"Email job {job_id} attempt {job['attempts']} failed, retrying in {delay:.0f}s: {error}")
+                self.store.retry_later(job_id, delay, error)
@@ -0,0 +1,190 @@
+"""Durable SQLite queue of outbound email jobs, with retries and a dead-letter table."""
+
+import json
+import logging
+import sqlite3
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from services.sqlite_store import SQLiteStore
+
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS email_jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    next_attempt_at REAL NOT NULL,
+    locked_until REAL NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_email_jobs_due ON email_jobs (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_email_jobs_created ON email_jobs (created_at);
+
+CREATE TABLE IF NOT EXISTS email_dead_letters (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    attempts INTEGER NOT NULL,
+    error TEXT,
+    failed_at REAL NOT NULL
+);
+"""
+
+# Job states; the last three are final
+QUEUED = "queued"
+RETRYING = "retrying"
+GENERATING = "generating"
+SENDING = "sending"
+SENT = "sent"
+SKIPPED = "skipped"
+FAILED = "failed"
+FINAL_STATES = {SENT, SKIPPED, FAILED}
+# Claimed by a worker; a crashed worker's jobs are picked up again once the lease expires
+RUNNING_STATES = (GENERATING, SENDING)
+
+
+class EmailJobStore(SQLiteStore):
+    """Email jobs kept in SQLite so they survive restarts and crashed workers.
+
+    Jobs hold a kind and a JSON payload rather than rendered emails; the
+    pipeline turns them into an email when a worker picks them up. Claims run
+    in ``BEGIN IMMEDIATE`` transactions, so worker threads in several
+    processes can share one database.
+    """
+
+    def __init__(self, path: str):
+        """Initialize job store and create the schema if needed."""
+        super().__init__(path, SCHEMA)
+
+    @staticmethod
+    def _job_dict(row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job["payload"] = json.loads(job["payload"])
+        return job
+
+    def enqueue(self, kind: str, recipient: str, payload: Dict[str, Any],
+                history: int = 0, job_id: Optional[str] = None) -> str:
+        """Add a job; with history, also drop finished jobs beyond the newest ``history``."""
+        job_id = job_id or uuid.uuid4().hex
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO email_jobs (id, kind, recipient, payload, status, next_attempt_at, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, recipient, json.dumps(payload), QUEUED, now, now, now)
+            )
+            if history:
+                conn.execute(
+                    "DELETE FROM email_jobs WHERE status IN (?, ?) AND created_at < "
+                    "(SELECT created_at FROM email_jobs ORDER BY created_at DESC LIMIT 1 OFFSET ?)",
+                    (SENT, SKIPPED, history - 1)
+                )
+        return job_id
+
+    def claim(self, lease: float, job_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Take the oldest due job (or ``job_id``, if it is due) for this worker, counting it as an attempt."""
+        now = time.time()
+        query = (
+            "SELECT * FROM email_jobs WHERE "
+            "((status IN (?, ?) AND next_attempt_at <= ?) OR "
+            "(status IN (?, ?) AND locked_until <= ?))"
+        )
+        params = [QUEUED, RETRYING, now, *RUNNING_STATES, now]
+        if job_id is not None:
+            query += " AND id = ?"
+            params.append(job_id)
+        with self._transaction() as conn:
+            row = conn.execute(query + " ORDER BY next_attempt_at LIMIT 1", params).fetchone()
+            if row is None:
+                return None
+            conn.execute(
+                "UPDATE email_jobs SET status = ?, attempts = attempts + 1, locked_until = ?, "
+                "updated_at = ? WHERE id = ?",
+                (GENERATING, now + lease, now, row["id"])
+            )
+        job = self._job_dict(row)
+        job["attempts"] += 1
+        return job
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next queued or retrying job is due (None if there is none)."""
+        row = self._connect().execute(
+            "SELECT MIN(next_attempt_at) FROM email_jobs WHERE status IN (?, ?)",
+            (QUEUED, RETRYING)
+        ).fetchone()
+        return None if row[0] is None else max(0.0, row[0] - time.time())
+
+    def set_status(self, job_id: str, status: str, error: Optional[str] = None):
+        """Move a claimed job on to the given status."""
+        self._connect().execute(
+            "UPDATE email_jobs SET status = ?, error = ?, updated_at = ? WHERE id = ?",
+            (status, error, time.time(), job_id)
+        )
+
+    def retry_later(self, job_id: str, delay: float, error: str):
+        """Put a failed attempt back in the queue after ``delay`` seconds."""
+        now = time.time()
+        self._connect().execute(
+            "UPDATE email_jobs SET status = ?, error = ?, next_attempt_at = ?, locked_until = 0, "
+            "updated_at = ? WHERE id = ?",
+            (RETRYING, error, now + delay, now, job_id)
+        )
+
+    def dead_letter(self, job_id: str, error: str):
+        """Give up on a job: mark it failed and copy it to the dead-letter table."""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE email_jobs SET status = ?, error = ?, locked_until = 0, updated_at = ? WHERE id = ?",
+                (FAILED, error, now, job_id)
+            )
+            conn.execute(
+                "INSERT OR REPLACE INTO email_dead_letters (id, kind, recipient, payload, attempts, error, failed_at) "
+                "SELECT id, kind, recipient, payload, attempts, ?, ? FROM email_jobs WHERE id = ?",
+                (error, now, job_id)
+            )
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """A job by id, or None."""
+        row = self._connect().execute("SELECT * FROM email_jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job_dict(row) if row else None
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """All dead-lettered jobs, oldest failure first."""
+        rows = self._connect().execute("SELECT * FROM email_dead_letters ORDER BY failed_at").fetchall()
+        return [self._job_dict(row) for row in rows]
+
+    def replay(self, job_ids: Optional[List[str]] = None) -> int:
+        """Re-queue dead-lettered jobs (all of them by default) with a fresh retry budget."""
+        now = time.time()
+        with self._transaction() as conn:
+            if job_ids is None:
+                job_ids = [row["id"] for row in conn.execute("SELECT id FROM email_dead_letters")]
+            replayed = 0
+            for job_id in job_ids:
+                row = conn.execute("SELECT * FROM email_dead_letters WHERE id = ?", (job_id,)).fetchone()
+                if row is None:
+                    continue
+                # The job row may have been pruned; recreate it from the dead letter
+                conn.execute(
+                    "INSERT OR REPLACE INTO email_jobs (id, kind, recipient, payload, status, attempts, "
+                    "error, next_attempt_at, locked_until, created_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, 0, NULL, ?, 0, "
+                    "COALESCE((SELECT created_at FROM email_jobs WHERE id = ?), ?), ?)",
+                    (row["id"], row["kind"], row["recipient"], row["payload"], QUEUED, now, row["id"], now, now)
+                )
+                conn.execute("DELETE FROM email_dead_letters WHERE id = ?", (job_id,))
+                replayed += 1
+        logger.info(f"Replayed {replayed} dead-lettered email jobs")
+        return replayed
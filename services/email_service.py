@@ -27,6 +27,10 @@ class EmailService:
         else:
             logger.warning("Email service not configured (missing GMAIL_SENDER_EMAIL or GMAIL_APP_PASSWORD)")
 
+    def is_configured(self) -> bool:
+        """Check if SMTP credentials are set."""
+        return bool(self.sender_email and self.sender_password)
+
     def send_email(self, email_content: EmailContent) -> bool:
         """Send an email via Gmail SMTP."""
         try:
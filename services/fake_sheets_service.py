@@ -0,0 +1,388 @@
+"""In-process fake of the Google Sheets v4 API for offline runs and benchmarks."""
+
+import json
+import logging
+import random
+import re
+import threading
+import time
+from collections import Counter, deque
+from datetime import date, datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from services.sheet_schema import column_index, column_letter
+
+
+logger = logging.getLogger(__name__)
+
+
+CLIENT_HEADERS = ["Client ID", "Name", "Address", "Contact", "Email", "Package Type", "Start Date",
+                  "End Date", "Amount Paid", "Payment Method", "Contract Number", "Invoice Number",
+                  "Created At", "Notes"]
+
+SESSION_HEADERS = ["Client ID", "Client Name", "Coaching Type", "Coaching Hours", "Amount Paid ($)",
+                   "Amount Collected", "Amount Balance", "Session Date", "Payment Method",
+                   "Contract Number", "Invoice Number", "Created At", "Notes"]
+
+
+def _parse_range(a1_range: str) -> Tuple[str, int, int, Optional[int], Optional[int]]:
+    """Split 'Sheet1!A2:M' into (sheet, first col, first row, last col, last row), 1-based; open ends are None."""
+    sheet, _, cells = a1_range.rpartition("!")
+    sheet = sheet.strip("'") or "Sheet1"
+    start, _, end = cells.partition(":")
+
+    def cell(ref):
+        match = re.fullmatch(r"([A-Z]*)(\d*)", ref.upper())
+        if not match:
+            raise ValueError(f"Unable to parse range: {a1_range}")
+        column = column_index(match.group(1)) + 1 if match.group(1) else None
+        row = int(match.group(2)) if match.group(2) else None
+        return column, row
+
+    first_col, first_row = cell(start)
+    last_col, last_row = cell(end) if end else (first_col, first_row)
+    return sheet, first_col or 1, first_row or 1, last_col, last_row
+
+
+class _Request:
+    """Stands in for googleapiclient's HttpRequest: work happens on execute()."""
+
+    def __init__(self, api: "FakeSheetsAPI", method: str, spreadsheet_id: str, detail: Any,
+                 action: Callable[[], Dict[str, Any]]):
+        self._api = api
+        self._method = method
+        self._spreadsheet_id = spreadsheet_id
+        self._detail = detail
+        self._action = action
+
+    def execute(self, http=None, num_retries: int = 0) -> Dict[str, Any]:
+        return self._api._execute(self._method, self._spreadsheet_id, self._detail, self._action)
+
+
+class _Values:
+    """spreadsheets().values() resource."""
+
+    def __init__(self, api: "FakeSheetsAPI"):
+        self._api = api
+
+    def get(self, spreadsheetId: str, range: str, **kwargs) -> _Request:
+        return _Request(self._api, "values.get", spreadsheetId, range,
+                        lambda: self._api._read(spreadsheetId, range))
+
+    def batchGet(self, spreadsheetId: str, ranges: List[str], **kwargs) -> _Request:
+        return _Request(self._api, "values.batchGet", spreadsheetId, tuple(ranges), lambda: {
+            "spreadsheetId": spreadsheetId,
+            "valueRanges": [self._api._read(spreadsheetId, r) for r in ranges]
+        })
+
+    def append(self, spreadsheetId: str, range: str, body: Dict[str, Any], **kwargs) -> _Request:
+        return _Request(self._api, "values.append", spreadsheetId, range,
+                        lambda: self._api._append(spreadsheetId, range, body.get("values", [])))
+
+    def update(self, spreadsheetId: str, range: str, body: Dict[str, Any], **kwargs) -> _Request:
+        return _Request(self._api, "values.update", spreadsheetId, range,
+                        lambda: self._api._write(spreadsheetId, range, body.get("values", [])))
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict[str, Any], **kwargs) -> _Request:
+        data = body.get("data", [])
+
+        def action():
+            responses = [self._api._write(spreadsheetId, d["range"], d.get("values", [])) for d in data]
+            return {
+                "spreadsheetId": spreadsheetId,
+                "totalUpdatedCells": sum(r["updatedCells"] for r in responses),
+                "responses": responses
+            }
+
+        return _Request(self._api, "values.batchUpdate", spreadsheetId,
+                        tuple(d["range"] for d in data), action)
+
+
+class _Spreadsheets:
+    """spreadsheets() resource."""
+
+    def __init__(self, api: "FakeSheetsAPI"):
+        self._api = api
+
+    def values(self) -> _Values:
+        return _Values(self._api)
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict[str, Any], **kwargs) -> _Request:
+        requests = body.get("requests", [])
+        return _Request(self._api, "batchUpdate", spreadsheetId, len(requests),
+                        lambda: self._api._structural_update(spreadsheetId, requests))
+
+
+class _Files:
+    """Drive files() resource, enough for change detection (files.get metadata)."""
+
+    def __init__(self, api: "FakeSheetsAPI"):
+        self._api = api
+
+    def get(self, fileId: str, fields: str = "", **kwargs) -> _Request:
+        return _Request(self._api, "files.get", fileId, fields,
+                        lambda: self._api._file_metadata(fileId))
+
+
+class FakeSheetsAPI:
+    """Drop-in for ``build('sheets', 'v4', ...)`` backed by in-memory grids.
+
+    Each spreadsheet holds named sheets of string cells. Every execute()
+    sleeps for ``latency`` +/- ``jitter`` seconds and may fail with a 429
+    HttpError, either at random (``quota_error_rate``) or once more than
+    ``requests_per_minute`` calls land in a sliding minute. All randomness
+    comes from ``seed`` so runs are repeatable. ``calls`` and ``counts``
+    record every request for assertions and benchmarks. ``files()`` stands in
+    for the Drive API: each spreadsheet's version goes up on every change.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, quota_error_rate: float = 0.0,
+                 requests_per_minute: Optional[int] = None, seed: int = 0):
+        """Initialize fake API."""
+        self.latency = latency
+        self.jitter = jitter
+        self.quota_error_rate = quota_error_rate
+        self.requests_per_minute = requests_per_minute
+        self.spreadsheets_data: Dict[str, Dict[str, List[List[str]]]] = {}
+        self.versions: Counter = Counter()
+        self.calls: List[Tuple[str, str, Any]] = []
+        self.counts: Counter = Counter()
+        self._random = random.Random(seed)
+        self._window: deque = deque()
+        self._lock = threading.Lock()
+
+    # Resource entry point, as on the real service object
+
+    def spreadsheets(self) -> _Spreadsheets:
+        return _Spreadsheets(self)
+
+    def files(self) -> _Files:
+        return _Files(self)
+
+    # Data setup
+
+    def set_rows(self, spreadsheet_id: str, rows: List[List[Any]], sheet: str = "Sheet1"):
+        """Replace a sheet's contents (row 1 is usually the header)."""
+        with self._lock:
+            self.spreadsheets_data.setdefault(spreadsheet_id, {})[sheet] = [
+                [str(value) for value in row] for row in rows
+            ]
+            self.versions[spreadsheet_id] += 1
+
+    def rows(self, spreadsheet_id: str, sheet: str = "Sheet1") -> List[List[str]]:
+        """Return a copy of a sheet's contents."""
+        with self._lock:
+            return [list(row) for row in self._sheet(spreadsheet_id, sheet)]
+
+    def reset_stats(self):
+        """Forget recorded calls (e.g. after warm-up, before measuring)."""
+        with self._lock:
+            self.calls.clear()
+            self.counts.clear()
+
+    @classmethod
+    def with_synthetic_data(cls, clients_sheet_id: str, sessions_sheet_id: str,
+                            clients: int = 100, sessions: int = 1000, seed: int = 0,
+                            **kwargs) -> "FakeSheetsAPI":
+        """Build a fake holding generated Clients and Sessions sheets."""
+        api = cls(seed=seed, **kwargs)
+        rows = synthetic_rows(clients, sessions, seed)
+        api.set_rows(clients_sheet_id, rows["clients"])
+        api.set_rows(sessions_sheet_id, rows["sessions"])
+        return api
+
+    # Request handling
+
+    def _execute(self, method: str, spreadsheet_id: str, detail: Any,
+                 action: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        with self._lock:
+            self.calls.append((method, spreadsheet_id, detail))
+            self.counts[method] += 1
+            delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+            throttled = self._throttled()
+
+        time.sleep(delay)
+        if throttled:
+            logger.debug(f"Fake Sheets API returning 429 for {method}")
+            raise HttpError(
+                httplib2.Response({"status": 429, "reason": "Too Many Requests"}),
+                json.dumps({"error": {
+                    "code": 429,
+                    "message": "Quota exceeded for quota metric 'Read requests'",
+                    "status": "RESOURCE_EXHAUSTED"
+                }}).encode("utf-8")
+            )
+
+        with self._lock:
+            return action()
+
+    def _throttled(self) -> bool:
+        """Decide whether this call gets a 429 (lock held)."""
+        if self.quota_error_rate and self._random.random() < self.quota_error_rate:
+            return True
+
+        if self.requests_per_minute:
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if len(self._window) >= self.requests_per_minute:
+                return True
+            self._window.append(now)
+        return False
+
+    def _sheet(self, spreadsheet_id: str, sheet: str) -> List[List[str]]:
+        try:
+            sheets = self.spreadsheets_data[spreadsheet_id]
+        except KeyError:
+            raise HttpError(httplib2.Response({"status": 404}),
+                            b'{"error": {"code": 404, "message": "Requested entity was not found."}}')
+        return sheets.setdefault(sheet, [])
+
+    def _read(self, spreadsheet_id: str, a1_range: str) -> Dict[str, Any]:
+        sheet, first_col, first_row, last_col, last_row = _parse_range(a1_range)
+        grid = self._sheet(spreadsheet_id, sheet)
+
+        values = []
+        for row in grid[first_row - 1:last_row]:
+            cells = row[first_col - 1:last_col]
+            # The API trims trailing empty cells and rows
+            while cells and cells[-1] == "":
+                cells.pop()
+            values.append(cells)
+        while values and not values[-1]:
+            values.pop()
+
+        result = {"range": a1_range, "majorDimension": "ROWS"}
+        if values:
+            result["values"] = values
+        return result
+
+    def _file_metadata(self, file_id: str) -> Dict[str, Any]:
+        if file_id not in self.spreadsheets_data:
+            raise HttpError(httplib2.Response({"status": 404}),
+                            f'{{"error": {{"code": 404, "message": "File not found: {file_id}."}}}}'.encode("utf-8"))
+        return {"id": file_id, "version": str(self.versions[file_id])}
+
+    def _write(self, spreadsheet_id: str, a1_range: str, values: List[List[Any]]) -> Dict[str, Any]:
+        sheet, first_col, first_row, _, _ = _parse_range(a1_range)
+        grid = self._sheet(spreadsheet_id, sheet)
+
+        for offset, row_values in enumerate(values):
+            while len(grid) < first_row + offset:
+                grid.append([])
+            row = grid[first_row + offset - 1]
+            end = first_col - 1 + len(row_values)
+            if len(row) < end:
+                row.extend([""] * (end - len(row)))
+            row[first_col - 1:end] = [str(value) for value in row_values]
+        self.versions[spreadsheet_id] += 1
+
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "updatedRange": a1_range,
+            "updatedRows": len(values),
+            "updatedCells": sum(len(row) for row in values)
+        }
+
+    def _append(self, spreadsheet_id: str, a1_range: str, values: List[List[Any]]) -> Dict[str, Any]:
+        sheet, first_col, _, _, _ = _parse_range(a1_range)
+        grid = self._sheet(spreadsheet_id, sheet)
+
+        # Appends land after the last non-empty row
+        while grid and not any(grid[-1]):
+            grid.pop()
+        start_row = len(grid) + 1
+        width = max((len(row) for row in values), default=0)
+        for row_values in values:
+            grid.append([""] * (first_col - 1) + [str(value) for value in row_values])
+        end_row = len(grid)
+        self.versions[spreadsheet_id] += 1
+
+        updated_range = (f"{sheet}!{column_letter(first_col - 1)}{start_row}:"
+                         f"{column_letter(first_col + width - 2)}{end_row}")
+        return {
+            "spreadsheetId": spreadsheet_id,
+            "tableRange": f"{sheet}!A1:{column_letter(first_col + width - 2)}{start_row - 1}",
+            "updates": {
+                "spreadsheetId": spreadsheet_id,
+                "updatedRange": updated_range,
+                "updatedRows": len(values),
+                "updatedCells": sum(len(row) for row in values)
+            }
+        }
+
+    def _structural_update(self, spreadsheet_id: str, requests: List[Dict[str, Any]]) -> Dict[str, Any]:
+        sheets = list(self.spreadsheets_data.get(spreadsheet_id, {}).keys()) or ["Sheet1"]
+        for request in requests:
+            if "deleteDimension" not in request:
+                raise HttpError(httplib2.Response({"status": 400}),
+                                f"Fake Sheets API does not support {list(request)}".encode("utf-8"))
+
+            dimension_range = request["deleteDimension"]["range"]
+            if dimension_range.get("dimension") != "ROWS":
+                raise HttpError(httplib2.Response({"status": 400}), b"Only ROWS deletion is supported")
+
+            # sheetId is the sheet's position here (the first sheet is 0)
+            grid = self._sheet(spreadsheet_id, sheets[dimension_range.get("sheetId", 0)])
+            del grid[dimension_range["startIndex"]:dimension_range["endIndex"]]
+            self.versions[spreadsheet_id] += 1
+
+        return {"spreadsheetId": spreadsheet_id, "replies": [{} for _ in requests]}
+
+
+def synthetic_rows(clients: int, sessions: int, seed: int = 0) -> Dict[str, List[List[str]]]:
+    """Generate Clients and Sessions sheet rows shaped like the real ones."""
+    rng = random.Random(seed)
+    year = datetime.utcnow().year
+    packages = ["Starter", "Standard", "Premium"]
+
+    client_rows = [list(CLIENT_HEADERS)]
+    for number in range(1, clients + 1):
+        start = date(year, 1, 1) + timedelta(days=rng.randrange(300))
+        payment_method = rng.choice(["upfront_deposit", "upfront_deposit", "pay_per_session"])
+        client_rows.append([
+            f"CL-{number:08X}",
+            f"Client {number:05d}",
+            f"{rng.randrange(1, 999)} Example Street",
+            f"+65 {rng.randrange(8000_0000, 9999_9999)}",
+            f"client{number:05d}@example.com",
+            rng.choice(packages),
+            start.isoformat(),
+            (start + timedelta(days=180)).isoformat(),
+            str(rng.choice([1000, 2500, 5000]) if payment_method == "upfront_deposit" else 0),
+            payment_method,
+            f"CT-{year}-{number:03d}",
+            f"INV-5{number:03d}",
+            f"{start.isoformat()}T09:00:00",
+            ""
+        ])
+
+    session_rows = [list(SESSION_HEADERS)]
+    collected: Dict[int, float] = {}
+    for number in range(1, sessions + 1):
+        client = client_rows[rng.randrange(1, clients + 1)] if clients else [""] * len(CLIENT_HEADERS)
+        amount = float(rng.choice([100, 150, 200]))
+        collected[id(client)] = collected.get(id(client), 0.0) + amount
+        package = float(client[8] or 0)
+        balance = 0 if client[9] == "pay_per_session" else package - collected[id(client)]
+        session_date = date(year, 1, 1) + timedelta(days=rng.randrange(365))
+        session_rows.append([
+            client[0],
+            client[1],
+            rng.choice(["1:1", "Group", "Workshop"]),
+            str(rng.choice([1, 1.5, 2])),
+            str(package),
+            str(amount),
+            str(balance),
+            session_date.isoformat(),
+            client[9],
+            client[10],
+            f"INV-{number:03d}",
+            f"{session_date.isoformat()}T10:00:00",
+            ""
+        ])
+
+    return {"clients": client_rows, "sessions": session_rows}
@@ -1,40 +1,135 @@
 """Google Sheets API service for Coaching Portal."""
 
+import contextvars
 import logging
 import json
 import os
-from typing import List, Dict, Optional, Any
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Dict, Optional, Any, Tuple
 from datetime import datetime
 from google.oauth2 import service_account
 from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
 from config import Config
+from services.append_batcher import AppendBatcher
+from services.cache_snapshot import CacheSnapshot
+from services.change_detector import ChangeDetector, CounterCellDetector, DriveVersionDetector
+from services.number_allocator import NumberAllocator
+from services.quota_scheduler import get_scheduler
+from services.sheet_schema import CLIENT_SCHEMA, SESSION_SCHEMA, column_letter
+from services.sheets_cache import SheetCache
+from services.sqlite_replica import SheetReplica
+from services.storage_backend import project_clients, projected_fields, remaining_balance
 
 
 logger = logging.getLogger(__name__)
 
+# Sheets API calls made inside count_calls() (read/write counts), per request context
+_counted_calls: contextvars.ContextVar[Optional[Counter]] = contextvars.ContextVar("sheets_counted_calls", default=None)
+
+# Whole-sheet reads run to this column rather than the schema width, so columns
+# inserted anywhere in the header are still read (writes follow the header too)
+LAST_READ_COLUMN = "ZZ"
+
 
 class GoogleSheetsService:
     """Service for interacting with Google Sheets API."""
     
-    def __init__(self):
-        """Initialize Google Sheets service."""
+    def __init__(self, service=None):
+        """Initialize Google Sheets service.
+        
+        Pass ``service`` to use an already-built Sheets API object (e.g. a
+        FakeSheetsAPI) instead of building one from the configured credentials.
+        """
         # Strip whitespace/newlines from sheet IDs
         self.clients_sheet_id = (Config.GOOGLE_CLIENTS_SHEET_ID or '').strip()
         self.sessions_sheet_id = (Config.GOOGLE_SESSIONS_SHEET_ID or '').strip()
         self.credentials = None
         self.service = None
+        # Every API call goes through the process-wide read/write quota buckets
+        self.scheduler = get_scheduler()
         self.client_cache = {}
-        self.cache_timestamp = None
+        # Freshness, version, read/write lock and single-flight loading for
+        # each cached sheet; the parsed data and indexes live on this service
+        self.client_sheet = SheetCache("clients", Config.CLIENT_CACHE_TTL)
+        self.session_sheet = SheetCache("sessions", Config.SESSION_CACHE_TTL)
+        self._refresh_thread_lock = threading.Lock()
+        self._refresh_thread = None
+        # Lowercase name/email -> client and client id -> sheet row lookups, rebuilt with client_cache
+        self.client_name_index = {}
+        self.client_email_index = {}
+        self.client_row_index = {}
+        # Row decoders for the column layout found in each sheet's header row
+        self.client_decoder = CLIENT_SCHEMA.default
+        self.session_decoder = SESSION_SCHEMA.default
+        # Projected reads: column index -> cells of that Clients column (header
+        # first) and when it was read; only valid at client_columns_version
+        self.client_columns = {}
+        self.client_columns_loaded_at = {}
+        self.client_columns_version = None
+        # Parsed Sessions sheet plus lowercase client name / client id -> sessions
+        self.session_cache = []
+        self.session_name_index = {}
+        self.session_id_index = {}
+        # Tail-sync state: sheet rows consumed so far (incl. header), the
+        # header itself and a key of the last row, used to detect edits/deletes
+        self.session_rows_loaded = 0
+        self.session_header = None
+        self.session_last_key = None
+        # Lowercase client name -> running totals, maintained with the session cache
+        self.session_aggregates = {}
+        # Lowercase client name -> amount collected in sessions queued but not yet
+        # appended, so back-to-back sessions still get the right running balance
+        self._pending_collected = {}
+        # Write-behind queues: rows submitted close together share one append call
+        window = Config.APPEND_BATCH_WINDOW_MS / 1000
+        self.client_appends = AppendBatcher(self._append_client_rows, window, Config.APPEND_BATCH_MAX_ROWS)
+        self.session_appends = AppendBatcher(self._append_session_rows, window, Config.APPEND_BATCH_MAX_ROWS)
+        # Contract/invoice numbers handed out from memory, seeded from the caches
+        self.number_allocator = NumberAllocator(
+            block_size=Config.NUMBER_BLOCK_SIZE,
+            state_dir=Config.NUMBER_STATE_DIR or None
+        )
+        # Parsed caches persisted between processes (None when disabled)
+        self.snapshots = None
+        if Config.CACHE_SNAPSHOT_DIR:
+            self.snapshots = CacheSnapshot(Config.CACHE_SNAPSHOT_DIR, Config.CACHE_SNAPSHOT_MAX_AGE)
+        # Replica mode: reads are answered from a local SQLite mirror kept
+        # current by a sync loop; the sheet cache versions last mirrored, and
+        # the write-throughs since then as (version, change) to apply row by row
+        self.replica = None
+        if Config.SHEETS_REPLICA_PATH:
+            self.replica = SheetReplica(Config.SHEETS_REPLICA_PATH)
+        self._replica_lock = threading.Lock()
+        self._replica_versions = {"clients": None, "sessions": None}
+        self._replica_changes = {"clients": [], "sessions": []}
+        self._replica_stop = threading.Event()
+        # Change detection: per sheet, the detector token seen just before the
+        # last download and when that download happened; a write clears the token
+        self.change_detector = None
+        self._change_tokens = {"clients": None, "sessions": None}
+        self._downloaded_at = {"clients": None, "sessions": None}
 
         try:
-            self._initialize_service()
+            if service is not None:
+                self.service = service
+            elif Config.FAKE_SHEETS:
+                self.service = self._build_fake_service()
+            else:
+                self._initialize_service()
             logger.info("Google Sheets service initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing Google Sheets service: {e}")
             raise
+        
+        self.change_detector = self._build_change_detector()
+        self._restore_snapshots()
+        if self.replica:
+            self._start_replica_sync()
     
     def _initialize_service(self):
         """Initialize Google Sheets API client."""
@@ -77,130 +172,777 @@ class GoogleSheetsService:
                 raise ValueError(f"Invalid GOOGLE_CREDENTIALS_JSON format: {e}")
 
         # Build the Sheets API service
-        self.service = build('sheets', 'v4', credentials=self.credentials)
+        if Config.SHEETS_CLIENT == "rest":
+            from services.sheets_rest_client import SheetsRestClient
+            self.service = SheetsRestClient(self.credentials, pool_size=Config.SHEETS_HTTP_POOL_SIZE)
+        else:
+            # Imported here: discovery is slow to load and unused with the REST client
+            from googleapiclient.discovery import build
+            self.service = build('sheets', 'v4', credentials=self.credentials)
+    
+    def _build_fake_service(self):
+        """Build an in-process fake Sheets API filled with synthetic data (offline mode)."""
+        from services.fake_sheets_service import FakeSheetsAPI
+        
+        # Any IDs will do offline, but the two sheets must not collide
+        self.clients_sheet_id = self.clients_sheet_id or "fake-clients"
+        self.sessions_sheet_id = self.sessions_sheet_id or "fake-sessions"
+        logger.warning("FAKE_SHEETS is set: using the in-process fake Sheets API")
+        
+        return FakeSheetsAPI.with_synthetic_data(
+            self.clients_sheet_id,
+            self.sessions_sheet_id,
+            clients=Config.FAKE_SHEETS_CLIENTS,
+            sessions=Config.FAKE_SHEETS_SESSIONS,
+            seed=Config.FAKE_SHEETS_SEED,
+            latency=Config.FAKE_SHEETS_LATENCY_MS / 1000,
+            jitter=Config.FAKE_SHEETS_JITTER_MS / 1000,
+            quota_error_rate=Config.FAKE_SHEETS_QUOTA_ERROR_RATE,
+            requests_per_minute=Config.FAKE_SHEETS_REQUESTS_PER_MINUTE or None
+        )
+    
+    def _build_change_detector(self) -> Optional[ChangeDetector]:
+        """Build the detector selected by Config.SHEETS_CHANGE_DETECTION, if any."""
+        mode = Config.SHEETS_CHANGE_DETECTION
+        if mode == "drive":
+            # The fake Sheets API answers Drive files().get itself
+            drive = self.service if hasattr(self.service, "files") else None
+            if drive is None:
+                from googleapiclient.discovery import build
+                drive = build('drive', 'v3', credentials=self.credentials)
+            return DriveVersionDetector(drive)
+        if mode == "counter":
+            return CounterCellDetector(self.service, self.execute, Config.SHEETS_CHANGE_COUNTER_RANGE)
+        if mode:
+            raise ValueError(f"Unknown SHEETS_CHANGE_DETECTION: {mode}")
+        return None
+    
+    def execute(self, request, write: bool = False, http=None, idempotent: bool = True) -> Dict[str, Any]:
+        """Execute a Sheets API request through the quota scheduler.
+        
+        Requests queue for a read or write token and 429/503 responses are
+        retried with backoff, so callers see throttling as latency. Appends and
+        row deletes pass ``idempotent=False`` and are only retried on a 429.
+        """
+        calls = _counted_calls.get()
+        if calls is not None:
+            calls["writes" if write else "reads"] += 1
+        return self.scheduler.execute(request, write=write, http=http, idempotent=idempotent)
+    
+    @contextmanager
+    def count_calls(self) -> Iterator[Counter]:
+        """Count the Sheets API reads and writes made by this request inside the block.
+        
+        Calls made for the request on helper threads (concurrent refreshes)
+        are included; rows it hands to another request's batched append are not.
+        """
+        calls = Counter()
+        token = _counted_calls.set(calls)
+        try:
+            yield calls
+        finally:
+            _counted_calls.reset(token)
     
     def _is_cache_valid(self) -> bool:
         """Check if client cache is still valid."""
-        if not self.cache_timestamp:
+        return self.client_sheet.is_fresh() and bool(self.client_cache)
+    
+    @staticmethod
+    def _can_serve_stale(sheet: SheetCache, stale_ttl: float) -> bool:
+        """Check if expired data may still be served while it is revalidated.
+        
+        Data restored from a snapshot may be served up to the snapshot max age.
+        """
+        age = sheet.age()
+        limit = Config.CACHE_SNAPSHOT_MAX_AGE if sheet.restored else stale_ttl
+        return age is not None and age < limit
+    
+    def _can_serve_stale_clients(self) -> bool:
+        """Check if an expired client cache may still be served while revalidating."""
+        return bool(self.client_cache) and self._can_serve_stale(self.client_sheet, Config.CLIENT_CACHE_STALE_TTL)
+    
+    def _start_background_refresh(self, clients: bool = True, sessions: bool = False):
+        """Refresh caches on a background thread (at most one at a time)."""
+        with self._refresh_thread_lock:
+            if self._refresh_thread and self._refresh_thread.is_alive():
+                return
+            
+            self._refresh_thread = threading.Thread(
+                target=self._background_refresh,
+                args=(clients, sessions),
+                name="sheets-cache-refresh",
+                daemon=True
+            )
+            self._refresh_thread.start()
+    
+    def _background_refresh(self, clients: bool, sessions: bool):
+        """Refresh caches off the request thread."""
+        try:
+            if clients:
+                self._refresh_clients(http=self._new_http())
+            if sessions:
+                self._refresh_sessions(http=self._new_http())
+        except Exception as e:
+            # Keep serving the stale data; the next request retries
+            logger.warning(f"Background cache refresh failed: {e}")
+    
+    def _restore_snapshots(self):
+        """Load cache snapshots from disk and revalidate them in the background."""
+        if not self.snapshots:
+            return
+        
+        try:
+            restored_clients = self._restore_client_snapshot()
+            restored_sessions = self._restore_session_snapshot()
+        except Exception as e:
+            logger.warning(f"Discarding unreadable cache snapshot: {e}")
+            self._invalidate_client_cache()
+            self._invalidate_session_cache()
+            return
+        
+        if restored_clients or restored_sessions:
+            self._start_background_refresh(clients=restored_clients, sessions=restored_sessions)
+    
+    def _restore_client_snapshot(self) -> bool:
+        """Restore the client cache from its snapshot, if there is a usable one."""
+        snapshot = self.snapshots.load(f"{self.clients_sheet_id}-clients")
+        if not snapshot:
             return False
         
-        elapsed = (datetime.utcnow() - self.cache_timestamp).total_seconds()
-        return elapsed < Config.CLIENT_CACHE_TTL
+        payload, age = snapshot
+        clients = payload["clients"]
+        with self.client_sheet.lock.write_locked():
+            self.client_cache = clients
+            self._rebuild_client_indexes(clients)
+            # Later tail syncs only seed from new rows: seed from the restored ones now
+            self._seed_client_numbers(clients)
+            self.client_sheet.mark_restored(age)
+        
+        logger.info(f"Restored {len(clients)} clients from a {age:.0f}s old snapshot")
+        return True
+    
+    def _restore_session_snapshot(self) -> bool:
+        """Restore the session cache (and tail-sync state) from its snapshot."""
+        snapshot = self.snapshots.load(f"{self.sessions_sheet_id}-sessions")
+        if not snapshot:
+            return False
+        
+        payload, age = snapshot
+        with self.session_sheet.lock.write_locked():
+            self._clear_session_data()
+            for session in payload["sessions"]:
+                self._index_session(session)
+            self.session_cache = payload["sessions"]
+            self.session_rows_loaded = payload["rows_loaded"]
+            self.session_header = payload["header"]
+            self.session_decoder = SESSION_SCHEMA.decoder(self.session_header)
+            # JSON has no tuples
+            last_key = payload["last_key"]
+            self.session_last_key = tuple(last_key) if last_key is not None else None
+            # Later tail syncs only seed from new rows: seed from the restored ones now
+            self._seed_session_numbers(session["invoice_number"] for session in self.session_cache)
+            self.session_sheet.mark_restored(age)
+        
+        logger.info(f"Restored {len(self.session_cache)} sessions from a {age:.0f}s old snapshot")
+        return True
+    
+    def _start_replica_sync(self):
+        """Start the background loop that keeps the SQLite replica current."""
+        thread = threading.Thread(target=self._replica_sync_loop, name="sheets-replica-sync", daemon=True)
+        thread.start()
+    
+    def _replica_sync_loop(self):
+        """Pull both sheets every SHEETS_REPLICA_SYNC_INTERVAL seconds until stopped."""
+        http = self._new_http()
+        while True:
+            try:
+                self.sync_replica(http=http)
+            except Exception as e:
+                logger.warning(f"Replica sync failed: {e}")
+            if self._replica_stop.wait(Config.SHEETS_REPLICA_SYNC_INTERVAL):
+                return
+    
+    def sync_replica(self, http=None):
+        """Re-read both sheets and mirror any changes into the replica."""
+        # The sync interval, not the cache TTL, decides when the sheets are re-read
+        self.client_sheet.expire()
+        self.session_sheet.expire()
+        self._refresh_clients(http=http)
+        self._refresh_sessions(http=http)
+        self._mirror_to_replica()
+    
+    def _mirror_to_replica(self):
+        """Bring the replica up to date with whichever caches changed since the last mirror."""
+        if not self.replica:
+            return
+        
+        with self._replica_lock:
+            with self.client_sheet.lock.read_locked():
+                self._mirror_sheet(self.client_sheet, lambda: self.replica.replace_clients(self.client_cache))
+            with self.session_sheet.lock.read_locked():
+                self._mirror_sheet(self.session_sheet, lambda: self.replica.replace_sessions(self.session_cache))
+    
+    def _mirror_sheet(self, sheet: SheetCache, replace):
+        """Mirror one sheet (replica lock and sheet read lock held).
+        
+        When every version since the last mirror came from a queued write-through,
+        only those rows are written; after a (re)load the whole sheet is copied.
+        """
+        changes = self._replica_changes[sheet.name]
+        mirrored = self._replica_versions[sheet.name]
+        if sheet.is_loaded() and sheet.version != mirrored:
+            expected = list(range(mirrored + 1, sheet.version + 1)) if mirrored is not None else None
+            if [version for version, _ in changes] == expected:
+                for _, change in changes:
+                    change()
+            else:
+                replace()
+            self._replica_versions[sheet.name] = sheet.version
+        changes.clear()
+    
+    def _queue_replica_change(self, sheet: SheetCache, change):
+        """Record a write-through for the next mirror to apply (sheet write lock held, after mark_changed)."""
+        if self.replica:
+            self._replica_changes[sheet.name].append((sheet.version, change))
+    
+    def _ensure_replica(self) -> SheetReplica:
+        """Return the replica, syncing it first if nothing has been mirrored yet."""
+        if not self.replica.is_populated():
+            self.sync_replica()
+        return self.replica
+    
+    def _save_client_snapshot(self):
+        """Persist the parsed client cache for the next cold start."""
+        if not self.snapshots:
+            return
+        
+        with self.client_sheet.lock.read_locked():
+            self.snapshots.save(f"{self.clients_sheet_id}-clients", {"clients": self.client_cache})
+    
+    def _save_session_snapshot(self):
+        """Persist the parsed session cache and its tail-sync state."""
+        if not self.snapshots:
+            return
+        
+        with self.session_sheet.lock.read_locked():
+            self.snapshots.save(f"{self.sessions_sheet_id}-sessions", {
+                "sessions": self.session_cache,
+                "rows_loaded": self.session_rows_loaded,
+                "header": self.session_header,
+                "last_key": self.session_last_key
+            })
+    
+    def _rebuild_client_indexes(self, clients: List[Dict[str, Any]]):
+        """Rebuild the lowercase name and email indexes from a client list."""
+        name_index = {}
+        email_index = {}
+        row_index = {}
+        for client in clients:
+            row_index[client["client_id"]] = client["row_number"]
+            # setdefault keeps the first matching row, same as a linear scan would
+            name = client.get("name", "").lower()
+            if name:
+                name_index.setdefault(name, client)
+            email = client.get("email", "").lower()
+            if email:
+                email_index.setdefault(email, client)
+        
+        self.client_name_index = name_index
+        self.client_email_index = email_index
+        self.client_row_index = row_index
+    
+    def _invalidate_client_cache(self):
+        """Drop the client cache and its indexes."""
+        with self.client_sheet.lock.write_locked():
+            self.client_sheet.reset()
+            self.client_cache = {}
+            self.client_name_index = {}
+            self.client_email_index = {}
+            self.client_row_index = {}
+    
+    def _new_http(self):
+        """Build a separate authorized transport for use off the main thread.
+        
+        httplib2 connections are not thread-safe, so concurrent reads must not
+        share the transport built into self.service. Clients that pool their
+        own connections safely (thread_safe) need no separate transport.
+        """
+        if not self.credentials or getattr(self.service, "thread_safe", False):
+            return None
+        
+        import httplib2
+        import google_auth_httplib2
+        return google_auth_httplib2.AuthorizedHttp(self.credentials, http=httplib2.Http())
+    
+    def _batch_get(self, spreadsheet_id: str, ranges: List[str], http=None) -> List[List[List[str]]]:
+        """Read several ranges of one spreadsheet in a single values().batchGet call."""
+        request = self.service.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id,
+            ranges=ranges
+        )
+        result = self.execute(request, http=http)
+        
+        return [value_range.get('values', []) for value_range in result.get('valueRanges', [])]
+    
+    def refresh_caches(self, clients: bool = True, sessions: bool = True):
+        """Refresh whichever of the client/session caches are stale.
+        
+        Each sheet is read with a single batchGet; when both are needed (e.g.
+        before add_session) the two round-trips run concurrently.
+        """
+        loads = []
+        if clients and not self._is_cache_valid():
+            loads.append(self._refresh_clients)
+        if sessions and not self._is_session_cache_valid():
+            loads.append(self._refresh_sessions)
+        
+        if not loads:
+            return
+        if len(loads) == 1:
+            loads[0]()
+            return
+        
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(contextvars.copy_context().run, loads[1], self._new_http())
+            loads[0]()
+            future.result()
+    
+    def _check_for_changes(self, name: str, spreadsheet_id: str, sheet: SheetCache,
+                           http=None) -> Tuple[bool, Optional[str]]:
+        """Ask the change detector whether a loaded sheet changed since its last download.
+        
+        Returns (unchanged, token). When unchanged the cached data has just been
+        revalidated in place; otherwise the token goes with the data about to be
+        downloaded. Data older than SHEETS_CHANGE_MAX_SKIP_AGE is always refetched.
+        """
+        if not self.change_detector:
+            return False, None
+        
+        token = self.change_detector.token(spreadsheet_id, http=http)
+        with sheet.lock.write_locked():
+            downloaded_at = self._downloaded_at[name]
+            if (token is not None and token == self._change_tokens[name] and sheet.is_loaded()
+                    and downloaded_at is not None
+                    and time.monotonic() - downloaded_at < Config.SHEETS_CHANGE_MAX_SKIP_AGE):
+                sheet.mark_revalidated()
+                logger.info(f"{name.capitalize()} sheet unchanged, keeping cached data")
+                return True, token
+        return False, token
+    
+    def _record_download(self, name: str, token: Optional[str]):
+        """Remember the change token that preceded a download (sheet write lock held)."""
+        self._change_tokens[name] = token
+        self._downloaded_at[name] = time.monotonic()
+    
+    def _record_write(self, name: str, spreadsheet_id: str):
+        """Our own write changed the sheet: the next refresh must download it."""
+        self._change_tokens[name] = None
+        if self.change_detector:
+            self.change_detector.record_write(spreadsheet_id)
+    
+    def _refresh_clients(self, http=None):
+        """Reload the Clients sheet; concurrent misses share one in-flight fetch."""
+        def load():
+            # A load that finished just before we joined is good enough
+            if self._is_cache_valid():
+                return
+            
+            unchanged, token = self._check_for_changes("clients", self.clients_sheet_id, self.client_sheet, http)
+            if unchanged:
+                return
+            
+            for _ in range(2):
+                version = self.client_sheet.version
+                value_lists = self._batch_get(self.clients_sheet_id, [f'A:{LAST_READ_COLUMN}'], http=http)
+                with self.client_sheet.lock.write_locked():
+                    # A write-through landed mid-fetch and may be missing: fetch again
+                    if version == self.client_sheet.version:
+                        self._load_client_values(value_lists[0] if value_lists else [])
+                        self._record_download("clients", token)
+                        break
+            else:
+                logger.info("Client cache changed during refresh, keeping write-through state")
+                return
+            
+            self._save_client_snapshot()
+            self._mirror_to_replica()
+        
+        self.client_sheet.load(load)
+    
+    def _refresh_sessions(self, http=None):
+        """Tail-sync (or fully reload) the Sessions sheet; concurrent misses share one fetch."""
+        def load():
+            # A load that finished just before we joined is good enough
+            if self._is_session_cache_valid():
+                return
+            
+            unchanged, token = self._check_for_changes("sessions", self.sessions_sheet_id, self.session_sheet, http)
+            if unchanged:
+                return
+            
+            for _ in range(2):
+                version = self.session_sheet.version
+                rows_loaded = self.session_rows_loaded
+                if rows_loaded:
+                    # Sessions are append-only, so normally only the new tail is read
+                    value_lists = self._batch_get(
+                        self.sessions_sheet_id, [f'A1:{LAST_READ_COLUMN}1', f'A{rows_loaded}:{LAST_READ_COLUMN}'], http=http
+                    ) + [[], []]
+                    with self.session_sheet.lock.write_locked():
+                        if version != self.session_sheet.version:
+                            continue
+                        if self._apply_session_tail(value_lists[0], value_lists[1]):
+                            self._record_download("sessions", token)
+                            break
+                
+                value_lists = self._batch_get(self.sessions_sheet_id, [f'A:{LAST_READ_COLUMN}'], http=http)
+                with self.session_sheet.lock.write_locked():
+                    if version == self.session_sheet.version:
+                        self._load_session_values(value_lists[0] if value_lists else [])
+                        self._record_download("sessions", token)
+                        break
+            else:
+                logger.info("Session cache changed during refresh, keeping write-through state")
+                return
+            
+            self._save_session_snapshot()
+            self._mirror_to_replica()
+        
+        self.session_sheet.load(load)
+    
+    def _parse_client_row(self, row: List[str], row_number: int) -> Optional[Dict[str, Any]]:
+        """Parse one Clients sheet row, or return None if it has no client ID."""
+        return self.client_decoder.decode(row, row_number)
+    
+    def _load_client_values(self, values: List[List[str]]):
+        """Rebuild the client cache from a full Clients sheet read."""
+        if not values:
+            logger.warning("No clients found in sheet")
+            with self.client_sheet.lock.write_locked():
+                self.client_sheet.mark_changed()
+                self.client_cache = []
+                self._rebuild_client_indexes([])
+            return
+        
+        # Map columns from the header, then parse data rows keeping each sheet row number
+        decoder = CLIENT_SCHEMA.decoder(values[0])
+        clients = []
+        for row_number, row in enumerate(values[1:], start=2):
+            client = decoder.decode(row, row_number)
+            if client:
+                clients.append(client)
+        
+        # Update cache and lookup indexes together
+        with self.client_sheet.lock.write_locked():
+            self.client_decoder = decoder
+            self.client_cache = clients
+            self._rebuild_client_indexes(clients)
+            self._seed_client_numbers(self._client_number_cells(values[1:]))
+            self.client_sheet.mark_loaded()
+        
+        logger.info(f"Retrieved {len(clients)} clients from sheet")
+    
+    def _cache_appended_client(self, row: List[str], updated_range: str):
+        """Write-through: add a row we just appended to the client cache."""
+        with self.client_sheet.lock.write_locked():
+            if not self.client_sheet.is_loaded():
+                return  # Nothing loaded; the next read fetches the row anyway
+            
+            row_number = self._parse_row_number(updated_range)
+            last_row = max((c["row_number"] for c in self.client_cache), default=1)
+            if not row_number or row_number <= last_row:
+                # Position is unexpected (rows inserted/moved elsewhere): reload
+                self._invalidate_client_cache()
+                return
+            
+            client = self._parse_client_row(row, row_number)
+            if client:
+                # Copy-on-write so lists already handed out stay unchanged
+                self.client_cache = self.client_cache + [client]
+                self.client_name_index.setdefault(client["name"].lower(), client)
+                self.client_row_index[client["client_id"]] = row_number
+                if client["email"]:
+                    self.client_email_index.setdefault(client["email"].lower(), client)
+            self.client_sheet.mark_changed()
+            added = [client] if client else []
+            self._queue_replica_change(self.client_sheet, lambda: self.replica.upsert_clients(added))
+        self._mirror_to_replica()
+    
+    def _cache_patch_client(self, client: Dict[str, Any], **fields):
+        """Write-through: swap a patched copy of a cached client into the cache.
+        
+        Records already handed to readers are never mutated. The name and
+        email are unchanged, so only the index entries pointing at the old
+        record are replaced (client_row_index holds row numbers, not records).
+        """
+        with self.client_sheet.lock.write_locked():
+            patched = dict(client, **fields)
+            self.client_cache = [patched if cached is client else cached for cached in self.client_cache]
+            for index, key in ((self.client_name_index, client.get("name", "").lower()),
+                               (self.client_email_index, client.get("email", "").lower())):
+                if index.get(key) is client:
+                    index[key] = patched
+            self.client_sheet.mark_changed()
+            self._queue_replica_change(self.client_sheet, lambda: self.replica.upsert_clients([patched]))
+        self._mirror_to_replica()
+    
+    def _cache_delete_client_rows(self, start_row: int, end_row: int):
+        """Write-through: splice deleted sheet rows out and shift the rows below up."""
+        with self.client_sheet.lock.write_locked():
+            if not self.client_sheet.is_loaded():
+                return
+            
+            deleted = end_row - start_row + 1
+            clients = []
+            for client in self.client_cache:
+                row_number = client["row_number"]
+                if start_row <= row_number <= end_row:
+                    continue
+                if row_number > end_row:
+                    client = dict(client, row_number=row_number - deleted)
+                clients.append(client)
+            
+            self.client_cache = clients
+            self._rebuild_client_indexes(clients)
+            self.client_sheet.mark_changed()
+            shifted = [client for client in clients if client["row_number"] >= start_row]
+            self._queue_replica_change(
+                self.client_sheet, lambda: self.replica.replace_clients_from(start_row, shifted)
+            )
+        self._mirror_to_replica()
     
     def get_all_clients(self) -> List[Dict[str, Any]]:
         """Fetch all clients from the Clients sheet."""
         try:
+            if self.replica:
+                return self._ensure_replica().all_clients()
+            
             # Return cached data if valid
-            if self._is_cache_valid() and self.client_cache:
+            if self._is_cache_valid():
                 logger.info("Returning cached client list")
                 return self.client_cache
             
-            # Read from Clients sheet
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.clients_sheet_id,
-                range='A:M'
-            ).execute()
+            # Expired but recent enough: answer now, refresh in the background
+            if self._can_serve_stale_clients():
+                logger.info("Returning stale client list while revalidating")
+                self._start_background_refresh(clients=True)
+                return self.client_cache
             
-            values = result.get('values', [])
+            self.refresh_caches(clients=True, sessions=False)
+            return self.client_cache
+        
+        except HttpError as e:
+            logger.error(f"HTTP error fetching clients: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching clients: {e}")
+            raise
+    
+    def get_client_columns(self, fields: List[str]) -> List[Dict[str, Any]]:
+        """Fetch only the given fields (plus client_id and row_number) of every client.
+        
+        Answered from the full client cache when it can be; otherwise only the
+        columns behind ``fields`` are read, as few contiguous ranges in one
+        batchGet, and kept until the TTL or the next write to the cache.
+        """
+        fields = projected_fields(fields)
+        try:
+            if self.replica:
+                return project_clients(self._ensure_replica().all_clients(), fields)
             
-            if not values:
-                logger.warning("No clients found in sheet")
-                return []
+            if self._is_cache_valid():
+                return project_clients(self.client_cache, fields)
             
-            # Parse header and data rows
-            header = values[0] if values else []
-            clients = []
+            if self._can_serve_stale_clients():
+                self._start_background_refresh(clients=True)
+                return project_clients(self.client_cache, fields)
             
-            for row in values[1:]:
-                # Skip empty rows
-                if not row or not row[0]:
-                    continue
-                
-                # Parse columns based on actual sheet structure:
-                # A:Client ID, B:Name, C:Address, D:Contact, E:Email, F:Package, G:Start, H:End, I:Amount, J:Payment Method, K:Contract, L:Invoice, M:Created At, N:Notes
-                client = {
-                    "client_id": row[0] if len(row) > 0 else "",
-                    "name": row[1] if len(row) > 1 else "",
-                    "address": row[2] if len(row) > 2 else "",
-                    "contact": row[3] if len(row) > 3 else "",
-                    "email": row[4] if len(row) > 4 else "",
-                    "package_type": row[5] if len(row) > 5 else "",
-                    "start_date": row[6] if len(row) > 6 else "",
-                    "end_date": row[7] if len(row) > 7 else "",
-                    "amount_paid": float(row[8]) if len(row) > 8 and row[8] else 0.0,
-                    "payment_method": row[9] if len(row) > 9 else "upfront_deposit",
-                    "contract_number": row[10] if len(row) > 10 else "",
-                    "invoice_number": row[11] if len(row) > 11 else "",
-                    "created_at": row[12] if len(row) > 12 else "",
-                    "notes": row[13] if len(row) > 13 else ""
-                }
-                
-                # Only add if client_id exists
-                if client["client_id"]:
-                    clients.append(client)
-                    logger.debug(f"Added client: {client['name']}")
+            # Column positions come from the last header seen (default layout until then)
+            decoder = self.client_decoder
+            indexes = sorted({decoder.positions[field] for field in fields if field in decoder.positions})
+            columns = self._fetch_client_columns(indexes)
             
-            # Update cache
-            self.client_cache = clients
-            self.cache_timestamp = datetime.utcnow()
+            # A header cell that no longer matches means the layout moved: read it all once
+            expected = {decoder.positions[field]: field for field in fields if field in decoder.positions}
+            if any(cells and CLIENT_SCHEMA.field_for(cells[0]) != expected[index] for index, cells in columns.items()):
+                logger.info("Clients header does not match the known layout, reloading the sheet")
+                self.refresh_caches(clients=True, sessions=False)
+                return project_clients(self.client_cache, fields)
             
-            logger.info(f"Retrieved {len(clients)} clients from sheet")
-            return clients
+            return self._clients_from_columns(decoder, columns, fields)
         
         except HttpError as e:
-            logger.error(f"HTTP error fetching clients: {e}")
+            logger.error(f"HTTP error fetching client columns: {e}")
             raise
         except Exception as e:
-            logger.error(f"Error fetching clients: {e}")
+            logger.error(f"Error fetching client columns: {e}")
             raise
     
+    @staticmethod
+    def _column_ranges(indexes: List[int]) -> List[tuple]:
+        """Collapse sorted column indexes into contiguous (first, last) runs."""
+        runs = []
+        for index in indexes:
+            if runs and index == runs[-1][1] + 1:
+                runs[-1][1] = index
+            else:
+                runs.append([index, index])
+        return [tuple(run) for run in runs]
+    
+    def _fetch_client_columns(self, indexes: List[int]) -> Dict[int, List[str]]:
+        """Return the cells of each Clients column, reading only those not cached."""
+        with self.client_sheet.lock.read_locked():
+            version = self.client_sheet.version
+            columns = {}
+            if self.client_columns_version == version:
+                now = time.monotonic()
+                for index in indexes:
+                    loaded_at = self.client_columns_loaded_at.get(index)
+                    if loaded_at is not None and now - loaded_at < self.client_sheet.ttl:
+                        columns[index] = self.client_columns[index]
+        
+        missing = [index for index in indexes if index not in columns]
+        if not missing:
+            return columns
+        
+        runs = self._column_ranges(missing)
+        ranges = [f"{column_letter(first)}:{column_letter(last)}" for first, last in runs]
+        fetched = {index: [] for index in missing}
+        for (first, last), values in zip(runs, self._batch_get(self.clients_sheet_id, ranges)):
+            for offset in range(last - first + 1):
+                fetched[first + offset] = [row[offset] if len(row) > offset else "" for row in values]
+        
+        with self.client_sheet.lock.write_locked():
+            # Keep the columns only if no write-through or reload happened meanwhile
+            if self.client_sheet.version == version:
+                if self.client_columns_version != version:
+                    self.client_columns = {}
+                    self.client_columns_loaded_at = {}
+                    self.client_columns_version = version
+                now = time.monotonic()
+                for index, cells in fetched.items():
+                    self.client_columns[index] = cells
+                    self.client_columns_loaded_at[index] = now
+        
+        columns.update(fetched)
+        return columns
+    
+    @staticmethod
+    def _clients_from_columns(decoder, columns: Dict[int, List[str]], fields: List[str]) -> List[Dict[str, Any]]:
+        """Parse projected clients out of Clients columns (header cell first)."""
+        row_count = max((len(cells) for cells in columns.values()), default=0)
+        
+        clients = []
+        for index in range(1, row_count):
+            row = [""] * decoder.width
+            for position, cells in columns.items():
+                if index < len(cells):
+                    row[position] = cells[index]
+            client = decoder.decode(row, index + 1)
+            if client:
+                clients.append(client)
+        return project_clients(clients, fields)
+    
+    @staticmethod
+    def _parse_contract_number(contract: str, year: int) -> int:
+        """Return the numeric part of a CT-YYYY-### contract for the given year, else 0."""
+        parts = (contract or "").strip().split('-')
+        if len(parts) >= 3:
+            try:
+                if int(parts[1]) == year:
+                    return int(parts[2])
+            except ValueError:
+                pass
+        return 0
+    
+    @staticmethod
+    def _parse_client_invoice_number(invoice: str) -> int:
+        """Return the numeric part of an INV-5XXX client invoice, else 0."""
+        import re
+        match = re.search(r'INV-5(\d+)', (invoice or "").strip(), re.IGNORECASE)
+        return int(match.group(1)) if match else 0
+    
+    @staticmethod
+    def _parse_session_invoice_number(invoice: str) -> int:
+        """Return the numeric part of an INV-### session invoice, else 0."""
+        import re
+        # Accept both INV-### and INV-5### formats for backward compatibility
+        match = re.search(r'INV-?(\d+)', (invoice or "").strip(), re.IGNORECASE)
+        if not match:
+            return 0
+        num = int(match.group(1))
+        # If it's in INV-5 format, extract just the number part
+        return num % 1000 if num > 999 else num
+    
+    def _contract_sequence(self, year: int) -> str:
+        return f"{self.clients_sheet_id}-contract-{year}"
+    
+    def _client_invoice_sequence(self) -> str:
+        return f"{self.clients_sheet_id}-invoice"
+    
+    def _session_invoice_sequence(self) -> str:
+        return f"{self.sessions_sheet_id}-invoice"
+    
+    def _seed_client_numbers(self, clients: Iterable[Dict[str, Any]]):
+        """Seed contract and invoice high-water marks from Clients records.
+        
+        ``clients`` only needs contract_number and invoice_number keys: whole
+        records, or the row cells picked out by _client_number_cells.
+        """
+        current_year = datetime.utcnow().year
+        max_contract_num = 0
+        max_invoice_num = 0
+        for client in clients:
+            max_contract_num = max(max_contract_num, self._parse_contract_number(client["contract_number"], current_year))
+            max_invoice_num = max(max_invoice_num, self._parse_client_invoice_number(client["invoice_number"]))
+        
+        self.number_allocator.seed(self._contract_sequence(current_year), max_contract_num)
+        self.number_allocator.seed(self._client_invoice_sequence(), max_invoice_num)
+    
+    def _seed_session_numbers(self, invoice_numbers: Iterable[str]):
+        """Seed the session invoice high-water mark from Sessions invoice numbers."""
+        max_invoice_num = max((self._parse_session_invoice_number(n) for n in invoice_numbers), default=0)
+        self.number_allocator.seed(self._session_invoice_sequence(), max_invoice_num)
+    
+    def _client_number_cells(self, rows: List[List[str]]) -> Iterator[Dict[str, str]]:
+        """Contract and invoice cells of raw Clients rows (including rows without a client ID)."""
+        cell = self.client_decoder.cell
+        for row in rows:
+            yield {"contract_number": cell(row, "contract_number"), "invoice_number": cell(row, "invoice_number")}
+    
     def get_max_contract_number(self) -> str:
-        """Find the highest contract number in Clients sheet and increment by 1."""
+        """Allocate the next contract number (CT-YYYY-###) for the current year."""
         try:
-            from datetime import datetime
             current_year = datetime.utcnow().year
-            max_contract_num = 0
+            sequence = self._contract_sequence(current_year)
             
-            # Read from Clients sheet (Column K - Contract Number, updated from J)
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.clients_sheet_id,
-                range='K:K'
-            ).execute()
-            
-            values = result.get('values', [])
-            # Skip header row and extract contract numbers for current year
-            for row in values[1:]:
-                if row and row[0]:
-                    contract = row[0]
-                    if contract and isinstance(contract, str):
-                        # Extract numeric part from CT-YYYY-### format
-                        parts = contract.split('-')
-                        if len(parts) >= 3:
-                            try:
-                                year = int(parts[1])
-                                num = int(parts[2])
-                                # Only count contracts from current year
-                                if year == current_year:
-                                    max_contract_num = max(max_contract_num, num)
-                            except ValueError:
-                                pass
-            
-            # Increment by 1 and format
-            next_num = max_contract_num + 1
+            # Seeded on every client load and snapshot restore; only a cold allocator (or a new
+            # year) reads column K itself
+            if not self.number_allocator.is_seeded(sequence):
+                clients = self.get_client_columns(["contract_number"])
+                self.number_allocator.seed(sequence, max(
+                    [self._parse_contract_number(c["contract_number"], current_year) for c in clients] or [0]
+                ))
+            
+            next_num = self.number_allocator.allocate(sequence)
             new_contract = f"CT-{current_year}-{str(next_num).zfill(3)}"
-            logger.info(f"Generated next contract number: {new_contract} (max found was: {max_contract_num})")
+            logger.info(f"Generated next contract number: {new_contract}")
             return new_contract
         
         except Exception as e:
             logger.error(f"Error getting max contract number: {e}")
             # Return a default if there's any error
-            from datetime import datetime
             current_year = datetime.utcnow().year
             return f"CT-{current_year}-001"
     
     def add_new_client(self, client_data: Dict[str, Any]) -> str:
         """Add a new client to the Clients sheet."""
         try:
+            # Everything this write reads (duplicate check, number seeds) is in
+            # the Clients sheet: at most one batchGet
+            self.refresh_caches(clients=True, sessions=False)
+            
             # Generate Client ID (using current timestamp-based unique ID)
             import uuid
             client_id = f"CL-{uuid.uuid4().hex[:8].upper()}"
@@ -211,41 +953,31 @@ class GoogleSheetsService:
             # Auto-generate Invoice Number (take largest from both sheets)
             invoice_number = self.get_max_invoice_number()
             
-            # Prepare row data in correct column order (matching actual sheet structure):
-            # A:Client ID, B:Name, C:Address, D:Contact, E:Email, F:Package, G:Start, H:End, I:Amount, J:Payment Method, K:Contract, L:Invoice, M:Created At, N:Notes
-            row = [
-                client_id,                              # A: Client ID
-                client_data.get("name", ""),           # B: Name
-                client_data.get("address", ""),        # C: Address
-                client_data.get("contact", ""),        # D: Contact
-                client_data.get("email", ""),          # E: Email
-                client_data.get("package_type", ""),   # F: Package Type
-                client_data.get("start_date", ""),     # G: Start Date
-                client_data.get("end_date", ""),       # H: End Date
-                str(client_data.get("amount_paid", 0)), # I: Amount Paid
-                client_data.get("payment_method", "upfront_deposit"), # J: Payment Method
-                contract_number,                        # K: Contract Number (auto-generated)
-                invoice_number,                         # L: Invoice Number (auto-generated from max across both sheets)
-                datetime.utcnow().isoformat(),         # M: Created At
-                client_data.get("notes", "")           # N: Notes
-            ]
-            
-            # Append to Clients sheet
-            result = self.service.spreadsheets().values().append(
-                spreadsheetId=self.clients_sheet_id,
-                range='A:N',
-                valueInputOption='USER_ENTERED',
-                body={'values': [row]}
-            ).execute()
+            # Lay the row out under the header the sheet was loaded with (by
+            # default A:Client ID, B:Name, ... N:Notes), as reads decode it
+            row = self.client_decoder.encode({
+                "client_id": client_id,
+                "name": client_data.get("name", ""),
+                "address": client_data.get("address", ""),
+                "contact": client_data.get("contact", ""),
+                "email": client_data.get("email", ""),
+                "package_type": client_data.get("package_type", ""),
+                "start_date": client_data.get("start_date", ""),
+                "end_date": client_data.get("end_date", ""),
+                "amount_paid": str(client_data.get("amount_paid", 0)),
+                "payment_method": client_data.get("payment_method", "upfront_deposit"),
+                "contract_number": contract_number,    # auto-generated
+                "invoice_number": invoice_number,      # auto-generated from max across both sheets
+                "created_at": datetime.utcnow().isoformat(),
+                "notes": client_data.get("notes", "")
+            })
             
-            # Invalidate cache
-            self.client_cache = {}
-            self.cache_timestamp = None
+            # Queue for the next batched append to the Clients sheet
+            updated_range = self.client_appends.submit(row)
             
-            updates = result.get('updates', {})
             logger.info(f"New client added: {client_data.get('name')}")
             
-            return result.get('updates', {}).get('updatedRange', '')
+            return updated_range
         
         except HttpError as e:
             logger.error(f"HTTP error adding client: {e}")
@@ -255,38 +987,19 @@ class GoogleSheetsService:
             raise
     
     def get_max_invoice_number(self) -> str:
-        """Find the highest INVOICE NUMBER in Clients sheet (INV-5XXX format) and increment by 1."""
+        """Allocate the next client invoice number (INV-5XXX format)."""
         try:
-            import re
-            max_invoice_num = 0
+            # Seeded on every client load and snapshot restore; only a cold allocator reads column L
+            sequence = self._client_invoice_sequence()
+            if not self.number_allocator.is_seeded(sequence):
+                clients = self.get_client_columns(["invoice_number"])
+                self.number_allocator.seed(sequence, max(
+                    [self._parse_client_invoice_number(c["invoice_number"]) for c in clients] or [0]
+                ))
             
-            # Read from Clients sheet (Column L - Invoice Number) to find max for INV-5XXX format
-            clients_result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.clients_sheet_id,
-                range='L:L'
-            ).execute()
-            
-            clients_values = clients_result.get('values', [])
-            logger.info(f"Checking Clients sheet for INV-5XXX invoices...")
-            
-            for row in clients_values[1:]:  # Skip header
-                if row and row[0]:
-                    invoice = row[0].strip()
-                    if invoice and isinstance(invoice, str):
-                        # Extract numeric part from INV-5XXX format
-                        match = re.search(r'INV-5(\d+)', invoice, re.IGNORECASE)
-                        if match:
-                            try:
-                                num = int(match.group(1))
-                                max_invoice_num = max(max_invoice_num, num)
-                                logger.debug(f"Clients: {invoice} → {num}")
-                            except ValueError:
-                                pass
-            
-            # Increment by 1 and format as INV-5XXX
-            next_num = max_invoice_num + 1
+            next_num = self.number_allocator.allocate(sequence)
             new_invoice = f"INV-5{str(next_num).zfill(3)}"
-            logger.info(f"Generated next CLIENT invoice number: {new_invoice} (max found: {max_invoice_num})")
+            logger.info(f"Generated next CLIENT invoice number: {new_invoice}")
             return new_invoice
         
         except Exception as e:
@@ -295,41 +1008,14 @@ class GoogleSheetsService:
             return "INV-5001"
     
     def get_max_session_invoice_number(self) -> str:
-        """Find the highest invoice number in Sessions sheet (INV-001 format) and increment by 1."""
+        """Allocate the next session invoice number (INV-001 format)."""
         try:
-            import re
-            max_invoice_num = 0
+            # Refreshing the session cache re-seeds the allocator
+            self.get_all_sessions()
             
-            # Read from Sessions sheet (Column K - Invoice Number) for INV-001 format
-            sessions_result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.sessions_sheet_id,
-                range='K:K'
-            ).execute()
-            
-            sessions_values = sessions_result.get('values', [])
-            logger.info(f"Checking Sessions sheet for INV-001 invoices...")
-            
-            for row in sessions_values[1:]:  # Skip header
-                if row and row[0]:
-                    invoice = row[0].strip()
-                    if invoice and isinstance(invoice, str):
-                        # Extract numeric part from both INV-### and INV-5### formats for backward compatibility
-                        match = re.search(r'INV-?(\d+)', invoice, re.IGNORECASE)
-                        if match:
-                            try:
-                                num = int(match.group(1))
-                                # If it's in INV-5 format, extract just the number part
-                                if num > 999:
-                                    num = num % 1000
-                                max_invoice_num = max(max_invoice_num, num)
-                                logger.debug(f"Sessions: {invoice} → {num}")
-                            except ValueError:
-                                pass
-            
-            # Increment by 1 and format as INV-001
-            next_num = max_invoice_num + 1
+            next_num = self.number_allocator.allocate(self._session_invoice_sequence())
             new_invoice = f"INV-{str(next_num).zfill(3)}"
-            logger.info(f"Generated next SESSION invoice number: {new_invoice} (max found: {max_invoice_num})")
+            logger.info(f"Generated next SESSION invoice number: {new_invoice}")
             return new_invoice
         
         except Exception as e:
@@ -337,12 +1023,16 @@ class GoogleSheetsService:
             # Return a default if there's any error
             return "INV-001"
     
-    def add_session(self, session_data: Dict[str, Any]) -> str:
-        """Add a coaching session to the Sessions sheet."""
+    def add_session(self, session_data: Dict[str, Any], client: Optional[Dict[str, Any]] = None) -> str:
+        """Add a coaching session to the Sessions sheet (``client`` skips the lookup)."""
         try:
+            # Everything this write reads: one batchGet per spreadsheet, concurrently
+            self.refresh_caches(clients=True, sessions=True)
+            
             # Get client ID and contract number from selected client
             client_name = session_data.get("client_name", "")
-            client = self.get_client_by_name(client_name)
+            if client is None:
+                client = self.get_client_by_name(client_name)
             client_id = client.get("client_id", "") if client else ""
             contract_number = client.get("contract_number", "") if client else ""
             
@@ -353,53 +1043,43 @@ class GoogleSheetsService:
             # Auto-generate invoice number for session (INV-001 format)
             invoice_number = self.get_max_session_invoice_number()
             
-            # Calculate running balance
-            # Get all existing sessions for this client to sum up what's been collected so far
-            existing_sessions = self.get_client_history(client_name)
-            total_collected_so_far = sum(float(s.get("amount_collected", 0)) for s in existing_sessions)
-            
-            # Add this session's amount
+            # Running balance from the client's aggregate (no history scan) plus any
+            # of their sessions still waiting in the append queue
             amount_collected = float(session_data.get("amount_collected", 0))
+            key = client_name.lower()
+            with self.session_sheet.lock.write_locked():
+                totals = self.session_aggregates.get(key)
+                total_collected_so_far = totals["total_collected"] if totals else 0.0
+                total_collected_so_far += self._pending_collected.get(key, 0.0)
+                self._pending_collected[key] = self._pending_collected.get(key, 0.0) + amount_collected
             new_total_collected = total_collected_so_far + amount_collected
             
-            # Calculate remaining balance based on payment method
-            if payment_method == "pay_per_session":
-                # For pay-per-session clients, show total collected (not negative balance)
-                remaining_balance = 0  # Or could be new_total_collected to show cumulative
-            else:
-                # For upfront deposit clients, show remaining balance
-                remaining_balance = total_package_amount - new_total_collected
-            
-            # Prepare row data matching actual sheet columns:
-            # A:Client ID, B:Client Name, C:Coaching Type, D:Coaching Hours,
-            # E:Amount Paid ($), F:Amount Collected, G:Amount Balance,
-            # H:Session Date, I:Payment Method, J:Contract Number, K:Invoice Number, L:Created At, M:Notes
-            row = [
-                client_id,                              # A: Client ID
-                session_data.get("client_name", ""),   # B: Client Name
-                session_data.get("coaching_type", ""), # C: Coaching Type
-                str(session_data.get("coaching_hours", 0)), # D: Coaching Hours
-                str(total_package_amount),              # E: Amount Paid ($) - client's total package
-                str(amount_collected),                  # F: Amount Collected - this session
-                str(remaining_balance),                 # G: Amount Balance - remaining after this session
-                session_data.get("session_date", ""),  # H: Session Date
-                payment_method,                         # I: Payment Method
-                contract_number,                        # J: Contract Number
-                invoice_number,                         # K: Invoice Number
-                datetime.utcnow().isoformat(),         # L: Created At
-                session_data.get("notes", "")          # M: Notes
-            ]
-            
-            # Append to Sessions sheet
-            result = self.service.spreadsheets().values().append(
-                spreadsheetId=self.sessions_sheet_id,
-                range='A:M',
-                valueInputOption='USER_ENTERED',
-                body={'values': [row]}
-            ).execute()
+            # Pay-per-session clients show no balance; upfront deposits count down
+            balance = remaining_balance(payment_method, total_package_amount, new_total_collected)
+            
+            # Lay the row out under the header the sheet was loaded with (by
+            # default A:Client ID, B:Client Name, ... M:Notes), as reads decode it
+            row = self.session_decoder.encode({
+                "client_id": client_id,
+                "client_name": session_data.get("client_name", ""),
+                "coaching_type": session_data.get("coaching_type", ""),
+                "coaching_hours": str(session_data.get("coaching_hours", 0)),
+                "amount_paid": str(total_package_amount),      # client's total package
+                "amount_collected": str(amount_collected),     # this session
+                "amount_balance": str(balance),                # remaining after this session
+                "session_date": session_data.get("session_date", ""),
+                "payment_method": payment_method,
+                "contract_number": contract_number,
+                "invoice_number": invoice_number,
+                "created_at": datetime.utcnow().isoformat(),
+                "notes": session_data.get("notes", "")
+            })
+            
+            # Queue for the next batched append to the Sessions sheet
+            updated_range = self.session_appends.submit(row)
             
             logger.info(f"Session added for client: {client_name} with invoice: {invoice_number}")
-            return result.get('updates', {}).get('updatedRange', '')
+            return updated_range
         
         except HttpError as e:
             logger.error(f"HTTP error adding session: {e}")
@@ -408,87 +1088,287 @@ class GoogleSheetsService:
             logger.error(f"Error adding session: {e}")
             raise
     
+    @staticmethod
+    def _split_appended_range(updated_range: str, count: int) -> List[str]:
+        """Split a multi-row append range ('Sheet1!A5:N7') into one range per row."""
+        import re
+        match = re.fullmatch(r"(.*!)?([A-Z]+)(\d+):([A-Z]+)(\d+)", updated_range or "")
+        if not match:
+            # Unknown layout: callers get the whole range, write-through will reload
+            return [updated_range] * count
+        
+        prefix, first_col, first_row, last_col, _ = match.groups()
+        prefix = prefix or ""
+        first_row = int(first_row)
+        return [f"{prefix}{first_col}{first_row + i}:{last_col}{first_row + i}" for i in range(count)]
+    
+    def _append_client_rows(self, rows: List[List[str]]) -> List[str]:
+        """Append a batch of client rows in one call and cache them; returns each row's range."""
+        result = self.execute(self.service.spreadsheets().values().append(
+            spreadsheetId=self.clients_sheet_id,
+            range=f'A:{column_letter(self.client_decoder.width - 1)}',
+            valueInputOption='USER_ENTERED',
+            body={'values': rows}
+        ), write=True, idempotent=False)
+        self._record_write("clients", self.clients_sheet_id)
+        
+        # Write-through: cache the new rows at the position the sheet reports
+        updated_ranges = self._split_appended_range(result.get('updates', {}).get('updatedRange', ''), len(rows))
+        for row, updated_range in zip(rows, updated_ranges):
+            self._cache_appended_client(row, updated_range)
+        
+        if len(rows) > 1:
+            logger.info(f"Appended {len(rows)} client rows in one batch")
+        return updated_ranges
+    
+    def _append_session_rows(self, rows: List[List[str]]) -> List[str]:
+        """Append a batch of session rows in one call and cache them; returns each row's range."""
+        try:
+            result = self.execute(self.service.spreadsheets().values().append(
+                spreadsheetId=self.sessions_sheet_id,
+                range=f'A:{column_letter(self.session_decoder.width - 1)}',
+                valueInputOption='USER_ENTERED',
+                body={'values': rows}
+            ), write=True, idempotent=False)
+        except Exception:
+            with self.session_sheet.lock.write_locked():
+                self._release_pending_sessions(rows)
+            raise
+        self._record_write("sessions", self.sessions_sheet_id)
+        
+        updated_ranges = self._split_appended_range(result.get('updates', {}).get('updatedRange', ''), len(rows))
+        with self.session_sheet.lock.write_locked():
+            for row, updated_range in zip(rows, updated_ranges):
+                # Apply the row to the session cache when it lands right after the
+                # loaded tail; otherwise someone else appended too, so tail-sync next read
+                row_number = self._parse_row_number(updated_range)
+                if self.session_rows_loaded and row_number == self.session_rows_loaded + 1:
+                    session = self._parse_session_row(row, row_number)
+                    if session:
+                        self.session_cache.append(session)
+                        self._index_session(session)
+                    self.session_rows_loaded = row_number
+                    self.session_last_key = self._session_row_key(row)
+                    self.session_sheet.mark_changed()
+                    added = [session] if session else []
+                    self._queue_replica_change(
+                        self.session_sheet, lambda added=added: self.replica.upsert_sessions(added)
+                    )
+                else:
+                    self.session_sheet.expire()
+            self._release_pending_sessions(rows)
+        self._mirror_to_replica()
+        
+        if len(rows) > 1:
+            logger.info(f"Appended {len(rows)} session rows in one batch")
+        return updated_ranges
+    
+    def _release_pending_sessions(self, rows: List[List[str]]):
+        """Drop appended (or failed) session rows from the pending totals (write lock held)."""
+        cell = self.session_decoder.cell
+        for row in rows:
+            key = cell(row, "client_name").lower()
+            remaining = self._pending_collected.get(key, 0.0) - float(cell(row, "amount_collected") or 0)
+            if abs(remaining) < 1e-9:
+                self._pending_collected.pop(key, None)
+            else:
+                self._pending_collected[key] = remaining
+    
     def check_duplicate_client(self, name: str, email: str) -> Optional[Dict[str, Any]]:
         """Check if a client already exists by email only (emails must be unique)."""
-        max_retries = 2
-        retry_count = 0
-        
-        while retry_count <= max_retries:
-            try:
-                clients = self.get_all_clients()
-                
-                # Only check email for duplicates since emails should be globally unique
-                # But allow multiple people with the same name
-                for client in clients:
-                    if client.get("email", "").lower() == email.lower():
-                        logger.info(f"Found duplicate email: {email} (client: {client.get('name')})")
-                        return client
-                
-                return None
+        try:
+            # Writes must not trust a stale-while-revalidate list; throttled
+            # reads are already retried by the quota scheduler
+            self.refresh_caches(clients=True, sessions=False)
             
-            except Exception as e:
-                retry_count += 1
-                if retry_count > max_retries:
-                    logger.error(f"Error checking duplicate client after {max_retries} retries: {e}")
-                    raise
-                else:
-                    logger.warning(f"Retry {retry_count}/{max_retries} for duplicate check due to: {e}")
-                    import time
-                    time.sleep(0.5 * retry_count)  # Brief backoff
+            # Only check email for duplicates since emails should be globally unique
+            # But allow multiple people with the same name
+            if self.replica:
+                # The refresh mirrored into the replica, which also holds other workers' write-throughs
+                client = self._ensure_replica().client_by_email(email)
+            else:
+                with self.client_sheet.lock.read_locked():
+                    client = self.client_email_index.get(email.lower())
+            if client:
+                logger.info(f"Found duplicate email: {email} (client: {client.get('name')})")
+            
+            return client
+        
+        except Exception as e:
+            logger.error(f"Error checking duplicate client: {e}")
+            raise
     
     def get_client_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """Get a specific client by name."""
         try:
-            clients = self.get_all_clients()
+            if self.replica:
+                return self._ensure_replica().client_by_name(name)
             
-            for client in clients:
-                if client.get("name", "").lower() == name.lower():
-                    return client
+            # Refreshes the cache (and indexes) if it has expired
+            self.get_all_clients()
             
-            return None
+            with self.client_sheet.lock.read_locked():
+                return self.client_name_index.get(name.lower())
         
         except Exception as e:
             logger.error(f"Error getting client by name: {e}")
             raise
     
+    def _is_session_cache_valid(self) -> bool:
+        """Check if session cache is still valid."""
+        return self.session_sheet.is_fresh()
+    
+    def _invalidate_session_cache(self):
+        """Drop the session cache and its indexes."""
+        with self.session_sheet.lock.write_locked():
+            self._clear_session_data()
+            self.session_sheet.reset()
+    
+    def _clear_session_data(self):
+        """Empty the parsed sessions, indexes and tail-sync state (write lock held)."""
+        self.session_cache = []
+        self.session_name_index = {}
+        self.session_id_index = {}
+        self.session_rows_loaded = 0
+        self.session_header = None
+        self.session_last_key = None
+        self.session_aggregates = {}
+    
+    def _session_row_key(self, row: Optional[List[str]]) -> Optional[tuple]:
+        """Identify a Sessions row by the cells we write verbatim (id, name, invoice).
+        
+        Numeric and date cells are re-formatted by USER_ENTERED, so comparing
+        whole rows would not match a row we appended ourselves.
+        """
+        if row is None:
+            return None
+        cell = self.session_decoder.cell
+        return (cell(row, "client_id"), cell(row, "client_name"), cell(row, "invoice_number"))
+    
+    @staticmethod
+    def _parse_row_number(updated_range: str) -> Optional[int]:
+        """Return the first row number of an A1 range such as 'Sheet1!A57:M57'."""
+        import re
+        match = re.search(r'![A-Z]+(\d+)', updated_range or '')
+        return int(match.group(1)) if match else None
+    
+    def _parse_session_row(self, row: List[str], row_number: int) -> Optional[Dict[str, Any]]:
+        """Parse one Sessions sheet row, or return None if it is not a session."""
+        try:
+            return self.session_decoder.decode(row, row_number)
+        except ValueError as e:
+            logger.warning(f"Skipping malformed session row {row[:2]}: {e}")
+            return None
+    
+    def _index_session(self, session: Dict[str, Any]):
+        """Add a parsed session to the indexes and the client's running totals."""
+        name = session.get("client_name", "").lower()
+        if name:
+            self.session_name_index.setdefault(name, []).append(session)
+            
+            totals = self.session_aggregates.setdefault(name, {
+                "total_collected": 0.0,
+                "session_count": 0,
+                "hours_used": 0.0,
+                "last_session_date": ""
+            })
+            totals["total_collected"] += session.get("amount_collected", 0.0)
+            totals["session_count"] += 1
+            totals["hours_used"] += session.get("coaching_hours", 0.0)
+            totals["last_session_date"] = max(totals["last_session_date"], session.get("session_date", ""))
+        client_id = session.get("client_id", "")
+        if client_id:
+            self.session_id_index.setdefault(client_id, []).append(session)
+    
+    def _load_session_values(self, values: List[List[str]]):
+        """Rebuild the session cache from a full Sessions sheet read (write lock held)."""
+        # Map columns from the header row, then rebuild cache and indexes together
+        self._clear_session_data()
+        self.session_header = values[0] if values else []
+        self.session_decoder = SESSION_SCHEMA.decoder(self.session_header)
+        sessions = []
+        for row_number, row in enumerate(values[1:], start=2):
+            session = self._parse_session_row(row, row_number)
+            if session:
+                sessions.append(session)
+                self._index_session(session)
+        
+        self.session_cache = sessions
+        self._seed_session_numbers(self.session_decoder.cell(row, "invoice_number") for row in values[1:])
+        self.session_rows_loaded = len(values)
+        self.session_last_key = self._session_row_key(values[-1]) if values else None
+        self.session_sheet.mark_loaded()
+        
+        logger.info(f"Retrieved {len(sessions)} sessions from sheet (full load)")
+    
+    def _apply_session_tail(self, header_values: List[List[str]], tail: List[List[str]]) -> bool:
+        """Apply rows appended since the last load (read from A{n} onwards).
+        
+        The tail starts with the last row already loaded so that edits or
+        deletions above it are noticed. Returns False when the sheet no longer
+        matches what was loaded and a full reload is needed. Call with the
+        write lock held.
+        """
+        header = header_values[0] if header_values else []
+        if header != self.session_header:
+            logger.info("Sessions header changed, reloading sheet")
+            return False
+        
+        # Row count went down or the last row changed underneath us
+        if not tail or self._session_row_key(tail[0]) != self.session_last_key:
+            logger.info("Sessions sheet changed above the loaded tail, reloading sheet")
+            return False
+        
+        new_rows = tail[1:]
+        for row_number, row in enumerate(new_rows, start=self.session_rows_loaded + 1):
+            session = self._parse_session_row(row, row_number)
+            if session:
+                self.session_cache.append(session)
+                self._index_session(session)
+        
+        self._seed_session_numbers(self.session_decoder.cell(row, "invoice_number") for row in new_rows)
+        self.session_rows_loaded += len(new_rows)
+        self.session_last_key = self._session_row_key(tail[-1])
+        self.session_sheet.mark_loaded()
+        
+        logger.info(f"Synced {len(new_rows)} new session rows")
+        return True
+    
+    def get_all_sessions(self) -> List[Dict[str, Any]]:
+        """Fetch all sessions from the Sessions sheet (cached, tail-synced)."""
+        try:
+            # Return cached data if valid
+            if self._is_session_cache_valid():
+                return self.session_cache
+            
+            # Restored from a snapshot: answer now, revalidate in the background
+            if self.session_sheet.restored and self._can_serve_stale(self.session_sheet, 0):
+                logger.info("Returning snapshot sessions while revalidating")
+                self._start_background_refresh(clients=False, sessions=True)
+                return self.session_cache
+            
+            self.refresh_caches(clients=False, sessions=True)
+            return self.session_cache
+        
+        except HttpError as e:
+            logger.error(f"HTTP error fetching sessions: {e}")
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching sessions: {e}")
+            raise
+    
     def get_client_history(self, client_name: str) -> List[Dict[str, Any]]:
         """Fetch all sessions for a specific client."""
         try:
-            # Read from Sessions sheet
-            result = self.service.spreadsheets().values().get(
-                spreadsheetId=self.sessions_sheet_id,
-                range='A:M'
-            ).execute()
-            
-            values = result.get('values', [])
-            
-            if not values:
-                logger.warning(f"No session history found for client: {client_name}")
-                return []
-            
-            # Parse header and data rows
-            # Actual columns: A:Client ID, B:Client Name, C:Coaching Type, D:Coaching Hours,
-            # E:Amount Paid ($), F:Amount Collected, G:Amount Balance,
-            # H:Session Date, I:Payment Method, J:Contract Number, K:Invoice Number, L:Created At, M:Notes
-            sessions = []
-            
-            for row in values[1:]:
-                # Match by client name (column B, index 1)
-                if len(row) >= 6 and row[1].lower() == client_name.lower():
-                    session = {
-                        "client_id": row[0],
-                        "client_name": row[1],
-                        "coaching_type": row[2],
-                        "coaching_hours": float(row[3]) if row[3] else 0.0,
-                        "amount_collected": float(row[5]) if len(row) > 5 and row[5] else 0.0,
-                        "session_date": row[7] if len(row) > 7 else "",
-                        "payment_method": row[8] if len(row) > 8 else "upfront_deposit",
-                        "contract_number": row[9] if len(row) > 9 else "",
-                        "invoice_number": row[10] if len(row) > 10 else "",
-                        "created_at": row[11] if len(row) > 11 else "",
-                        "notes": row[12] if len(row) > 12 else ""
-                    }
-                    sessions.append(session)
+            if self.replica:
+                sessions = self._ensure_replica().sessions_for_client(client_name)
+            else:
+                # Refreshes the cache (and indexes) if it has expired
+                self.get_all_sessions()
+                
+                # Copy so callers cannot mutate the index
+                with self.session_sheet.lock.read_locked():
+                    sessions = list(self.session_name_index.get(client_name.lower(), []))
             
             logger.info(f"Retrieved {len(sessions)} sessions for client: {client_name}")
             return sessions
@@ -500,31 +1380,117 @@ class GoogleSheetsService:
             logger.error(f"Error fetching client history: {e}")
             raise
     
+    def get_session_totals(self, client_name: str) -> Dict[str, Any]:
+        """Get a client's running session totals without scanning their history."""
+        if self.replica:
+            return self._ensure_replica().session_totals(client_name)
+        
+        self.get_all_sessions()
+        
+        with self.session_sheet.lock.read_locked():
+            totals = self.session_aggregates.get(client_name.lower())
+            if totals:
+                return dict(totals)
+        
+        return {
+            "total_collected": 0.0,
+            "session_count": 0,
+            "hours_used": 0.0,
+            "last_session_date": ""
+        }
+    
+    def get_client_balance(self, client_name: str) -> Optional[Dict[str, Any]]:
+        """Get package, collected and remaining balance for a client."""
+        try:
+            client = self.get_client_by_name(client_name)
+            if not client:
+                return None
+            
+            totals = self.get_session_totals(client_name)
+            total_package = float(client.get("amount_paid", 0))
+            total_collected = totals["total_collected"]
+            
+            return {
+                "total_package": total_package,
+                "total_collected": total_collected,
+                "remaining_balance": remaining_balance(
+                    client.get("payment_method", "upfront_deposit"), total_package, total_collected
+                ),
+                "session_count": totals["session_count"],
+                "hours_used": totals["hours_used"],
+                "last_session_date": totals["last_session_date"]
+            }
+        
+        except Exception as e:
+            logger.error(f"Error getting client balance: {e}")
+            raise
+    
+    def get_client_history_by_id(self, client_id: str) -> List[Dict[str, Any]]:
+        """Fetch all sessions for a specific client ID."""
+        try:
+            if self.replica:
+                return self._ensure_replica().sessions_for_client_id(client_id)
+            
+            self.get_all_sessions()
+            with self.session_sheet.lock.read_locked():
+                return list(self.session_id_index.get(client_id, []))
+        
+        except Exception as e:
+            logger.error(f"Error fetching client history by id: {e}")
+            raise
+    
+    def get_client_row(self, client_id: str) -> Optional[int]:
+        """Get the sheet row number of a client by ID."""
+        self.get_all_clients()
+        with self.client_sheet.lock.read_locked():
+            return self.client_row_index.get(client_id)
+    
     def update_client_end_date(self, client_name: str, new_end_date: str) -> bool:
         """Update a client's end date."""
+        return self.update_client_fields(client_name, {"end_date": new_end_date})
+    
+    def update_client_fields(self, client_name: str, fields: Dict[str, Any]) -> bool:
+        """Update several fields of one client in a single values().batchUpdate."""
         try:
-            clients = self.get_all_clients()
-            
-            # Find the row number
-            for idx, client in enumerate(clients, start=2):  # Start at 2 (skip header)
-                if client.get("name", "").lower() == client_name.lower():
-                    # Update the end date (Column F in new structure)
-                    self.service.spreadsheets().values().update(
-                        spreadsheetId=self.clients_sheet_id,
-                        range=f'F{idx}',
-                        valueInputOption='USER_ENTERED',
-                        body={'values': [[new_end_date]]}
-                    ).execute()
-                    
-                    # Invalidate cache
-                    self.client_cache = {}
-                    self.cache_timestamp = None
-                    
-                    logger.info(f"Updated end date for client: {client_name}")
-                    return True
-            
-            logger.warning(f"Client not found for update: {client_name}")
-            return False
+            # Writes must not trust a stale-while-revalidate list
+            self.refresh_caches(clients=True, sessions=False)
+            
+            with self.client_sheet.lock.read_locked():
+                client = self.client_name_index.get(client_name.lower())
+                # The cached record knows its sheet row: no scan, no extra read
+                row_number = self.client_row_index.get(client["client_id"]) if client else None
+                positions = self.client_decoder.positions
+            
+            if not client:
+                logger.warning(f"Client not found for update: {client_name}")
+                return False
+            
+            missing = [key for key in fields if key == "client_id" or key not in positions]
+            if missing:
+                raise ValueError(f"Cannot update client fields: {', '.join(missing)}")
+            
+            # Columns come from the header the sheet was loaded with
+            self.execute(self.service.spreadsheets().values().batchUpdate(
+                spreadsheetId=self.clients_sheet_id,
+                body={
+                    'valueInputOption': 'USER_ENTERED',
+                    'data': [
+                        {'range': f'{column_letter(positions[key])}{row_number}', 'values': [[value]]}
+                        for key, value in fields.items()
+                    ]
+                }
+            ), write=True)
+            self._record_write("clients", self.clients_sheet_id)
+            
+            # Write-through: patch the cached client instead of reloading (the
+            # lookup indexes are keyed by name and email, so those reload)
+            if "name" in fields or "email" in fields:
+                self._invalidate_client_cache()
+            else:
+                self._cache_patch_client(client, **fields)
+            
+            logger.info(f"Updated {', '.join(fields)} for client: {client_name} (row {row_number})")
+            return True
         
         except HttpError as e:
             logger.error(f"HTTP error updating client: {e}")
@@ -540,7 +1506,7 @@ class GoogleSheetsService:
             start_index = start_row - 1
             end_index = end_row
             
-            request = self.service.spreadsheets().batchUpdate(
+            self.execute(self.service.spreadsheets().batchUpdate(
                 spreadsheetId=self.clients_sheet_id,
                 body={
                     'requests': [
@@ -556,11 +1522,11 @@ class GoogleSheetsService:
                         }
                     ]
                 }
-            ).execute()
+            ), write=True, idempotent=False)
+            self._record_write("clients", self.clients_sheet_id)
             
-            # Invalidate cache
-            self.client_cache = {}
-            self.cache_timestamp = None
+            # Write-through: splice the rows out of the cache and renumber
+            self._cache_delete_client_rows(start_row, end_row)
             
             logger.info(f"Deleted rows {start_row}-{end_row} from sheet")
             return True
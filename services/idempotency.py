@@ -0,0 +1,96 @@
+"""Idempotency-Key handling for form submissions."""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+class IdempotencyConflict(Exception):
+    """An Idempotency-Key was reused for a different request body."""
+
+
+class _Entry:
+    """One key: in flight until ``done`` is set, then holds the stored result."""
+
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.done = threading.Event()
+        self.result: Any = None
+        self.stored = False
+        self.expires_at = 0.0
+
+
+class IdempotencyStore:
+    """Remembers the result of recent requests by Idempotency-Key.
+
+    The first request with a key runs; repeats get its stored result without
+    running again, and repeats that arrive while it is still running wait for
+    it. Results that should not be replayed (``keep`` returns False, e.g. a
+    failure that wrote nothing) or that raise are forgotten so a retry runs
+    afresh. Entries expire after ``ttl`` seconds and the least recently used
+    are evicted beyond ``max_entries``. The store is per process.
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 86400):
+        """Initialize idempotency store."""
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+
+    def run(self, key: Hashable, fingerprint: str, fn: Callable[[], Any],
+            keep: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, bool]:
+        """Run fn once per key; returns (result, replayed).
+
+        Raises IdempotencyConflict if the key was used with another fingerprint.
+        """
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry is not None and entry.stored and entry.expires_at <= time.monotonic():
+                    del self._entries[key]
+                    entry = None
+                if entry is not None and entry.fingerprint != fingerprint:
+                    raise IdempotencyConflict(f"Idempotency key reused with a different request: {key}")
+
+                if entry is None:
+                    entry = self._entries[key] = _Entry(fingerprint)
+                    self._evict()
+                    break
+                self._entries.move_to_end(key)
+
+            entry.done.wait()
+            if entry.stored:
+                return entry.result, True
+            # The first attempt failed or was not kept: try to run it ourselves
+
+        try:
+            entry.result = fn()
+            if keep is None or keep(entry.result):
+                with self._lock:
+                    entry.stored = True
+                    entry.expires_at = time.monotonic() + self.ttl
+            return entry.result, False
+        finally:
+            if not entry.stored:
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+            entry.done.set()
+
+    def _evict(self):
+        """Drop the least recently used finished entries beyond max_entries (lock held)."""
+        for key in list(self._entries):
+            if len(self._entries) <= self.max_entries:
+                break
+            if self._entries[key].done.is_set():
+                del self._entries[key]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
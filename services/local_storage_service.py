@@ -0,0 +1,366 @@
+"""Local SQLite storage backend for Coaching Portal."""
+
+import logging
+import sqlite3
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+from services.sqlite_store import SQLiteStore
+from services.storage_backend import CLIENT_FIELDS, project_clients, projected_fields, remaining_balance
+
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    address TEXT NOT NULL DEFAULT '',
+    contact TEXT NOT NULL DEFAULT '',
+    email TEXT NOT NULL DEFAULT '',
+    email_lower TEXT NOT NULL DEFAULT '',
+    package_type TEXT NOT NULL DEFAULT '',
+    start_date TEXT NOT NULL DEFAULT '',
+    end_date TEXT NOT NULL DEFAULT '',
+    amount_paid REAL NOT NULL DEFAULT 0,
+    payment_method TEXT NOT NULL DEFAULT 'upfront_deposit',
+    contract_number TEXT NOT NULL DEFAULT '',
+    invoice_number TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_clients_client_id ON clients (client_id);
+CREATE INDEX IF NOT EXISTS idx_clients_name ON clients (name_lower);
+CREATE INDEX IF NOT EXISTS idx_clients_email ON clients (email_lower);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id TEXT NOT NULL DEFAULT '',
+    client_name TEXT NOT NULL,
+    client_name_lower TEXT NOT NULL,
+    coaching_type TEXT NOT NULL DEFAULT '',
+    coaching_hours REAL NOT NULL DEFAULT 0,
+    amount_paid REAL NOT NULL DEFAULT 0,
+    amount_collected REAL NOT NULL DEFAULT 0,
+    amount_balance REAL NOT NULL DEFAULT 0,
+    session_date TEXT NOT NULL DEFAULT '',
+    payment_method TEXT NOT NULL DEFAULT 'upfront_deposit',
+    contract_number TEXT NOT NULL DEFAULT '',
+    invoice_number TEXT NOT NULL DEFAULT '',
+    created_at TEXT NOT NULL DEFAULT '',
+    notes TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_client_id ON sessions (client_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_client_name ON sessions (client_name_lower);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions (session_date);
+CREATE INDEX IF NOT EXISTS idx_sessions_invoice ON sessions (invoice_number);
+
+CREATE TABLE IF NOT EXISTS counters (
+    sequence TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+SESSION_COLUMNS = ("client_id", "client_name", "coaching_type", "coaching_hours", "amount_collected",
+                   "session_date", "payment_method", "contract_number", "invoice_number",
+                   "created_at", "notes")
+
+
+class LocalStorageService(SQLiteStore):
+    """Stores clients and sessions in a local SQLite database.
+
+    A drop-in for GoogleSheetsService (see StorageBackend) for shops that
+    want LAN-speed storage and for benchmarks that should not include Google
+    latency. Rows keep sheet-style ``row_number`` values (header = row 1) and
+    numbers are allocated from counters inside the write transaction, so
+    several worker processes can share one database.
+    """
+
+    def __init__(self, path: str):
+        """Initialize local storage."""
+        super().__init__(path, SCHEMA)
+        logger.info(f"Local storage initialized at {path}")
+
+    @staticmethod
+    def _next_number(conn: sqlite3.Connection, sequence: str) -> int:
+        """Increment and return a counter (call inside a transaction)."""
+        conn.execute("INSERT OR IGNORE INTO counters (sequence, value) VALUES (?, 0)", (sequence,))
+        conn.execute("UPDATE counters SET value = value + 1 WHERE sequence = ?", (sequence,))
+        return conn.execute("SELECT value FROM counters WHERE sequence = ?", (sequence,)).fetchone()[0]
+
+    @staticmethod
+    def _client_dict(row: sqlite3.Row, row_number: int) -> Dict[str, Any]:
+        client = {column: row[column] for column in CLIENT_FIELDS}
+        client["row_number"] = row_number
+        return client
+
+    @staticmethod
+    def _session_dict(row: sqlite3.Row, row_number: int) -> Dict[str, Any]:
+        session = {column: row[column] for column in SESSION_COLUMNS}
+        session["row_number"] = row_number
+        return session
+
+    def _find_client(self, conn: sqlite3.Connection, column: str, value: str) -> Optional[Dict[str, Any]]:
+        """First client whose indexed column matches, with its sheet-style row number."""
+        row = conn.execute(
+            f"SELECT *, (SELECT COUNT(*) FROM clients c WHERE c.id <= clients.id) + 1 AS row_number "
+            f"FROM clients WHERE {column} = ? ORDER BY id LIMIT 1",
+            (value,)
+        ).fetchone()
+        return self._client_dict(row, row["row_number"]) if row else None
+
+    def refresh_caches(self, clients: bool = True, sessions: bool = True):
+        """Nothing to warm: every read is a local query."""
+
+    def get_all_clients(self) -> List[Dict[str, Any]]:
+        """Fetch all clients."""
+        try:
+            rows = self._connect().execute("SELECT * FROM clients ORDER BY id").fetchall()
+            return [self._client_dict(row, row_number) for row_number, row in enumerate(rows, start=2)]
+        except Exception as e:
+            logger.error(f"Error fetching clients: {e}")
+            raise
+
+    def get_client_columns(self, fields: List[str]) -> List[Dict[str, Any]]:
+        """Fetch only the given fields of every client."""
+        return project_clients(self.get_all_clients(), projected_fields(fields))
+
+    def get_client_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Get a specific client by name."""
+        try:
+            return self._find_client(self._connect(), "name_lower", name.lower())
+        except Exception as e:
+            logger.error(f"Error getting client by name: {e}")
+            raise
+
+    def check_duplicate_client(self, name: str, email: str) -> Optional[Dict[str, Any]]:
+        """Check if a client already exists by email only (emails must be unique)."""
+        client = self._find_client(self._connect(), "email_lower", email.lower())
+        if client:
+            logger.info(f"Found duplicate email: {email} (client: {client.get('name')})")
+        return client
+
+    def get_max_contract_number(self) -> str:
+        """Allocate the next contract number (CT-YYYY-###) for the current year."""
+        current_year = datetime.utcnow().year
+        with self._transaction() as conn:
+            next_num = self._next_number(conn, f"contract-{current_year}")
+        return f"CT-{current_year}-{str(next_num).zfill(3)}"
+
+    def get_max_invoice_number(self) -> str:
+        """Allocate the next client invoice number (INV-5XXX format)."""
+        with self._transaction() as conn:
+            next_num = self._next_number(conn, "client-invoice")
+        return f"INV-5{str(next_num).zfill(3)}"
+
+    def get_max_session_invoice_number(self) -> str:
+        """Allocate the next session invoice number (INV-001 format)."""
+        with self._transaction() as conn:
+            next_num = self._next_number(conn, "session-invoice")
+        return f"INV-{str(next_num).zfill(3)}"
+
+    def add_new_client(self, client_data: Dict[str, Any]) -> str:
+        """Add a new client, allocating its contract and invoice numbers."""
+        try:
+            current_year = datetime.utcnow().year
+            email = client_data.get("email", "")
+            with self._transaction() as conn:
+                contract_num = self._next_number(conn, f"contract-{current_year}")
+                invoice_num = self._next_number(conn, "client-invoice")
+                conn.execute(
+                    "INSERT INTO clients (client_id, name, name_lower, address, contact, email, email_lower, "
+                    "package_type, start_date, end_date, amount_paid, payment_method, contract_number, "
+                    "invoice_number, created_at, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        f"CL-{uuid.uuid4().hex[:8].upper()}",
+                        client_data.get("name", ""),
+                        client_data.get("name", "").lower(),
+                        client_data.get("address", ""),
+                        client_data.get("contact", ""),
+                        email,
+                        email.lower(),
+                        client_data.get("package_type", ""),
+                        client_data.get("start_date", ""),
+                        client_data.get("end_date", ""),
+                        float(client_data.get("amount_paid", 0) or 0),
+                        client_data.get("payment_method", "upfront_deposit"),
+                        f"CT-{current_year}-{str(contract_num).zfill(3)}",
+                        f"INV-5{str(invoice_num).zfill(3)}",
+                        datetime.utcnow().isoformat(),
+                        client_data.get("notes", "")
+                    )
+                )
+                row_number = conn.execute("SELECT COUNT(*) FROM clients").fetchone()[0] + 1
+
+            logger.info(f"New client added: {client_data.get('name')}")
+            return f"Clients!A{row_number}:N{row_number}"
+
+        except Exception as e:
+            logger.error(f"Error adding client: {e}")
+            raise
+
+    def add_session(self, session_data: Dict[str, Any], client: Optional[Dict[str, Any]] = None) -> str:
+        """Record a coaching session with its running balance.
+
+        ``client`` is ignored: the client is re-read inside the write transaction.
+        """
+        try:
+            client_name = session_data.get("client_name", "")
+            amount_collected = float(session_data.get("amount_collected", 0))
+
+            with self._transaction() as conn:
+                client = self._find_client(conn, "name_lower", client_name.lower())
+                total_package = float(client.get("amount_paid", 0)) if client else 0.0
+                payment_method = client.get("payment_method", "upfront_deposit") if client else "upfront_deposit"
+
+                collected_so_far = conn.execute(
+                    "SELECT COALESCE(SUM(amount_collected), 0) FROM sessions WHERE client_name_lower = ?",
+                    (client_name.lower(),)
+                ).fetchone()[0]
+                invoice_num = self._next_number(conn, "session-invoice")
+                invoice_number = f"INV-{str(invoice_num).zfill(3)}"
+
+                conn.execute(
+                    "INSERT INTO sessions (client_id, client_name, client_name_lower, coaching_type, "
+                    "coaching_hours, amount_paid, amount_collected, amount_balance, session_date, "
+                    "payment_method, contract_number, invoice_number, created_at, notes) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        client.get("client_id", "") if client else "",
+                        client_name,
+                        client_name.lower(),
+                        session_data.get("coaching_type", ""),
+                        float(session_data.get("coaching_hours", 0) or 0),
+                        total_package,
+                        amount_collected,
+                        remaining_balance(payment_method, total_package, collected_so_far + amount_collected),
+                        session_data.get("session_date", ""),
+                        payment_method,
+                        client.get("contract_number", "") if client else "",
+                        invoice_number,
+                        datetime.utcnow().isoformat(),
+                        session_data.get("notes", "")
+                    )
+                )
+                row_number = conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0] + 1
+
+            logger.info(f"Session added for client: {client_name} with invoice: {invoice_number}")
+            return f"Sessions!A{row_number}:M{row_number}"
+
+        except Exception as e:
+            logger.error(f"Error adding session: {e}")
+            raise
+
+    def get_all_sessions(self) -> List[Dict[str, Any]]:
+        """Fetch all sessions."""
+        rows = self._connect().execute("SELECT * FROM sessions ORDER BY id").fetchall()
+        return [self._session_dict(row, row_number) for row_number, row in enumerate(rows, start=2)]
+
+    def get_client_history(self, client_name: str) -> List[Dict[str, Any]]:
+        """Fetch all sessions for a specific client."""
+        try:
+            rows = self._connect().execute(
+                "SELECT *, (SELECT COUNT(*) FROM sessions s WHERE s.id <= sessions.id) + 1 AS row_number "
+                "FROM sessions WHERE client_name_lower = ? ORDER BY id",
+                (client_name.lower(),)
+            ).fetchall()
+            return [self._session_dict(row, row["row_number"]) for row in rows]
+        except Exception as e:
+            logger.error(f"Error fetching client history: {e}")
+            raise
+
+    def get_session_totals(self, client_name: str) -> Dict[str, Any]:
+        """Get a client's session totals with one aggregate query."""
+        total_collected, session_count, hours_used, last_session_date = self._connect().execute(
+            "SELECT COALESCE(SUM(amount_collected), 0), COUNT(*), COALESCE(SUM(coaching_hours), 0), "
+            "COALESCE(MAX(session_date), '') FROM sessions WHERE client_name_lower = ?",
+            (client_name.lower(),)
+        ).fetchone()
+        return {
+            "total_collected": float(total_collected),
+            "session_count": session_count,
+            "hours_used": float(hours_used),
+            "last_session_date": last_session_date
+        }
+
+    def get_client_balance(self, client_name: str) -> Optional[Dict[str, Any]]:
+        """Get package, collected and remaining balance for a client."""
+        client = self.get_client_by_name(client_name)
+        if not client:
+            return None
+
+        totals = self.get_session_totals(client_name)
+        total_package = float(client.get("amount_paid", 0))
+        return {
+            "total_package": total_package,
+            "total_collected": totals["total_collected"],
+            "remaining_balance": remaining_balance(
+                client.get("payment_method", "upfront_deposit"), total_package, totals["total_collected"]
+            ),
+            "session_count": totals["session_count"],
+            "hours_used": totals["hours_used"],
+            "last_session_date": totals["last_session_date"]
+        }
+
+    def update_client_end_date(self, client_name: str, new_end_date: str) -> bool:
+        """Update a client's end date."""
+        return self.update_client_fields(client_name, {"end_date": new_end_date})
+
+    def update_client_fields(self, client_name: str, fields: Dict[str, Any]) -> bool:
+        """Update several fields of one client in one statement."""
+        unknown = [key for key in fields if key == "client_id" or key not in CLIENT_FIELDS]
+        if unknown:
+            raise ValueError(f"Cannot update client fields: {', '.join(unknown)}")
+
+        columns = dict(fields)
+        for key in ("name", "email"):
+            if key in fields:
+                columns[f"{key}_lower"] = str(fields[key]).lower()
+
+        try:
+            with self._transaction() as conn:
+                cursor = conn.execute(
+                    f"UPDATE clients SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = "
+                    "(SELECT id FROM clients WHERE name_lower = ? ORDER BY id LIMIT 1)",
+                    (*columns.values(), client_name.lower())
+                )
+            if not cursor.rowcount:
+                logger.warning(f"Client not found for update: {client_name}")
+                return False
+
+            logger.info(f"Updated {', '.join(fields)} for client: {client_name}")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error updating client: {e}")
+            raise
+
+    @contextmanager
+    def count_calls(self) -> Iterator[Counter]:
+        """Local storage makes no Sheets API calls: the counter stays empty."""
+        yield Counter()
+
+    def delete_rows(self, start_row: int, end_row: int) -> bool:
+        """Delete client rows (1-indexed like the sheet; row 1 is the header)."""
+        if start_row < 2 or end_row < start_row:
+            raise ValueError(f"Invalid client row range: {start_row}-{end_row}")
+
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "DELETE FROM clients WHERE id IN (SELECT id FROM clients ORDER BY id LIMIT ? OFFSET ?)",
+                    (end_row - start_row + 1, start_row - 2)
+                )
+
+            logger.info(f"Deleted rows {start_row}-{end_row} from local storage")
+            return True
+
+        except Exception as e:
+            logger.error(f"Error deleting rows: {e}")
+            raise
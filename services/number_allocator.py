@@ -0,0 +1,130 @@
+"""Contract and invoice number allocation for Coaching Portal."""
+
+import logging
+import os
+import threading
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to per-process allocation
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class NumberAllocator:
+    """Hands out sequential numbers from in-memory high-water marks.
+
+    Each named sequence is seeded from the highest number found in the sheet.
+    Numbers are then reserved in blocks of ``block_size``; when ``state_dir``
+    is set, blocks are claimed through a locked high-water file so that
+    several worker processes never hand out the same number.
+    """
+
+    def __init__(self, block_size: int = 1, state_dir: Optional[str] = None):
+        """Initialize allocator."""
+        self.block_size = max(1, block_size)
+        self.state_dir = state_dir
+        self._lock = threading.Lock()
+        self._seeded: Dict[str, int] = {}
+        self._blocks: Dict[str, List[int]] = {}
+
+        if self.state_dir:
+            try:
+                os.makedirs(self.state_dir, exist_ok=True)
+            except OSError as e:
+                logger.warning(f"Number state dir unavailable, allocating per process: {e}")
+                self.state_dir = None
+
+    def is_seeded(self, sequence: str) -> bool:
+        """Check if a sequence has been seeded from the sheet."""
+        return sequence in self._seeded
+
+    def seed(self, sequence: str, sheet_max: int):
+        """Record the highest number seen in the sheet for a sequence.
+
+        High-water marks only move up. Any reserved numbers at or below
+        ``sheet_max`` were taken by someone else and are discarded. With a
+        shared high-water file, numbers up to the shared mark were handed out
+        by the worker processes themselves (another worker's block), so only
+        a sheet number above it counts as a collision.
+        """
+        with self._lock:
+            self._seeded[sequence] = max(self._seeded.get(sequence, 0), sheet_max)
+
+            block = self._blocks.get(sequence)
+            if block and block[0] <= sheet_max and sheet_max > self._shared_mark(sequence):
+                logger.info(f"Number collision on {sequence} (sheet has {sheet_max}), re-seeding")
+                if sheet_max >= block[1]:
+                    del self._blocks[sequence]
+                else:
+                    block[0] = sheet_max + 1
+
+    def allocate(self, sequence: str) -> int:
+        """Allocate the next number in a sequence."""
+        with self._lock:
+            block = self._blocks.get(sequence)
+            if not block:
+                block = self._reserve_block(sequence)
+                self._blocks[sequence] = block
+
+            number = block[0]
+            if number >= block[1]:
+                del self._blocks[sequence]
+            else:
+                block[0] = number + 1
+            return number
+
+    def _reserve_block(self, sequence: str) -> List[int]:
+        """Reserve the next block of numbers, shared across processes if possible."""
+        floor = self._seeded.get(sequence, 0)
+
+        if not self.state_dir or fcntl is None:
+            start = floor + 1
+            # Without a shared file, the seed itself tracks what was handed out
+            self._seeded[sequence] = start + self.block_size - 1
+            return [start, start + self.block_size - 1]
+
+        with open(self._state_path(sequence), "a+") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                shared = self._read_mark(handle)
+
+                start = max(shared, floor) + 1
+                end = start + self.block_size - 1
+
+                handle.seek(0)
+                handle.truncate()
+                handle.write(str(end))
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+        logger.debug(f"Reserved {sequence} numbers {start}-{end}")
+        return [start, end]
+
+    def _shared_mark(self, sequence: str) -> int:
+        """Read the shared high-water mark; -1 when numbers are allocated per process."""
+        if not self.state_dir or fcntl is None:
+            return -1
+
+        path = self._state_path(sequence)
+        if not os.path.exists(path):
+            return 0
+        with open(path, "r") as handle:
+            fcntl.flock(handle, fcntl.LOCK_SH)
+            try:
+                return self._read_mark(handle)
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def _state_path(self, sequence: str) -> str:
+        return os.path.join(self.state_dir, f"{sequence}.hwm")
+
+    @staticmethod
+    def _read_mark(handle) -> int:
+        handle.seek(0)
+        content = handle.read().strip()
+        return int(content) if content.isdigit() else 0
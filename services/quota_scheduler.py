@@ -0,0 +1,176 @@
+"""Quota-aware scheduling of Google Sheets API requests."""
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from googleapiclient.errors import HttpError
+
+from config import Config
+
+
+logger = logging.getLogger(__name__)
+
+
+# Statuses worth waiting out: quota exhausted, and the service briefly unavailable.
+# Only a 429 guarantees the request was not applied, so it is the only status
+# on which non-idempotent requests (appends) are retried
+RETRYABLE_STATUSES = {429, 503}
+THROTTLED_STATUSES = {429}
+
+
+class TokenBucket:
+    """Blocking token bucket refilled at ``rate_per_minute`` (0 = unlimited).
+
+    Callers queue instead of failing. A throttled response pauses the whole
+    bucket, so every queued caller backs off together rather than each
+    discovering the 429 on its own.
+    """
+
+    def __init__(self, name: str, rate_per_minute: float, burst: Optional[int] = None):
+        """Initialize bucket."""
+        self.name = name
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(burst or max(1, int(rate_per_minute // 6)))
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting = 0
+        self.total_wait = 0.0
+        self.acquired = 0
+        self._cond = threading.Condition()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self) -> float:
+        """Take one token, waiting as long as needed; returns seconds waited."""
+        started = time.monotonic()
+        with self._cond:
+            self.waiting += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    if now >= self.paused_until and (not self.rate or self.tokens >= 1):
+                        self.tokens -= 1
+                        break
+                    delay = max(self.paused_until - now, (1 - self.tokens) / self.rate if self.rate else 0.0)
+                    self._cond.wait(delay)
+            finally:
+                self.waiting -= 1
+
+            waited = time.monotonic() - started
+            self.total_wait += waited
+            self.acquired += 1
+            return waited
+
+    def pause(self, seconds: float):
+        """Hold every caller of this bucket for at least ``seconds``."""
+        with self._cond:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            # Anything saved up is stale once the server says we are over quota
+            self.tokens = 0.0
+            self._cond.notify_all()
+
+
+class QuotaScheduler:
+    """Runs Sheets API requests through separate read and write token buckets.
+
+    Retryable failures (429, 503; only 429 for non-idempotent requests) are
+    retried with exponential backoff plus jitter; the backoff grows with
+    consecutive throttles and resets on success. ``stats()`` reports queue
+    depth and time spent waiting.
+    """
+
+    def __init__(self, reads_per_minute: float, writes_per_minute: float, max_retries: int = 5,
+                 base_backoff: float = 1.0, max_backoff: float = 32.0):
+        """Initialize scheduler."""
+        self.buckets = {
+            "read": TokenBucket("read", reads_per_minute),
+            "write": TokenBucket("write", writes_per_minute)
+        }
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.throttled = 0
+        self.retries = 0
+        self._consecutive_throttles = 0
+        self._lock = threading.Lock()
+
+    def execute(self, request, write: bool = False, http=None, idempotent: bool = True) -> Dict[str, Any]:
+        """Execute a googleapiclient request once a token is available, retrying throttles.
+
+        Pass ``idempotent=False`` for requests that must not run twice (appends,
+        row deletes): they are only retried when the server throttled them.
+        """
+        bucket = self.buckets["write" if write else "read"]
+        retryable = RETRYABLE_STATUSES if idempotent else THROTTLED_STATUSES
+        attempt = 0
+        while True:
+            bucket.acquire()
+            try:
+                result = request.execute(http=http) if http else request.execute()
+            except HttpError as e:
+                status = int(getattr(e.resp, "status", 0) or 0)
+                if status not in retryable or attempt >= self.max_retries:
+                    raise
+
+                delay = self._backoff()
+                attempt += 1
+                with self._lock:
+                    self.retries += 1
+                    if status == 429:
+                        self.throttled += 1
+                logger.warning(
+                    f"Sheets API {bucket.name} returned {status}, retry {attempt}/{self.max_retries} in {delay:.1f}s"
+                )
+                bucket.pause(delay)
+                continue
+
+            with self._lock:
+                self._consecutive_throttles = 0
+            return result
+
+    def _backoff(self) -> float:
+        """Next backoff delay: exponential in consecutive failures, with full jitter."""
+        with self._lock:
+            exponent = self._consecutive_throttles
+            self._consecutive_throttles += 1
+        ceiling = min(self.max_backoff, self.base_backoff * (2 ** exponent))
+        return random.uniform(ceiling / 2, ceiling)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, wait time and retry counters per bucket."""
+        buckets = {}
+        for name, bucket in self.buckets.items():
+            with bucket._cond:
+                buckets[name] = {
+                    "queue_depth": bucket.waiting,
+                    "requests": bucket.acquired,
+                    "total_wait_seconds": round(bucket.total_wait, 3),
+                    "avg_wait_seconds": round(bucket.total_wait / bucket.acquired, 3) if bucket.acquired else 0.0,
+                    "paused_for_seconds": round(max(0.0, bucket.paused_until - time.monotonic()), 3)
+                }
+        with self._lock:
+            return {"buckets": buckets, "throttled": self.throttled, "retries": self.retries}
+
+
+_scheduler: Optional[QuotaScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> QuotaScheduler:
+    """Return the process-wide scheduler (quotas are shared by every service instance)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = QuotaScheduler(
+                reads_per_minute=Config.SHEETS_READS_PER_MINUTE,
+                writes_per_minute=Config.SHEETS_WRITES_PER_MINUTE,
+                max_retries=Config.SHEETS_MAX_RETRIES
+            )
+        return _scheduler
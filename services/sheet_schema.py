@@ -0,0 +1,225 @@
+"""Header-driven column layouts and precompiled row decoders for the Google Sheets."""
+
+import logging
+import re
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_header(label: str) -> str:
+    """Lowercase a header label and drop everything but letters and digits."""
+    return re.sub(r"[^a-z0-9]", "", (label or "").lower())
+
+
+def column_letter(index: int) -> str:
+    """A1 column letters for a 0-based column index (0 -> A, 26 -> AA)."""
+    letters = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+
+def column_index(letters: str) -> int:
+    """0-based column index for A1 column letters (A -> 0, AA -> 26)."""
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+class Field:
+    """One decoded column: record key, default position, header labels and type.
+
+    Non-blank cells go through ``convert``; blank cells decode to ``empty``.
+    ``default`` is the raw value assumed when a cell or the whole column is
+    missing (the API trims trailing blank cells). ``write_only`` columns are
+    located in the header so rows can be encoded, but are not decoded.
+    """
+
+    def __init__(self, key: str, column: str, *labels: str, convert: Optional[Callable[[str], Any]] = None,
+                 empty: Any = "", default: str = "", write_only: bool = False):
+        """Initialize field."""
+        self.key = key
+        self.column = column_index(column)
+        self.labels = labels
+        self.convert = convert
+        self.empty = empty
+        self.default = default
+        self.write_only = write_only
+
+    def missing_value(self) -> Any:
+        """Decoded value for a column the sheet does not have."""
+        if self.convert:
+            return self.convert(self.default) if self.default else self.empty
+        return self.default
+
+
+class RowDecoder:
+    """Decodes rows laid out under one particular header.
+
+    Positions are resolved once into an itemgetter over the mapped columns
+    and a matching tuple of converters, so decoding a row does no per-field
+    lookups or bounds checks.
+    """
+
+    def __init__(self, schema: "SheetSchema", positions: Dict[str, int]):
+        """Initialize decoder."""
+        self.positions = positions
+        self.width = max(positions.values(), default=-1) + 1
+        self.decode: Callable[[Sequence[str], int], Optional[Dict[str, Any]]] = self._compile(schema)
+
+    def _compile(self, schema: "SheetSchema") -> Callable:
+        # Short rows are padded with each column's default before decoding
+        padding = [""] * self.width
+        # Record in schema order; fields the header lacks keep their missing value
+        template: Dict[str, Any] = {}
+        keys = []
+        indexes = []
+        converters = []
+        for field in schema.fields:
+            if field.write_only:
+                continue
+            index = self.positions.get(field.key)
+            if index is None:
+                template[field.key] = field.missing_value()
+                continue
+            template[field.key] = None
+            padding[index] = field.default
+            keys.append(field.key)
+            indexes.append(index)
+            converters.append((field.convert, field.empty) if field.convert else None)
+        template["row_number"] = None
+
+        # itemgetter returns a bare value (not a tuple) for a single index
+        if len(indexes) == 1:
+            only = indexes[0]
+            cells = lambda row: (row[only],)
+        else:
+            cells = itemgetter(*indexes) if indexes else lambda row: ()
+        fields = tuple(zip(keys, converters))
+        required = tuple(self.positions[key] for key in schema.required if key in self.positions)
+        width = self.width
+
+        def decode(row: Sequence[str], row_number: int) -> Optional[Dict[str, Any]]:
+            if len(row) < width:
+                row = list(row) + padding[len(row):]
+            for index in required:
+                if not row[index]:
+                    return None
+            record = template.copy()
+            for (key, converter), value in zip(fields, cells(row)):
+                if converter is None:
+                    record[key] = value
+                else:
+                    record[key] = converter[0](value) if value else converter[1]
+            record["row_number"] = row_number
+            return record
+
+        return decode
+
+    def cell(self, row: Sequence[str], key: str) -> str:
+        """Raw value of one field in a row ("" if the row or layout lacks it)."""
+        index = self.positions.get(key)
+        return row[index] if index is not None and index < len(row) else ""
+
+    def encode(self, values: Dict[str, Any]) -> List[Any]:
+        """Lay out a record as a row under this header (fields it has no column for are dropped)."""
+        row: List[Any] = [""] * self.width
+        for key, value in values.items():
+            index = self.positions.get(key)
+            if index is not None:
+                row[index] = value
+        return row
+
+
+class SheetSchema:
+    """Maps a sheet's header labels to record fields and caches one decoder per header.
+
+    Headers are matched by normalized label, so reordered or renamed columns
+    still decode. A header that lacks a required column (or no header at
+    all) falls back to the default layout given by each field's column.
+    """
+
+    def __init__(self, name: str, fields: List[Field], required: Sequence[str] = ()):
+        """Initialize schema."""
+        self.name = name
+        self.fields = fields
+        self.required = tuple(required)
+        self._labels = {}
+        for field in fields:
+            for label in (field.key, *field.labels):
+                self._labels.setdefault(normalize_header(label), field.key)
+        self.default = RowDecoder(self, {field.key: field.column for field in fields})
+        self._decoders: Dict[tuple, RowDecoder] = {}
+
+    def field_for(self, label: str) -> Optional[str]:
+        """Record key a header label maps to, if any."""
+        return self._labels.get(normalize_header(label))
+
+    def decoder(self, header: Optional[Sequence[str]]) -> RowDecoder:
+        """Return the decoder for a header row, compiling it the first time it is seen."""
+        key = tuple(header or ())
+        decoder = self._decoders.get(key)
+        if decoder is None:
+            decoder = self._decoders[key] = self._map_header(key)
+        return decoder
+
+    def _map_header(self, header: tuple) -> RowDecoder:
+        if not header:
+            return self.default
+
+        positions = {}
+        for index, label in enumerate(header):
+            key = self.field_for(label)
+            if key and key not in positions:
+                positions[key] = index
+
+        missing = [key for key in self.required if key not in positions]
+        if missing:
+            logger.warning(f"{self.name} header has no {', '.join(missing)} column, using the default layout")
+            return self.default
+
+        if positions != self.default.positions:
+            unmapped = [field.key for field in self.fields if field.key not in positions]
+            logger.info(f"{self.name} columns differ from the default layout (missing: {unmapped or 'none'})")
+        return RowDecoder(self, positions)
+
+
+CLIENT_SCHEMA = SheetSchema("Clients", [
+    Field("client_id", "A", "Client ID"),
+    Field("name", "B", "Name", "Client Name"),
+    Field("address", "C", "Address"),
+    Field("contact", "D", "Contact", "Contact Number", "Phone"),
+    Field("email", "E", "Email"),
+    Field("package_type", "F", "Package Type", "Package"),
+    Field("start_date", "G", "Start Date"),
+    Field("end_date", "H", "End Date"),
+    Field("amount_paid", "I", "Amount Paid", convert=float, empty=0.0),
+    Field("payment_method", "J", "Payment Method", default="upfront_deposit"),
+    Field("contract_number", "K", "Contract Number"),
+    Field("invoice_number", "L", "Invoice Number"),
+    Field("created_at", "M", "Created At"),
+    Field("notes", "N", "Notes")
+], required=["client_id"])
+
+# Columns E (Amount Paid ($)) and G (Amount Balance) are written but not read back
+SESSION_SCHEMA = SheetSchema("Sessions", [
+    Field("client_id", "A", "Client ID"),
+    Field("client_name", "B", "Client Name", "Name"),
+    Field("coaching_type", "C", "Coaching Type"),
+    Field("coaching_hours", "D", "Coaching Hours", "Hours", convert=float, empty=0.0),
+    Field("amount_paid", "E", "Amount Paid ($)", "Amount Paid", write_only=True),
+    Field("amount_collected", "F", "Amount Collected", convert=float, empty=0.0),
+    Field("amount_balance", "G", "Amount Balance", "Balance", write_only=True),
+    Field("session_date", "H", "Session Date", "Date"),
+    Field("payment_method", "I", "Payment Method", default="upfront_deposit"),
+    Field("contract_number", "J", "Contract Number"),
+    Field("invoice_number", "K", "Invoice Number"),
+    Field("created_at", "L", "Created At"),
+    Field("notes", "M", "Notes")
+], required=["client_name"])
@@ -0,0 +1,220 @@
+"""Thread-safe cache primitives for the Google Sheets service."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional
+
+
+class ReadWriteLock:
+    """Lock allowing many concurrent readers or a single writer.
+
+    Writers are preferred: once a writer is waiting, new readers queue behind
+    it so a steady stream of reads cannot starve a cache refresh. Both sides
+    are re-entrant for the owning thread, and the writer may also take the
+    read side (e.g. a write-through calling a lookup helper).
+    """
+
+    def __init__(self):
+        """Initialize lock."""
+        self._cond = threading.Condition(threading.Lock())
+        self._readers: Dict[int, int] = {}
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        """Acquire the lock for reading."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me or me in self._readers:
+                self._readers[me] = self._readers.get(me, 0) + 1
+                return
+            while self._writer is not None or self._writers_waiting:
+                self._cond.wait()
+            self._readers[me] = 1
+
+    def release_read(self):
+        """Release a read hold."""
+        me = threading.get_ident()
+        with self._cond:
+            count = self._readers[me] - 1
+            if count:
+                self._readers[me] = count
+            else:
+                del self._readers[me]
+                self._cond.notify_all()
+
+    def acquire_write(self):
+        """Acquire the lock for writing."""
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if me in self._readers:
+                raise RuntimeError("Cannot upgrade a read lock to a write lock")
+            self._writers_waiting += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self):
+        """Release a write hold."""
+        with self._cond:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._cond.notify_all()
+
+    @contextmanager
+    def read_locked(self):
+        """Context manager holding the read side."""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self):
+        """Context manager holding the write side."""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class _Flight:
+    """One in-progress call shared by every caller of the same key."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into one execution.
+
+    The first caller runs the function; callers arriving while it is in
+    flight wait for it and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        """Initialize single-flight group."""
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Run fn for key, or wait for the call already in flight."""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+
+class SheetCache:
+    """Freshness, versioning, locking and single-flight loading for one cached sheet.
+
+    The cached data itself stays on the owning service; this object decides
+    when it is fresh and serialises access to it. ``version`` only ever goes
+    up: it is bumped on every reload and every write-through, so a loader can
+    tell whether the cache changed while its fetch was in flight.
+    """
+
+    def __init__(self, name: str, ttl: float):
+        """Initialize cache state."""
+        self.name = name
+        self.ttl = ttl
+        self.lock = ReadWriteLock()
+        self.version = 0
+        self.loaded_at: Optional[float] = None
+        self._expired = False
+        # Data came from an on-disk snapshot and has not been revalidated yet
+        self.restored = False
+        self._flight = SingleFlight()
+
+    def age(self) -> Optional[float]:
+        """Seconds since the data was loaded, or None if nothing is loaded."""
+        if self.loaded_at is None:
+            return None
+        return time.monotonic() - self.loaded_at
+
+    def is_loaded(self) -> bool:
+        """Check if any data has been loaded (fresh or not)."""
+        return self.loaded_at is not None
+
+    def is_fresh(self) -> bool:
+        """Check if the data is younger than the TTL and not expired."""
+        age = self.age()
+        return age is not None and age < self.ttl and not self._expired
+
+    def mark_loaded(self):
+        """Record a completed (re)load. Call with the write lock held."""
+        self.loaded_at = time.monotonic()
+        self._expired = False
+        self.restored = False
+        self.version += 1
+
+    def mark_revalidated(self):
+        """Record that the loaded data was confirmed unchanged (write lock held).
+
+        Restarts the TTL without bumping the version, since nothing changed.
+        """
+        self.loaded_at = time.monotonic()
+        self._expired = False
+        self.restored = False
+
+    def mark_restored(self, age: float):
+        """Record data restored from a snapshot saved age seconds ago (write lock held).
+
+        Restored data is never fresh: it may be served while a revalidation
+        runs, but the next load replaces it.
+        """
+        self.loaded_at = time.monotonic() - age
+        self._expired = True
+        self.restored = True
+        self.version += 1
+
+    def mark_changed(self):
+        """Record a write-through change. Call with the write lock held."""
+        self.version += 1
+
+    def expire(self):
+        """Keep the data but force the next read to revalidate it."""
+        self._expired = True
+
+    def reset(self):
+        """Forget the data entirely. Call with the write lock held."""
+        self.loaded_at = None
+        self._expired = False
+        self.restored = False
+        self.version += 1
+
+    def load(self, loader: Callable[[], Any]) -> Any:
+        """Run loader, sharing a single in-flight call among concurrent misses."""
+        return self._flight.do(self.name, loader)
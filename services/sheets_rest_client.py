@@ -0,0 +1,132 @@
+"""Lightweight Sheets v4 REST client over a pooled keep-alive HTTP session."""
+
+import json
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+from urllib.parse import quote
+
+import requests
+from google.auth.transport.requests import Request as AuthRequest
+from googleapiclient.errors import HttpError
+from requests.adapters import HTTPAdapter
+
+
+logger = logging.getLogger(__name__)
+
+
+SHEETS_API_URL = "https://sheets.googleapis.com/v4/spreadsheets"
+
+
+class _Response(dict):
+    """httplib2-style response headers, which is what HttpError expects."""
+
+    def __init__(self, response: requests.Response):
+        super().__init__({k.lower(): v for k, v in response.headers.items()})
+        self.status = response.status_code
+        self.reason = response.reason
+        self["status"] = str(response.status_code)
+
+
+class _Request:
+    """One prepared API call; nothing is sent until execute()."""
+
+    def __init__(self, client: "SheetsRestClient", method: str, path: str,
+                 params: Optional[Dict[str, Any]] = None, body: Optional[Dict[str, Any]] = None):
+        self._client = client
+        self._method = method
+        self._path = path
+        self._params = params
+        self._body = body
+
+    def execute(self, http=None, num_retries: int = 0) -> Dict[str, Any]:
+        # http is accepted for googleapiclient compatibility; the pool is shared safely
+        return self._client._send(self._method, self._path, self._params, self._body)
+
+
+class _Values:
+    """spreadsheets().values() endpoints used by the portal."""
+
+    def __init__(self, client: "SheetsRestClient"):
+        self._client = client
+
+    @staticmethod
+    def _range_path(spreadsheet_id: str, a1_range: str) -> str:
+        return f"/{spreadsheet_id}/values/{quote(a1_range, safe='')}"
+
+    def get(self, spreadsheetId: str, range: str, **params) -> _Request:
+        return _Request(self._client, "GET", self._range_path(spreadsheetId, range), params)
+
+    def batchGet(self, spreadsheetId: str, ranges: List[str], **params) -> _Request:
+        return _Request(self._client, "GET", f"/{spreadsheetId}/values:batchGet", dict(params, ranges=list(ranges)))
+
+    def append(self, spreadsheetId: str, range: str, body: Dict[str, Any], **params) -> _Request:
+        return _Request(self._client, "POST", self._range_path(spreadsheetId, range) + ":append", params, body)
+
+    def update(self, spreadsheetId: str, range: str, body: Dict[str, Any], **params) -> _Request:
+        return _Request(self._client, "PUT", self._range_path(spreadsheetId, range), params, body)
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict[str, Any], **params) -> _Request:
+        return _Request(self._client, "POST", f"/{spreadsheetId}/values:batchUpdate", params, body)
+
+
+class _Spreadsheets:
+    """spreadsheets() endpoints used by the portal."""
+
+    def __init__(self, client: "SheetsRestClient"):
+        self._client = client
+
+    def values(self) -> _Values:
+        return _Values(self._client)
+
+    def batchUpdate(self, spreadsheetId: str, body: Dict[str, Any], **params) -> _Request:
+        return _Request(self._client, "POST", f"/{spreadsheetId}:batchUpdate", params, body)
+
+
+class SheetsRestClient:
+    """Drop-in for the discovery-built Sheets service, covering the endpoints the portal uses.
+
+    Requests share one ``requests.Session`` whose connection pool keeps
+    connections to sheets.googleapis.com alive, so the client is safe to use
+    from many threads at once. The service-account access token is cached
+    and refreshed (under a lock) shortly before it expires. Errors are raised
+    as googleapiclient ``HttpError`` so existing handlers keep working.
+    """
+
+    # Threads may share this client; no per-thread transport is needed
+    thread_safe = True
+
+    def __init__(self, credentials, pool_size: int = 10, timeout: float = 30.0):
+        """Initialize REST client."""
+        self.credentials = credentials
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self._token_lock = threading.Lock()
+
+    def spreadsheets(self) -> _Spreadsheets:
+        return _Spreadsheets(self)
+
+    def _access_token(self, force_refresh: bool = False) -> str:
+        """Return a valid access token, refreshing it at most once across threads."""
+        with self._token_lock:
+            if force_refresh or not self.credentials.valid:
+                self.credentials.refresh(AuthRequest(self.session))
+                logger.debug("Refreshed Sheets API access token")
+            return self.credentials.token
+
+    def _send(self, method: str, path: str, params: Optional[Dict[str, Any]],
+              body: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        url = SHEETS_API_URL + path
+        for attempt in range(2):
+            headers = {"Authorization": f"Bearer {self._access_token(force_refresh=attempt > 0)}"}
+            response = self.session.request(method, url, params=params, json=body,
+                                            headers=headers, timeout=self.timeout)
+            # An expired or revoked token: refresh once and try again
+            if response.status_code != 401:
+                break
+
+        if response.status_code >= 400:
+            raise HttpError(_Response(response), response.content, uri=response.url)
+        return json.loads(response.content) if response.content else {}
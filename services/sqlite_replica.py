@@ -0,0 +1,198 @@
+"""Local SQLite read replica of the Clients and Sessions sheets."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clients (
+    row_number INTEGER PRIMARY KEY,
+    client_id TEXT NOT NULL,
+    name_lower TEXT NOT NULL,
+    email_lower TEXT NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_clients_client_id ON clients (client_id);
+CREATE INDEX IF NOT EXISTS idx_clients_name ON clients (name_lower);
+CREATE INDEX IF NOT EXISTS idx_clients_email ON clients (email_lower);
+
+CREATE TABLE IF NOT EXISTS sessions (
+    row_number INTEGER PRIMARY KEY,
+    client_id TEXT NOT NULL,
+    client_name_lower TEXT NOT NULL,
+    session_date TEXT NOT NULL,
+    invoice_number TEXT NOT NULL,
+    amount_collected REAL NOT NULL,
+    coaching_hours REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_client_id ON sessions (client_id);
+CREATE INDEX IF NOT EXISTS idx_sessions_client_name ON sessions (client_name_lower);
+CREATE INDEX IF NOT EXISTS idx_sessions_date ON sessions (session_date);
+CREATE INDEX IF NOT EXISTS idx_sessions_invoice ON sessions (invoice_number);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    sheet TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+class SheetReplica:
+    """SQLite mirror of the parsed Clients and Sessions sheets.
+
+    Rows are stored as JSON alongside indexed lookup columns, so reads return
+    the same dicts GoogleSheetsService builds from the sheet. The database runs
+    in WAL mode and may be shared by several worker processes.
+    """
+
+    def __init__(self, path: str):
+        """Initialize replica and create the schema if needed."""
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection (sqlite3 connections are per thread)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _mark_synced(self, conn: sqlite3.Connection, sheet: str):
+        conn.execute(
+            "INSERT OR REPLACE INTO sync_state (sheet, synced_at) VALUES (?, ?)",
+            (sheet, time.time())
+        )
+
+    def is_populated(self) -> bool:
+        """Check if both sheets have been mirrored at least once."""
+        rows = self._connect().execute("SELECT COUNT(*) FROM sync_state").fetchone()
+        return rows[0] >= 2
+
+    # Sync (called by GoogleSheetsService after loads and write-throughs)
+
+    @staticmethod
+    def _client_values(client: Dict[str, Any]) -> tuple:
+        return (client["row_number"], client["client_id"], client.get("name", "").lower(),
+                client.get("email", "").lower(), json.dumps(client))
+
+    @staticmethod
+    def _session_values(session: Dict[str, Any]) -> tuple:
+        return (session["row_number"], session.get("client_id", ""), session.get("client_name", "").lower(),
+                session.get("session_date", ""), session.get("invoice_number", ""),
+                session.get("amount_collected", 0.0), session.get("coaching_hours", 0.0), json.dumps(session))
+
+    def _insert_clients(self, conn: sqlite3.Connection, clients: List[Dict[str, Any]]):
+        conn.executemany(
+            "INSERT OR REPLACE INTO clients (row_number, client_id, name_lower, email_lower, data) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [self._client_values(c) for c in clients]
+        )
+
+    def _insert_sessions(self, conn: sqlite3.Connection, sessions: List[Dict[str, Any]]):
+        conn.executemany(
+            "INSERT OR REPLACE INTO sessions (row_number, client_id, client_name_lower, session_date, "
+            "invoice_number, amount_collected, coaching_hours, data) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [self._session_values(s) for s in sessions]
+        )
+
+    def replace_clients(self, clients: List[Dict[str, Any]]):
+        """Replace the mirrored clients in one transaction."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM clients")
+            self._insert_clients(conn, clients)
+            self._mark_synced(conn, "clients")
+        logger.debug(f"Replica mirrored {len(clients)} clients")
+
+    def replace_sessions(self, sessions: List[Dict[str, Any]]):
+        """Replace the mirrored sessions in one transaction."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions")
+            self._insert_sessions(conn, sessions)
+            self._mark_synced(conn, "sessions")
+        logger.debug(f"Replica mirrored {len(sessions)} sessions")
+
+    def upsert_clients(self, clients: List[Dict[str, Any]]):
+        """Insert or overwrite mirrored clients by sheet row (appends and patches)."""
+        with self._connect() as conn:
+            self._insert_clients(conn, clients)
+
+    def upsert_sessions(self, sessions: List[Dict[str, Any]]):
+        """Insert or overwrite mirrored sessions by sheet row (appends)."""
+        with self._connect() as conn:
+            self._insert_sessions(conn, sessions)
+
+    def replace_clients_from(self, start_row: int, clients: List[Dict[str, Any]]):
+        """Replace the mirrored clients at or below start_row (deleted rows shift the rest up)."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM clients WHERE row_number >= ?", (start_row,))
+            self._insert_clients(conn, clients)
+
+    # Reads
+
+    def all_clients(self) -> List[Dict[str, Any]]:
+        """Return every client in sheet order."""
+        rows = self._connect().execute("SELECT data FROM clients ORDER BY row_number")
+        return [json.loads(data) for (data,) in rows]
+
+    def client_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the first client with this name (case-insensitive)."""
+        row = self._connect().execute(
+            "SELECT data FROM clients WHERE name_lower = ? ORDER BY row_number LIMIT 1",
+            (name.lower(),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def client_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """Return the first client with this email (case-insensitive)."""
+        row = self._connect().execute(
+            "SELECT data FROM clients WHERE email_lower = ? ORDER BY row_number LIMIT 1",
+            (email.lower(),)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def sessions_for_client(self, client_name: str) -> List[Dict[str, Any]]:
+        """Return a client's sessions in sheet order."""
+        rows = self._connect().execute(
+            "SELECT data FROM sessions WHERE client_name_lower = ? ORDER BY row_number",
+            (client_name.lower(),)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def sessions_for_client_id(self, client_id: str) -> List[Dict[str, Any]]:
+        """Return the sessions recorded against a client ID in sheet order."""
+        rows = self._connect().execute(
+            "SELECT data FROM sessions WHERE client_id = ? ORDER BY row_number",
+            (client_id,)
+        )
+        return [json.loads(data) for (data,) in rows]
+
+    def session_totals(self, client_name: str) -> Dict[str, Any]:
+        """Return a client's collected total, session count, hours and last session date."""
+        total_collected, session_count, hours_used, last_session_date = self._connect().execute(
+            "SELECT COALESCE(SUM(amount_collected), 0), COUNT(*), COALESCE(SUM(coaching_hours), 0), "
+            "COALESCE(MAX(session_date), '') FROM sessions WHERE client_name_lower = ?",
+            (client_name.lower(),)
+        ).fetchone()
+        return {
+            "total_collected": float(total_collected),
+            "session_count": session_count,
+            "hours_used": float(hours_used),
+            "last_session_date": last_session_date
+        }
@@ -0,0 +1,48 @@
+"""Per-thread SQLite connections and write transactions shared by the SQLite-backed stores."""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class SQLiteStore:
+    """Base for stores kept in one SQLite file shared by threads and worker processes.
+
+    Each thread gets its own autocommit connection in WAL mode. Writes that
+    must be atomic run in ``BEGIN IMMEDIATE`` transactions, which take the
+    write lock up front so concurrent writers queue instead of deadlocking.
+    """
+
+    def __init__(self, path: str, schema: str):
+        """Initialize store and create the schema if needed."""
+        self.path = path
+        self._local = threading.local()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._connect().executescript(schema)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection (autocommit; see _transaction)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block as one write transaction, locking out other writers."""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
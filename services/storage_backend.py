@@ -0,0 +1,134 @@
+"""Storage backend interface for Coaching Portal."""
+
+import logging
+from collections import Counter
+from typing import Any, ContextManager, Dict, List, Optional, Protocol, runtime_checkable
+
+from config import Config
+from services.sheet_schema import CLIENT_SCHEMA
+
+
+logger = logging.getLogger(__name__)
+
+
+# Client fields in default Clients sheet column order (A:Client ID ... N:Notes)
+CLIENT_FIELDS = tuple(field.key for field in CLIENT_SCHEMA.fields)
+
+
+@runtime_checkable
+class StorageBackend(Protocol):
+    """Operations ClientService and the routes need from client/session storage.
+
+    Rows are plain dicts with the keys GoogleSheetsService parses from the
+    sheets (including ``row_number``, the 1-indexed sheet row, header = 1).
+    """
+
+    def refresh_caches(self, clients: bool = True, sessions: bool = True):
+        """Warm whatever the backend caches before a multi-step write."""
+        ...
+
+    def get_all_clients(self) -> List[Dict[str, Any]]:
+        """Return every client in row order."""
+        ...
+
+    def get_client_columns(self, fields: List[str]) -> List[Dict[str, Any]]:
+        """Return every client with only ``fields`` plus client_id and row_number."""
+        ...
+
+    def get_client_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Return the first client with this name (case-insensitive)."""
+        ...
+
+    def check_duplicate_client(self, name: str, email: str) -> Optional[Dict[str, Any]]:
+        """Return an existing client with this email, if any."""
+        ...
+
+    def add_new_client(self, client_data: Dict[str, Any]) -> str:
+        """Add a client, allocating its contract and invoice numbers; return the written range."""
+        ...
+
+    def get_max_contract_number(self) -> str:
+        """Allocate the next contract number (CT-YYYY-###)."""
+        ...
+
+    def get_max_invoice_number(self) -> str:
+        """Allocate the next client invoice number (INV-5XXX)."""
+        ...
+
+    def get_max_session_invoice_number(self) -> str:
+        """Allocate the next session invoice number (INV-###)."""
+        ...
+
+    def add_session(self, session_data: Dict[str, Any], client: Optional[Dict[str, Any]] = None) -> str:
+        """Record a session with its running balance; return the written range.
+
+        ``client`` is the caller's lookup of session_data["client_name"], if it has one.
+        """
+        ...
+
+    def get_client_history(self, client_name: str) -> List[Dict[str, Any]]:
+        """Return a client's sessions in row order."""
+        ...
+
+    def get_session_totals(self, client_name: str) -> Dict[str, Any]:
+        """Return total_collected, session_count, hours_used and last_session_date."""
+        ...
+
+    def get_client_balance(self, client_name: str) -> Optional[Dict[str, Any]]:
+        """Return package, collected and remaining balance, or None for an unknown client."""
+        ...
+
+    def update_client_end_date(self, client_name: str, new_end_date: str) -> bool:
+        """Set a client's end date; False if the client does not exist."""
+        ...
+
+    def update_client_fields(self, client_name: str, fields: Dict[str, Any]) -> bool:
+        """Set several of a client's fields in one write; False if the client does not exist."""
+        ...
+
+    def count_calls(self) -> ContextManager[Counter]:
+        """Count the remote API reads and writes this request makes inside the block."""
+        ...
+
+    def delete_rows(self, start_row: int, end_row: int) -> bool:
+        """Delete client rows start_row..end_row (1-indexed, inclusive)."""
+        ...
+
+
+def remaining_balance(payment_method: str, total_package: float, total_collected: float) -> float:
+    """Remaining package balance; pay-per-session clients never show a balance owed."""
+    if payment_method == "pay_per_session":
+        return 0
+    return total_package - total_collected
+
+
+def projected_fields(fields: List[str]) -> List[str]:
+    """Validate requested client fields; client_id always comes first."""
+    unknown = [field for field in fields if field not in CLIENT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown client fields: {', '.join(unknown)}")
+    return list(dict.fromkeys(["client_id", *fields]))
+
+
+def project_clients(clients: List[Dict[str, Any]], fields: List[str]) -> List[Dict[str, Any]]:
+    """Copy only ``fields`` (already validated) and row_number out of full client dicts."""
+    return [
+        dict({field: client.get(field, "") for field in fields}, row_number=client["row_number"])
+        for client in clients
+    ]
+
+
+def create_storage_backend() -> StorageBackend:
+    """Build the backend selected by Config.STORAGE_BACKEND ("sheets" or "local")."""
+    backend = (Config.STORAGE_BACKEND or "sheets").strip().lower()
+
+    if backend == "local":
+        from services.local_storage_service import LocalStorageService
+        logger.info(f"Using local storage backend: {Config.LOCAL_STORAGE_PATH}")
+        return LocalStorageService(Config.LOCAL_STORAGE_PATH)
+
+    if backend == "sheets":
+        from services.google_sheets_service import GoogleSheetsService
+        return GoogleSheetsService()
+
+    raise ValueError(f"Unknown STORAGE_BACKEND: {Config.STORAGE_BACKEND}")
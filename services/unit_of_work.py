@@ -0,0 +1,111 @@
+"""Request-scoped unit of work over a storage backend."""
+
+import logging
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from services.storage_backend import StorageBackend
+
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWork:
+    """One request's view of a StorageBackend: memoized lookups, deferred writes.
+
+    Lookups are answered once per request. Writes are only recorded until
+    ``commit``, so a request that fails before committing writes nothing.
+    Commit is not atomic: it flushes in order new client rows, then one
+    multi-cell update per changed client, then session rows (each an append,
+    batched with other requests by the backend), and a failure partway
+    leaves the earlier writes in place. Sessions go last so that a failed
+    client update never leaves an orphaned session row behind.
+
+    Use it as a context manager; ``calls`` then counts the Sheets API reads
+    and writes the request made (see StorageBackend.count_calls).
+    """
+
+    def __init__(self, storage: StorageBackend):
+        """Initialize unit of work."""
+        self.storage = storage
+        self.calls: Counter = Counter()
+        # Set once a commit has flushed every recorded write
+        self.committed = False
+        self._counting = None
+        self._refreshed = {"clients": False, "sessions": False}
+        self._clients: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._balances: Dict[str, Optional[Dict[str, Any]]] = {}
+        self._new_clients: List[Dict[str, Any]] = []
+        self._sessions: List[Dict[str, Any]] = []
+        self._client_updates: Dict[str, Dict[str, Any]] = {}
+
+    def __enter__(self) -> "UnitOfWork":
+        self._counting = self.storage.count_calls()
+        self.calls = self._counting.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._sessions or self._new_clients or self._client_updates:
+            logger.info("Discarding uncommitted writes")
+        return self._counting.__exit__(exc_type, exc, tb)
+
+    # Reads
+
+    def refresh_caches(self, clients: bool = True, sessions: bool = True):
+        """Warm the backend's caches, at most once per sheet per request."""
+        clients = clients and not self._refreshed["clients"]
+        sessions = sessions and not self._refreshed["sessions"]
+        if clients or sessions:
+            self.storage.refresh_caches(clients=clients, sessions=sessions)
+            self._refreshed["clients"] |= clients
+            self._refreshed["sessions"] |= sessions
+
+    def get_client_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        key = name.lower()
+        if key not in self._clients:
+            self._clients[key] = self.storage.get_client_by_name(name)
+        return self._clients[key]
+
+    def check_duplicate_client(self, name: str, email: str) -> Optional[Dict[str, Any]]:
+        return self.storage.check_duplicate_client(name, email)
+
+    def get_client_balance(self, client_name: str) -> Optional[Dict[str, Any]]:
+        """Balance as stored, before this request's uncommitted sessions."""
+        key = client_name.lower()
+        if key not in self._balances:
+            self._balances[key] = self.storage.get_client_balance(client_name)
+        return self._balances[key]
+
+    # Writes (recorded until commit)
+
+    def add_new_client(self, client_data: Dict[str, Any]):
+        self._new_clients.append(client_data)
+
+    def add_session(self, session_data: Dict[str, Any]):
+        self._sessions.append(session_data)
+
+    def update_client(self, client_name: str, **fields):
+        """Record field changes for a client; several calls merge into one write."""
+        self._client_updates.setdefault(client_name, {}).update(fields)
+
+    def commit(self) -> Dict[str, List[Any]]:
+        """Flush the recorded writes; returns each write's result grouped by kind."""
+        results: Dict[str, List[Any]] = {"clients": [], "sessions": [], "client_updates": []}
+
+        for client_data in self._new_clients:
+            results["clients"].append(self.storage.add_new_client(client_data))
+        for client_name, fields in self._client_updates.items():
+            results["client_updates"].append(self.storage.update_client_fields(client_name, fields))
+        for session_data in self._sessions:
+            client = self._clients.get(session_data.get("client_name", "").lower())
+            results["sessions"].append(self.storage.add_session(session_data, client=client))
+
+        self._new_clients = []
+        self._sessions = []
+        self._client_updates = {}
+        self.committed = True
+        # Committed rows change what later lookups would see
+        self._clients.clear()
+        self._balances.clear()
+        self._refreshed = {"clients": False, "sessions": False}
+        return results
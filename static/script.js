@@ -175,6 +175,16 @@ async function fetchWithErrorHandling(url, options = {}) {
     }
 }
 
+/**
+ * New Idempotency-Key for a form submission (reuse it when retrying the same submission)
+ */
+function newIdempotencyKey() {
+    if (window.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    return Date.now().toString(36) + '-' + Math.random().toString(36).slice(2) + Math.random().toString(36).slice(2);
+}
+
 /**
  * Copy to clipboard
  */
@@ -269,6 +279,7 @@ window.CoachingPortal = {
     formatPhoneNumber,
     debounce,
     fetchWithErrorHandling,
+    newIdempotencyKey,
     copyToClipboard,
     isValidEmail,
     isValidPhoneNumber,
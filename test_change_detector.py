@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+"""Tests for change detection before sheet refetches (runs offline, no live sheet)."""
+
+from config import Config
+from offline_test_config import use_offline_config
+from services.fake_sheets_service import FakeSheetsAPI
+from services.google_sheets_service import GoogleSheetsService
+
+
+use_offline_config()
+
+
+def make_service(mode):
+    """GoogleSheetsService on the fake with the given change detection mode."""
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=5, sessions=20)
+    detection = Config.SHEETS_CHANGE_DETECTION
+    Config.SHEETS_CHANGE_DETECTION = mode
+    try:
+        service = GoogleSheetsService(service=api)
+    finally:
+        Config.SHEETS_CHANGE_DETECTION = detection
+    service.refresh_caches()
+    return service, api
+
+
+def expire_and_refresh(service, api):
+    """Force both caches stale, refresh them and return the calls it took."""
+    service.client_sheet.expire()
+    service.session_sheet.expire()
+    api.reset_stats()
+    service.refresh_caches()
+    return sorted(method for method, _, _ in api.calls)
+
+
+def add_client(service, name):
+    service.add_new_client({"name": name, "email": f"{name.lower()}@example.com", "amount_paid": 100})
+
+
+def test_drive_version_skips_unchanged_sheets():
+    service, api = make_service("drive")
+
+    assert expire_and_refresh(service, api) == ["files.get", "files.get"]
+    assert service._is_cache_valid() and service._is_session_cache_valid()
+
+    # An edit made outside the portal bumps the file version
+    rows = api.rows("clients")
+    rows[1][1] = "Renamed"
+    api.set_rows("clients", rows)
+    assert expire_and_refresh(service, api) == ["files.get", "files.get", "values.batchGet"]
+    assert service.get_all_clients()[0]["name"] == "Renamed"
+
+    # Our own write: the next refresh downloads once, then it is quiet again
+    add_client(service, "Newcomer")
+    assert expire_and_refresh(service, api) == ["files.get", "files.get", "values.batchGet"]
+    assert expire_and_refresh(service, api) == ["files.get", "files.get"]
+    assert service.get_client_by_name("Newcomer")
+
+
+def test_counter_cell_is_bumped_by_writes():
+    service, api = make_service("counter")
+
+    assert expire_and_refresh(service, api) == ["values.get", "values.get"]
+
+    api.reset_stats()
+    add_client(service, "Newcomer")
+    assert ("values.update", "clients", "Meta!A1") in api.calls
+    assert api.rows("clients", sheet="Meta")[0][0]
+
+    assert expire_and_refresh(service, api) == ["values.batchGet", "values.get", "values.get"]
+    assert expire_and_refresh(service, api) == ["values.get", "values.get"]
+
+
+def test_old_data_is_refetched_anyway():
+    service, api = make_service("drive")
+    max_age = Config.SHEETS_CHANGE_MAX_SKIP_AGE
+    Config.SHEETS_CHANGE_MAX_SKIP_AGE = 0
+    try:
+        calls = expire_and_refresh(service, api)
+    finally:
+        Config.SHEETS_CHANGE_MAX_SKIP_AGE = max_age
+
+    assert calls == ["files.get", "files.get", "values.batchGet", "values.batchGet"]
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
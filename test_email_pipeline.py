@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+"""Tests for the durable background email pipeline (runs offline, no SMTP)."""
+
+import os
+import tempfile
+import threading
+import time
+
+from models import EmailContent
+from services.email_pipeline import EmailPipeline
+from services.email_queue import EmailJobStore, FINAL_STATES
+
+
+class StubEmailService:
+    """Records sends instead of talking to SMTP; fails the first ``failures`` sends."""
+
+    def __init__(self, configured=True, failures=0):
+        self.configured = configured
+        self.failures = failures
+        self.sent = []
+
+    def is_configured(self):
+        return self.configured
+
+    def send_email(self, email_content):
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.sent.append(email_content)
+        return True
+
+
+def make_store():
+    return EmailJobStore(os.path.join(tempfile.mkdtemp(prefix="coaching-portal-test-"), "emails.db"))
+
+
+def make_pipeline(email, store=None, **kwargs):
+    kwargs.setdefault("retry_base", 0.01)
+    pipeline = EmailPipeline(email, store or make_store(), poll_interval=0.05, **kwargs)
+    pipeline.register("welcome", build)
+    return pipeline
+
+
+def build(payload):
+    if payload.get("broken"):
+        raise RuntimeError("model timed out")
+    return EmailContent(recipient_email=payload["email"], subject="Hello", body="Hi", html_body="<p>Hi</p>")
+
+
+def wait_for(pipeline, job_id, timeout=5):
+    """Poll a job until it reaches a final state."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = pipeline.get(job_id)
+        if job["status"] in FINAL_STATES:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} still {pipeline.get(job_id)['status']}")
+
+
+def test_submit_returns_before_generation_finishes():
+    email = StubEmailService()
+    pipeline = make_pipeline(email, workers=1)
+    release = threading.Event()
+    pipeline.register("slow", lambda payload: release.wait(5) and build(payload))
+
+    started = time.monotonic()
+    job_id = pipeline.submit("slow", "ann@example.com", {"email": "ann@example.com"})
+    assert time.monotonic() - started < 0.5
+    assert pipeline.get(job_id)["status"] in ("queued", "generating")
+
+    release.set()
+    job = wait_for(pipeline, job_id)
+    assert job["status"] == "sent" and job["error"] is None
+    assert [c.recipient_email for c in email.sent] == ["ann@example.com"]
+    pipeline.shutdown()
+
+
+def test_failed_sends_retry_then_dead_letter_and_replay():
+    email = StubEmailService(failures=2)
+    pipeline = make_pipeline(email, max_attempts=3)
+    job = wait_for(pipeline, pipeline.submit("welcome", "ann@example.com", {"email": "ann@example.com"}))
+    assert job["status"] == "sent" and job["attempts"] == 3
+
+    job_id = pipeline.submit("welcome", "bob@example.com", {"email": "bob@example.com", "broken": True})
+    job = wait_for(pipeline, job_id)
+    assert job["status"] == "failed" and "model timed out" in job["error"]
+    assert [dead["id"] for dead in pipeline.store.dead_letters()] == [job_id]
+    pipeline.shutdown()
+
+    # Replayed jobs get a fresh retry budget
+    pipeline = make_pipeline(email, store=pipeline.store, max_attempts=3)
+    pipeline.register("welcome", lambda payload: build(dict(payload, broken=False)))
+    assert pipeline.store.replay() == 1
+    assert wait_for(pipeline, job_id)["status"] == "sent"
+    assert not pipeline.store.dead_letters()
+    pipeline.shutdown()
+
+
+def test_drafts_overlap_the_write_and_are_reused():
+    email = StubEmailService()
+    pipeline = make_pipeline(email)
+    renders = []
+
+    def slow_build(payload):
+        renders.append(payload["email"])
+        time.sleep(0.3)
+        return build(payload)
+
+    pipeline.register("welcome", slow_build)
+
+    started = time.monotonic()
+    draft = pipeline.draft("welcome", {"email": "ann@example.com"})
+    time.sleep(0.3)  # the sheet write
+    job_id = pipeline.submit("welcome", "ann@example.com", {"email": "ann@example.com"}, draft=draft)
+    assert wait_for(pipeline, job_id)["status"] == "sent"
+    assert time.monotonic() - started < 0.55
+    assert renders == ["ann@example.com"]
+
+    # A failed write discards its draft; nothing is queued or sent
+    pipeline.draft("welcome", {"email": "bob@example.com"}).cancel()
+    pipeline.shutdown()
+    assert [c.recipient_email for c in email.sent] == ["ann@example.com"]
+
+
+def test_queued_jobs_survive_a_restart():
+    store = make_store()
+    # A worker that died mid-send: its lease has already run out
+    crashed = store.enqueue("welcome", "bob@example.com", {"email": "bob@example.com"})
+    assert store.claim(lease=0)["id"] == crashed
+    job_id = store.enqueue("welcome", "ann@example.com", {"email": "ann@example.com"})
+
+    email = StubEmailService(configured=False)
+    pipeline = make_pipeline(email, store=EmailJobStore(store.path))
+    assert wait_for(pipeline, job_id)["status"] == "skipped"
+    assert wait_for(pipeline, crashed)["attempts"] == 2
+    assert not email.sent
+    assert pipeline.get("no-such-job") is None
+    pipeline.shutdown()
+
+
+def test_history_is_bounded():
+    pipeline = make_pipeline(StubEmailService(), history=3)
+    job_ids = [pipeline.submit("welcome", f"c{i}@example.com", {"email": f"c{i}@example.com"}) for i in range(5)]
+    for job_id in job_ids:
+        wait_for(pipeline, job_id)
+    pipeline.submit("welcome", "last@example.com", {"email": "last@example.com"})
+    pipeline.shutdown()
+
+    assert pipeline.get(job_ids[0]) is None
+    assert all(pipeline.get(job_id)["status"] == "sent" for job_id in job_ids[3:])
+
+
+
+def test_inline_mode_sends_before_submit_returns():
+    email = StubEmailService()
+    pipeline = make_pipeline(email, inline=True)
+    assert not pipeline._workers
+
+    job_id = pipeline.submit("welcome", "ann@example.com", {"email": "ann@example.com"},
+                             draft=pipeline.draft("welcome", {"email": "ann@example.com"}))
+    assert pipeline.get(job_id)["status"] == "sent"
+    assert [c.recipient_email for c in email.sent] == ["ann@example.com"]
+
+    # Nothing is left running to retry: a failed inline send is dead-lettered at once
+    email.failures = 1
+    job_id = pipeline.submit("welcome", "bob@example.com", {"email": "bob@example.com"})
+    assert pipeline.get(job_id)["status"] == "failed"
+    assert [dead["id"] for dead in pipeline.store.dead_letters()] == [job_id]
+    pipeline.shutdown()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+"""Tests for the in-process fake Sheets API (runs offline, no live sheet)."""
+
+import time
+
+from googleapiclient.errors import HttpError
+
+from offline_test_config import use_offline_config
+from services.fake_sheets_service import FakeSheetsAPI
+from services.google_sheets_service import GoogleSheetsService
+
+
+use_offline_config()
+
+
+def test_reads_and_writes_follow_a1_ranges():
+    api = FakeSheetsAPI()
+    api.set_rows("sheet", [["A", "B", "C"], ["1", "2", ""], ["4", "5", "6"]])
+    values = api.spreadsheets().values()
+
+    assert values.get(spreadsheetId="sheet", range="A2:C").execute()["values"] == [["1", "2"], ["4", "5", "6"]]
+    assert values.get(spreadsheetId="sheet", range="Sheet1!B1:B1").execute()["values"] == [["B"]]
+
+    result = values.append(spreadsheetId="sheet", range="A:C", body={"values": [[7, 8, 9]]}).execute()
+    assert result["updates"]["updatedRange"] == "Sheet1!A4:C4"
+
+    values.update(spreadsheetId="sheet", range="C2", body={"values": [["x"]]}).execute()
+    ranges = values.batchGet(spreadsheetId="sheet", ranges=["C2", "A4:C4"]).execute()["valueRanges"]
+    assert [r["values"] for r in ranges] == [[["x"]], [["7", "8", "9"]]]
+
+    api.spreadsheets().batchUpdate(spreadsheetId="sheet", body={"requests": [{"deleteDimension": {
+        "range": {"sheetId": 0, "dimension": "ROWS", "startIndex": 1, "endIndex": 3}
+    }}]}).execute()
+    assert api.rows("sheet") == [["A", "B", "C"], ["7", "8", "9"]]
+    assert api.counts["values.get"] == 2 and api.counts["values.append"] == 1
+
+
+def test_latency_and_quota_errors():
+    api = FakeSheetsAPI(latency=0.05, requests_per_minute=2)
+    api.set_rows("sheet", [["A"]])
+    request = api.spreadsheets().values().get(spreadsheetId="sheet", range="A:A")
+
+    started = time.monotonic()
+    request.execute()
+    request.execute()
+    assert time.monotonic() - started >= 0.1
+
+    try:
+        request.execute()
+    except HttpError as e:
+        assert e.resp.status == 429
+    else:
+        raise AssertionError("third call within a minute was not throttled")
+
+    flaky = FakeSheetsAPI(quota_error_rate=1.0)
+    flaky.set_rows("sheet", [["A"]])
+    try:
+        flaky.spreadsheets().values().get(spreadsheetId="sheet", range="A:A").execute()
+    except HttpError as e:
+        assert e.resp.status == 429
+    else:
+        raise AssertionError("quota_error_rate=1.0 did not fail")
+
+
+def test_service_runs_on_synthetic_data():
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=200, sessions=2000, seed=7)
+    service = GoogleSheetsService(service=api)
+
+    clients = service.get_all_clients()
+    assert len(clients) == 200
+    assert len(service.get_all_sessions()) == 2000
+
+    name = clients[0]["name"]
+    before = service.get_session_totals(name)["session_count"]
+    service.add_session({
+        "client_name": name,
+        "coaching_type": "1:1",
+        "coaching_hours": 1,
+        "amount_collected": 100,
+        "session_date": "2026-03-01"
+    })
+    assert service.get_session_totals(name)["session_count"] == before + 1
+    assert api.rows("sessions")[-1][1] == name
+
+    # Same seed, same data
+    again = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=200, sessions=2000, seed=7)
+    assert again.rows("clients") == api.rows("clients")
+
+
+
+def swap_columns(api, spreadsheet_id, first, second):
+    rows = api.rows(spreadsheet_id)
+    for row in rows:
+        row += [""] * (max(first, second) + 1 - len(row))
+        row[first], row[second] = row[second], row[first]
+    api.set_rows(spreadsheet_id, rows)
+
+
+def test_appends_follow_a_reordered_header():
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=5, sessions=20)
+    swap_columns(api, "clients", 1, 4)   # Name <-> Email
+    swap_columns(api, "sessions", 1, 7)  # Client Name <-> Session Date
+    service = GoogleSheetsService(service=api)
+    service.get_all_sessions()
+
+    service.add_new_client({"name": "Ann Example", "email": "ann@example.com", "amount_paid": 1000})
+    assert api.rows("clients")[-1][1] == "ann@example.com" and api.rows("clients")[-1][4] == "Ann Example"
+    client = service.get_client_by_name("Ann Example")
+    assert client["email"] == "ann@example.com"
+
+    service.add_session({"client_name": "Ann Example", "coaching_type": "1:1", "coaching_hours": 1,
+                         "amount_collected": 100, "session_date": "2026-03-01"})
+    assert api.rows("sessions")[-1][1] == "2026-03-01" and api.rows("sessions")[-1][7] == "Ann Example"
+    assert service.get_client_history("Ann Example")[0]["session_date"] == "2026-03-01"
+    assert service.get_client_balance("Ann Example")["total_collected"] == 100
+
+    # A fresh read of the sheet agrees with the write-through
+    assert GoogleSheetsService(service=api).get_client_by_name("Ann Example") == client
+
+
+def test_reads_cover_columns_inserted_before_notes():
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=5, sessions=20)
+    for name in ("clients", "sessions"):
+        rows = api.rows(name)
+        api.set_rows(name, [row[:-1] + ["Extra" if number == 0 else "x"] + row[-1:]
+                            for number, row in enumerate(rows)])
+    clients = api.rows("clients")
+    clients[1][-1] = "prefers mornings"
+    api.set_rows("clients", clients)
+    service = GoogleSheetsService(service=api)
+
+    assert service.get_all_clients()[0]["notes"] == "prefers mornings"
+    service.add_session({"client_name": "Client 00001", "coaching_type": "1:1", "coaching_hours": 1,
+                         "amount_collected": 100, "session_date": "2026-03-01", "notes": "first"})
+    service.session_sheet.expire()
+    assert service.get_all_sessions()[-1]["notes"] == "first"
+    assert api.rows("sessions")[-1][-1] == "first"
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+"""Tests for Idempotency-Key replays on the form POSTs (runs offline on local storage)."""
+
+import os
+import tempfile
+import threading
+import time
+
+from offline_test_config import use_offline_config
+from services.email_pipeline import EmailPipeline
+from services.idempotency import IdempotencyConflict, IdempotencyStore
+
+
+# Local storage and a throwaway email queue: no sheets, no SMTP
+_tmp = tempfile.mkdtemp(prefix="coaching-portal-test-")
+use_offline_config(
+    STORAGE_BACKEND="local",
+    LOCAL_STORAGE_PATH=os.path.join(_tmp, "portal.db"),
+    EMAIL_QUEUE_PATH=os.path.join(_tmp, "emails.db"),
+    GMAIL_SENDER_EMAIL=None
+)
+
+from app import create_app  # noqa: E402  (reads Config)
+
+
+NEW_CLIENT = {
+    "name": "Ann Example",
+    "email": "ann@example.com",
+    "package_type": "Standard",
+    "payment_method": "upfront_deposit",
+    "start_date": "2026-01-01",
+    "end_date": "2026-06-30",
+    "amount_paid": 1000
+}
+
+
+def logged_in_client(app=None):
+    client = (app or create_app()).test_client()
+    with client.session_transaction() as session:
+        session["user_logged_in"] = True
+    return client
+
+
+def test_repeated_key_replays_the_first_response():
+    client = logged_in_client()
+    headers = {"Idempotency-Key": "form-1"}
+
+    first = client.post("/api/clients/new", json=NEW_CLIENT, headers=headers)
+    again = client.post("/api/clients/new", json=NEW_CLIENT, headers=headers)
+    assert first.status_code == again.status_code == 201
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert again.get_json() == first.get_json()
+    assert len(client.get("/api/clients").get_json()["clients"]) == 1
+
+    # Same key, different submission
+    changed = client.post("/api/clients/new", json=dict(NEW_CLIENT, amount_paid=2000), headers=headers)
+    assert changed.status_code == 422
+
+    # Without a key every POST runs: this one is rejected as a duplicate client
+    assert client.post("/api/clients/new", json=NEW_CLIENT).status_code == 500
+
+
+def test_failures_after_the_write_are_replayed():
+    client = logged_in_client()
+    body = dict(NEW_CLIENT, name="Bob Example", email="bob@example.com")
+    headers = {"Idempotency-Key": "form-2"}
+
+    def broken_submit(*args, **kwargs):
+        raise RuntimeError("email queue is read-only")
+
+    # The client row is written before the email fails: the retry must not write it again
+    submit = EmailPipeline.submit
+    EmailPipeline.submit = broken_submit
+    try:
+        first = client.post("/api/clients/new", json=body, headers=headers)
+        again = client.post("/api/clients/new", json=body, headers=headers)
+    finally:
+        EmailPipeline.submit = submit
+    assert first.status_code == again.status_code == 500
+    assert again.headers["Idempotent-Replayed"] == "true"
+    clients = client.get("/api/clients").get_json()["clients"]
+    assert [c["name"] for c in clients].count("Bob Example") == 1
+
+    # Rejected before anything was written: the same key runs again
+    headers = {"Idempotency-Key": "form-3"}
+    assert client.post("/api/clients/new", json=body, headers=headers).status_code == 500
+    assert "Idempotent-Replayed" not in client.post("/api/clients/new", json=body, headers=headers).headers
+
+
+def test_concurrent_repeats_wait_for_the_first_run():
+    store = IdempotencyStore()
+    runs = []
+
+    def slow():
+        runs.append(1)
+        time.sleep(0.2)
+        return "created"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(store.run("k", "body", slow))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(runs) == 1
+    assert sorted(results) == [("created", False)] + [("created", True)] * 4
+
+
+def test_failures_are_not_replayed_and_entries_expire():
+    store = IdempotencyStore(max_entries=2, ttl=0.1)
+
+    assert store.run("k", "body", lambda: 500, keep=lambda status: status < 500) == (500, False)
+    assert store.run("k", "body", lambda: 201, keep=lambda status: status < 500) == (201, False)
+    assert store.run("k", "body", lambda: 999) == (201, True)
+    try:
+        store.run("k", "other body", lambda: 201)
+        assert False, "expected IdempotencyConflict"
+    except IdempotencyConflict:
+        pass
+
+    # Least recently used keys go first
+    store.run("a", "body", lambda: 1)
+    store.run("b", "body", lambda: 2)
+    assert len(store) == 2
+    assert store.run("k", "body", lambda: 3) == (3, False)
+
+    time.sleep(0.15)
+    assert store.run("a", "body", lambda: 4) == (4, False)
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
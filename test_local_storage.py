@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+"""Tests for the local SQLite storage backend (runs offline, no live sheet)."""
+
+import os
+import tempfile
+from datetime import datetime
+
+from services.local_storage_service import LocalStorageService
+from services.storage_backend import StorageBackend
+
+
+def make_storage():
+    return LocalStorageService(os.path.join(tempfile.mkdtemp(prefix="coaching-portal-test-"), "portal.db"))
+
+
+def add_client(storage, name, email, payment_method="upfront_deposit", amount_paid=1000):
+    return storage.add_new_client({
+        "name": name,
+        "email": email,
+        "package_type": "Standard",
+        "payment_method": payment_method,
+        "start_date": "2026-01-01",
+        "end_date": "2026-06-01",
+        "amount_paid": amount_paid
+    })
+
+
+def add_session(storage, name, amount, date="2026-02-01"):
+    return storage.add_session({
+        "client_name": name,
+        "coaching_type": "1:1",
+        "coaching_hours": 1.5,
+        "amount_collected": amount,
+        "session_date": date
+    })
+
+
+def test_implements_storage_backend():
+    assert isinstance(make_storage(), StorageBackend)
+
+
+def test_clients_get_numbers_and_row_numbers():
+    storage = make_storage()
+    year = datetime.utcnow().year
+
+    assert add_client(storage, "Alice", "alice@example.com") == "Clients!A2:N2"
+    assert add_client(storage, "Bob", "bob@example.com") == "Clients!A3:N3"
+
+    clients = storage.get_all_clients()
+    assert [c["name"] for c in clients] == ["Alice", "Bob"]
+    assert [c["row_number"] for c in clients] == [2, 3]
+    assert [c["contract_number"] for c in clients] == [f"CT-{year}-001", f"CT-{year}-002"]
+    assert [c["invoice_number"] for c in clients] == ["INV-5001", "INV-5002"]
+
+    assert storage.get_client_by_name("BOB")["row_number"] == 3
+    assert storage.check_duplicate_client("Someone", "ALICE@example.com")["name"] == "Alice"
+    assert storage.check_duplicate_client("Someone", "new@example.com") is None
+
+
+def test_sessions_track_balance():
+    storage = make_storage()
+    add_client(storage, "Alice", "alice@example.com")
+    add_client(storage, "Payg", "payg@example.com", payment_method="pay_per_session", amount_paid=0)
+
+    add_session(storage, "Alice", 200, "2026-02-01")
+    add_session(storage, "alice", 300, "2026-03-01")
+    add_session(storage, "Payg", 100)
+
+    history = storage.get_client_history("Alice")
+    assert [s["invoice_number"] for s in history] == ["INV-001", "INV-002"]
+    assert [s["row_number"] for s in history] == [2, 3]
+
+    balance = storage.get_client_balance("Alice")
+    assert balance["total_collected"] == 500.0
+    assert balance["remaining_balance"] == 500.0
+    assert balance["session_count"] == 2
+    assert balance["hours_used"] == 3.0
+    assert balance["last_session_date"] == "2026-03-01"
+
+    assert storage.get_client_balance("Payg")["remaining_balance"] == 0
+    assert storage.get_client_balance("Nobody") is None
+
+
+def test_update_and_delete_rows():
+    storage = make_storage()
+    for name in ("Alice", "Bob", "Carol", "Dave"):
+        add_client(storage, name, f"{name.lower()}@example.com")
+
+    assert storage.update_client_end_date("carol", "2027-01-01")
+    assert storage.get_client_by_name("Carol")["end_date"] == "2027-01-01"
+    assert not storage.update_client_end_date("Nobody", "2027-01-01")
+    assert storage.update_client_fields("Dave", {"email": "DAVE@new.example.com", "notes": "moved"})
+    assert storage.check_duplicate_client("", "dave@new.example.com")["notes"] == "moved"
+
+    # Rows 3-4 are Bob and Carol; Dave moves up to row 3 like in the sheet
+    assert storage.delete_rows(3, 4)
+    clients = storage.get_all_clients()
+    assert [(c["name"], c["row_number"]) for c in clients] == [("Alice", 2), ("Dave", 3)]
+    assert storage.get_client_by_name("Dave")["row_number"] == 3
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,39 @@
+#!/usr/bin/env python
+"""Tests for block allocation of contract and invoice numbers (runs offline)."""
+
+import tempfile
+
+from services.number_allocator import NumberAllocator
+
+
+def test_other_workers_blocks_are_not_collisions():
+    state_dir = tempfile.mkdtemp(prefix="coaching-portal-test-")
+    worker_a = NumberAllocator(block_size=10, state_dir=state_dir)
+    worker_b = NumberAllocator(block_size=10, state_dir=state_dir)
+
+    assert worker_a.allocate("INV") == 1
+    assert worker_b.allocate("INV") == 11
+    # A re-reads the sheet and sees B's invoice: its own block is still good
+    worker_a.seed("INV", 11)
+    assert worker_a.allocate("INV") == 2
+
+    # A number written past every reserved block is an external collision
+    worker_a.seed("INV", 25)
+    assert worker_a.allocate("INV") == 26
+
+
+def test_per_process_blocks_skip_numbers_seen_in_the_sheet():
+    allocator = NumberAllocator(block_size=10)
+
+    assert allocator.allocate("INV") == 1
+    allocator.seed("INV", 4)
+    assert allocator.allocate("INV") == 5
+    allocator.seed("INV", 30)
+    assert allocator.allocate("INV") == 31
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""Tests for the Sheets API quota scheduler (runs offline, no live sheet)."""
+
+import threading
+import time
+
+import httplib2
+from googleapiclient.errors import HttpError
+
+from services.fake_sheets_service import FakeSheetsAPI
+from services.quota_scheduler import QuotaScheduler, TokenBucket
+
+
+def make_request(api):
+    api.set_rows("sheet", [["A"]])
+    return api.spreadsheets().values().get(spreadsheetId="sheet", range="A:A")
+
+
+def test_bucket_queues_instead_of_failing():
+    """Past the burst, callers wait for tokens at the configured rate."""
+    bucket = TokenBucket("read", rate_per_minute=600, burst=2)
+    started = time.monotonic()
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    # Two from the burst, then one every 0.1s
+    assert time.monotonic() - started >= 0.25
+    assert bucket.acquired == 5
+    assert bucket.waiting == 0
+
+
+def test_throttled_requests_are_retried():
+    """429s are retried with backoff until the request succeeds."""
+    api = FakeSheetsAPI(quota_error_rate=0.5, seed=3)
+    request = make_request(api)
+    scheduler = QuotaScheduler(reads_per_minute=0, writes_per_minute=0, max_retries=20,
+                               base_backoff=0.001, max_backoff=0.01)
+
+    for _ in range(10):
+        assert scheduler.execute(request)["values"] == [["A"]]
+
+    stats = scheduler.stats()
+    assert stats["throttled"] > 0
+    assert stats["retries"] == stats["throttled"]
+    assert stats["buckets"]["read"]["requests"] == 10 + stats["retries"]
+    assert stats["buckets"]["write"]["requests"] == 0
+
+
+def test_gives_up_after_max_retries():
+    api = FakeSheetsAPI(quota_error_rate=1.0)
+    request = make_request(api)
+    scheduler = QuotaScheduler(reads_per_minute=0, writes_per_minute=0, max_retries=2,
+                               base_backoff=0.001, max_backoff=0.01)
+
+    try:
+        scheduler.execute(request)
+    except HttpError as e:
+        assert e.resp.status == 429
+    else:
+        raise AssertionError("request succeeded despite a permanent 429")
+    assert api.counts["values.get"] == 3
+
+
+
+class FailingRequest:
+    """Fails with the given statuses in turn, then succeeds."""
+
+    def __init__(self, *statuses):
+        self.statuses = list(statuses)
+        self.calls = 0
+
+    def execute(self):
+        self.calls += 1
+        if self.statuses:
+            raise HttpError(httplib2.Response({"status": self.statuses.pop(0)}), b"")
+        return {}
+
+
+def test_only_throttles_retry_non_idempotent_requests():
+    scheduler = QuotaScheduler(reads_per_minute=0, writes_per_minute=0, max_retries=3,
+                               base_backoff=0.001, max_backoff=0.01)
+
+    # A 503 may have been applied: an append is not sent again
+    append = FailingRequest(503)
+    try:
+        scheduler.execute(append, write=True, idempotent=False)
+        raise AssertionError("append retried after a 503")
+    except HttpError as e:
+        assert e.resp.status == 503
+    assert append.calls == 1
+
+    append = FailingRequest(429, 429)
+    assert scheduler.execute(append, write=True, idempotent=False) == {}
+    assert append.calls == 3
+
+    read = FailingRequest(503)
+    assert scheduler.execute(read) == {}
+    assert read.calls == 2
+
+    # 500s are not treated as transient
+    read = FailingRequest(500)
+    try:
+        scheduler.execute(read)
+        raise AssertionError("request retried after a 500")
+    except HttpError as e:
+        assert e.resp.status == 500
+    assert read.calls == 1
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+"""Tests for header-driven row decoding (runs offline, no live sheet)."""
+
+from services.fake_sheets_service import CLIENT_HEADERS, SESSION_HEADERS
+from services.sheet_schema import CLIENT_SCHEMA, SESSION_SCHEMA, column_index, column_letter
+
+
+def test_current_headers_use_default_layout():
+    decoder = CLIENT_SCHEMA.decoder(CLIENT_HEADERS)
+    assert decoder.positions == CLIENT_SCHEMA.default.positions
+    assert CLIENT_SCHEMA.decoder(list(CLIENT_HEADERS)) is decoder
+
+    row = ["CL-1", "Ann", "", "", "ann@example.com", "Standard", "2026-01-01", "2026-06-01", "1000"]
+    assert decoder.decode(row, 2) == {
+        "client_id": "CL-1", "name": "Ann", "address": "", "contact": "", "email": "ann@example.com",
+        "package_type": "Standard", "start_date": "2026-01-01", "end_date": "2026-06-01",
+        "amount_paid": 1000.0, "payment_method": "upfront_deposit", "contract_number": "",
+        "invoice_number": "", "created_at": "", "notes": "", "row_number": 2
+    }
+    assert decoder.decode(["", "No ID"], 3) is None
+    assert decoder.decode([], 4) is None
+
+
+def test_reordered_header_maps_by_label():
+    # The layout written by fix_sheet_structure.py: no address, contact or payment method
+    header = ["Name", "Email", "Package Type", "Start Date", "End Date", "Amount Paid",
+              "Contract Number", "Invoice Number", "Client ID", "Created At", "Notes"]
+    decoder = CLIENT_SCHEMA.decoder(header)
+
+    client = decoder.decode(["Ann", "ann@example.com", "Standard", "", "", "", "CT-2026-001", "INV-5001", "CL-1"], 2)
+    assert client["client_id"] == "CL-1"
+    assert client["amount_paid"] == 0.0
+    assert client["payment_method"] == "upfront_deposit"
+    assert client["invoice_number"] == "INV-5001"
+    assert client["address"] == ""
+    assert decoder.cell(["Ann"] * 9, "client_id") == "Ann"
+    assert decoder.cell(["Ann"], "client_id") == ""
+
+
+def test_unrecognised_header_falls_back_to_default_layout():
+    assert SESSION_SCHEMA.decoder(["Who", "What"]) is SESSION_SCHEMA.default
+    assert SESSION_SCHEMA.decoder([]) is SESSION_SCHEMA.default
+
+    decoder = SESSION_SCHEMA.decoder(SESSION_HEADERS)
+    session = decoder.decode(["CL-1", "Ann", "1:1", "1.5", "1000", "200"], 5)
+    assert session["coaching_hours"] == 1.5
+    assert session["amount_collected"] == 200.0
+    assert session["session_date"] == ""
+    assert session["row_number"] == 5
+
+    try:
+        decoder.decode(["CL-1", "Ann", "1:1", "n/a"], 6)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_column_letters_round_trip():
+    assert [column_letter(i) for i in (0, 13, 25, 26, 51)] == ["A", "N", "Z", "AA", "AZ"]
+    assert all(column_index(column_letter(i)) == i for i in range(200))
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python
+"""Concurrency test for the Google Sheets cache layer (runs offline, no live sheet)."""
+
+import threading
+import time
+
+from config import Config
+from offline_test_config import use_offline_config
+from services.fake_sheets_service import FakeSheetsAPI
+from services.google_sheets_service import GoogleSheetsService
+from services.sheets_cache import ReadWriteLock, SingleFlight
+
+
+use_offline_config()
+
+
+def make_service(clients, latency=0.3):
+    """GoogleSheetsService on a slow in-process fake holding synthetic clients."""
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=clients, sessions=0, latency=latency)
+    return GoogleSheetsService(service=api), api
+
+
+def run_threads(count, target):
+    """Start count threads on target at the same moment and wait for them all."""
+    barrier = threading.Barrier(count)
+    results = []
+    errors = []
+
+    def worker():
+        barrier.wait()
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results, errors
+
+
+def test_concurrent_cold_reads_share_one_fetch():
+    """Twenty threads missing the cache at once trigger a single batchGet."""
+    service, api = make_service(5)
+
+    results, errors = run_threads(20, service.get_all_clients)
+
+    assert not errors, errors
+    assert len(results) == 20
+    assert all(len(clients) == 5 for clients in results)
+    assert api.counts["values.batchGet"] == 1
+
+
+def test_concurrent_lookups_during_refresh():
+    """Lookups racing a forced refresh always see a complete index."""
+    service, api = make_service(50, latency=0.05)
+    service.get_all_clients()
+    service.client_sheet.expire()
+    stale_ttl = Config.CLIENT_CACHE_STALE_TTL
+    Config.CLIENT_CACHE_STALE_TTL = 0  # force synchronous refreshes
+    try:
+        results, errors = run_threads(
+            20, lambda: service.get_client_by_name(f"Client {threading.get_ident() % 50 + 1:05d}")
+        )
+    finally:
+        Config.CLIENT_CACHE_STALE_TTL = stale_ttl
+
+    assert not errors, errors
+    assert all(client is not None for client in results)
+    assert api.counts["values.batchGet"] == 2
+
+
+def test_burst_of_sessions_shares_one_append():
+    """Sessions submitted together go out as one append with correct running balances."""
+    service, api = make_service(3, latency=0.05)
+    client = next(c for c in service.get_all_clients() if c["payment_method"] == "upfront_deposit")
+    service.refresh_caches()
+    # A wide window so a slow thread start cannot split the burst
+    service.session_appends.window = 0.5
+    api.reset_stats()
+
+    results, errors = run_threads(10, lambda: service.add_session({
+        "client_name": client["name"],
+        "coaching_type": "1:1",
+        "coaching_hours": 1,
+        "amount_collected": 10,
+        "session_date": "2026-03-01"
+    }))
+
+    assert not errors, errors
+    assert sorted(results) == sorted(f"Sheet1!A{row}:M{row}" for row in range(2, 12))
+    assert api.counts["values.append"] == 1
+
+    rows = api.rows("sessions")[1:]
+    balances = sorted(float(row[6]) for row in rows)
+    assert balances == [client["amount_paid"] - 10 * n for n in range(10, 0, -1)]
+    assert service.get_session_totals(client["name"])["total_collected"] == 100.0
+
+
+def test_projected_reads_fetch_only_needed_columns():
+    """A projection reads just its columns, reuses them, and matches the full read."""
+    service, api = make_service(5, latency=0)
+
+    dropdown = service.get_client_columns(["name", "email", "package_type"])
+    assert api.calls[-1] == ("values.batchGet", "clients", ("A:B", "E:F"))
+    assert set(dropdown[0]) == {"client_id", "name", "email", "package_type", "row_number"}
+
+    # The name column is already cached: only column H is read
+    service.get_client_columns(["name", "end_date"])
+    assert api.calls[-1] == ("values.batchGet", "clients", ("H:H",))
+
+    clients = service.get_all_clients()
+    assert api.calls[-1] == ("values.batchGet", "clients", ("A:ZZ",))
+    assert "notes" in clients[0]
+    assert dropdown == [
+        {key: c[key] for key in ("client_id", "name", "email", "package_type", "row_number")}
+        for c in clients
+    ]
+
+    # A fresh full cache answers projections without another call
+    api.reset_stats()
+    service.get_client_columns(["invoice_number"])
+    assert not api.calls
+
+    try:
+        service.get_client_columns(["password"])
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_projection_notices_moved_columns():
+    """Columns moved under the default layout are caught by their header cells."""
+    service, api = make_service(0, latency=0)
+    api.set_rows("clients", [
+        ["Name", "Email", "Client ID", "Amount Paid"],
+        ["Ann", "ann@example.com", "CL-1", "1000"]
+    ])
+
+    clients = service.get_client_columns(["name", "amount_paid"])
+    assert clients == [{"client_id": "CL-1", "name": "Ann", "amount_paid": 1000.0, "row_number": 2}]
+    assert api.calls[-1] == ("values.batchGet", "clients", ("A:ZZ",))
+
+    # Later projections use the layout found in the header
+    service._invalidate_client_cache()
+    assert service.get_client_columns(["email"])[0]["email"] == "ann@example.com"
+    assert api.calls[-1] == ("values.batchGet", "clients", ("B:C",))
+
+
+def test_allocation_uses_the_load_seeds():
+    """Numbers are seeded when the clients load, so allocating reads nothing."""
+    service, api = make_service(5, latency=0)
+    service.get_all_clients()
+
+    api.reset_stats()
+    contracts = [service.get_max_contract_number() for _ in range(2)]
+    invoices = [service.get_max_invoice_number() for _ in range(2)]
+    assert not api.calls
+    assert contracts[1] > contracts[0] > max(c["contract_number"] for c in service.get_all_clients())
+    assert invoices[1] > invoices[0] > max(c["invoice_number"] for c in service.get_all_clients())
+
+
+def test_patched_clients_are_copies():
+    """A field update swaps in a new record; records already handed out do not change."""
+    service, api = make_service(5, latency=0)
+    before = service.get_client_by_name("Client 00002")
+
+    assert service.update_client_fields("Client 00002", {"notes": "renewed"})
+    assert before["notes"] == ""
+    after = service.get_client_by_name("Client 00002")
+    assert after["notes"] == "renewed"
+    assert service.check_duplicate_client("", before["email"]) is after
+    assert after in service.get_all_clients() and before not in service.get_all_clients()
+
+
+def test_single_flight_shares_errors():
+    """Callers waiting on a failed flight receive the same exception."""
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        raise ValueError("backend down")
+
+    leader = threading.Thread(target=lambda: _swallow(flight.do, "clients", failing))
+    leader.start()
+    started.wait()
+    _, errors = run_threads(5, lambda: flight.do("clients", failing))
+    leader.join()
+
+    assert len(calls) == 1
+    assert len(errors) == 5
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_read_write_lock_excludes_writers():
+    """Readers run together; a writer waits for them and blocks new readers."""
+    lock = ReadWriteLock()
+    events = []
+
+    def reader(name):
+        with lock.read_locked():
+            events.append(f"{name}-in")
+            time.sleep(0.1)
+            events.append(f"{name}-out")
+
+    def writer():
+        with lock.write_locked():
+            events.append("writer-in")
+            # Re-entrant: the writer may also read
+            with lock.read_locked():
+                pass
+            events.append("writer-out")
+
+    readers = [threading.Thread(target=reader, args=(f"r{i}",)) for i in range(3)]
+    for thread in readers:
+        thread.start()
+    time.sleep(0.02)
+    write_thread = threading.Thread(target=writer)
+    write_thread.start()
+    for thread in readers + [write_thread]:
+        thread.join(timeout=5)
+
+    writer_in = events.index("writer-in")
+    assert all(events.index(f"r{i}-out") < writer_in for i in range(3))
+    assert events[writer_in + 1] == "writer-out"
+
+    with lock.read_locked():
+        try:
+            lock.acquire_write()
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("read lock was upgraded to a write lock")
+
+
+def _swallow(fn, *args):
+    try:
+        fn(*args)
+    except Exception:
+        pass
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+"""Round trips through the cache snapshots and the SQLite replica (runs offline)."""
+
+import os
+import tempfile
+import threading
+import time
+
+from config import Config
+from offline_test_config import use_offline_config
+from services.fake_sheets_service import FakeSheetsAPI
+from services.google_sheets_service import GoogleSheetsService
+from services.sqlite_replica import SheetReplica
+
+
+use_offline_config()
+
+
+NEW_CLIENT = {
+    "name": "Ann Example",
+    "email": "ann@example.com",
+    "package_type": "Standard",
+    "start_date": "2026-01-01",
+    "end_date": "2026-06-30",
+    "amount_paid": 1000
+}
+
+
+def test_snapshots_restore_a_cold_start():
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=5, sessions=20, latency=0.3)
+    Config.CACHE_SNAPSHOT_DIR = tempfile.mkdtemp(prefix="coaching-portal-test-")
+    try:
+        first = GoogleSheetsService(service=api)
+        clients = first.get_all_clients()
+        sessions = first.get_all_sessions()
+
+        # A new process answers from disk before the (slow) sheet has replied
+        started = time.monotonic()
+        second = GoogleSheetsService(service=api)
+        assert second.get_all_clients() == clients
+        assert second.get_client_by_name(clients[0]["name"]) == clients[0]
+        assert second.client_sheet.restored
+        assert time.monotonic() - started < 0.25
+        assert second.get_all_sessions() == sessions
+    finally:
+        Config.CACHE_SNAPSHOT_DIR = ""
+
+
+def test_restored_snapshots_seed_the_number_allocators():
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=5, sessions=20)
+    Config.CACHE_SNAPSHOT_DIR = tempfile.mkdtemp(prefix="coaching-portal-test-")
+    try:
+        first = GoogleSheetsService(service=api)
+        first.get_all_clients()
+        existing = {session["invoice_number"] for session in first.get_all_sessions()}
+
+        # A new process with no shared number state knows only the snapshot
+        Config.NUMBER_STATE_DIR = tempfile.mkdtemp(prefix="coaching-portal-test-")
+        second = GoogleSheetsService(service=api)
+        assert second.session_sheet.restored
+        invoice = second.get_max_session_invoice_number()
+        assert invoice not in existing
+        assert int(invoice.split("-")[1]) > max(int(number.split("-")[1]) for number in existing)
+        assert second.get_max_contract_number() not in {c["contract_number"] for c in second.get_all_clients()}
+    finally:
+        Config.CACHE_SNAPSHOT_DIR = ""
+
+
+def test_replica_mirrors_loads_and_writes():
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=5, sessions=20)
+    expected = GoogleSheetsService(service=api)
+    path = os.path.join(tempfile.mkdtemp(prefix="coaching-portal-test-"), "replica.db")
+    Config.SHEETS_REPLICA_PATH = path
+    sheets = GoogleSheetsService(service=api)
+    Config.SHEETS_REPLICA_PATH = ""
+    try:
+        name = expected.get_all_clients()[0]["name"]
+        assert sheets.get_all_clients() == expected.get_all_clients()
+        assert sheets.get_client_by_name(name) == expected.get_client_by_name(name)
+        assert sheets.get_client_history(name) == expected.get_client_history(name)
+        assert sheets.get_session_totals(name) == expected.get_session_totals(name)
+
+        # Write-through reaches the file other workers read
+        sheets.add_new_client(NEW_CLIENT)
+        added = SheetReplica(path).client_by_name("ann example")
+        assert added["email"] == "ann@example.com"
+        assert added["row_number"] == len(api.rows("clients"))
+        assert sheets.check_duplicate_client("", "ANN@example.com") == added
+
+        # Duplicate checks read the shared file, so a client another worker
+        # just added is caught before this worker's cache sees it
+        other = dict(added, client_id="CL-OTHER", email="bob@example.com", row_number=added["row_number"] + 1)
+        SheetReplica(path).upsert_clients([other])
+        assert sheets.check_duplicate_client("", "bob@example.com")["client_id"] == "CL-OTHER"
+    finally:
+        sheets._replica_stop.set()
+
+
+def test_write_throughs_mirror_only_the_changed_rows():
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=5, sessions=20)
+    Config.SHEETS_REPLICA_PATH = os.path.join(tempfile.mkdtemp(prefix="coaching-portal-test-"), "replica.db")
+    sheets = GoogleSheetsService(service=api)
+    Config.SHEETS_REPLICA_PATH = ""
+    sheets.get_all_clients()
+    # Let the sync loop finish its first pass so it cannot copy the sheets again
+    sheets._replica_stop.set()
+    for thread in threading.enumerate():
+        if thread.name == "sheets-replica-sync":
+            thread.join(timeout=5)
+
+    replaced = []
+    sheets.replica.replace_clients = lambda clients: replaced.append("clients")
+    sheets.replica.replace_sessions = lambda sessions: replaced.append("sessions")
+
+    client = sheets.get_all_clients()[1]
+    sheets.add_new_client(NEW_CLIENT)
+    sheets.add_session({"client_name": "Ann Example", "coaching_type": "1:1", "coaching_hours": 1,
+                        "amount_collected": 50, "session_date": "2026-03-01"})
+    sheets.update_client_fields(client["name"], {"notes": "renewed"})
+    sheets.delete_rows(2, 2)
+    assert replaced == []
+
+    # The replica now matches a fresh read of the sheet
+    fresh = GoogleSheetsService(service=api)
+    assert sheets.replica.all_clients() == fresh.get_all_clients()
+    assert sheets.replica.client_by_name(client["name"])["notes"] == "renewed"
+    assert sheets.replica.sessions_for_client("Ann Example") == fresh.get_client_history("Ann Example")
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
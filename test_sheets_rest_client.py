@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""Tests for the pooled Sheets REST client (runs offline against a stub transport)."""
+
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import requests
+from googleapiclient.errors import HttpError
+from requests.adapters import HTTPAdapter
+
+from services.sheets_rest_client import SheetsRestClient
+
+
+class StubCredentials:
+    """Service-account stand-in that counts token refreshes."""
+
+    def __init__(self):
+        self.token = None
+        self.valid = False
+        self.refreshes = 0
+
+    def refresh(self, request):
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes}"
+        self.valid = True
+
+
+class StubAdapter(HTTPAdapter):
+    """Records outgoing requests and answers them from ``handler``."""
+
+    def __init__(self, handler):
+        super().__init__()
+        self.handler = handler
+        self.sent = []
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.sent.append(request)
+        status, payload = self.handler(request)
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK" if status < 400 else "Error"
+        response.url = request.url
+        response.request = request
+        response.headers["Content-Type"] = "application/json"
+        response._content = json.dumps(payload).encode()
+        return response
+
+
+def make_client(handler):
+    credentials = StubCredentials()
+    client = SheetsRestClient(credentials)
+    adapter = StubAdapter(handler)
+    client.session.mount("https://", adapter)
+    return client, credentials, adapter
+
+
+def test_endpoints_map_to_rest_urls():
+    client, _, adapter = make_client(lambda request: (200, {"ok": True}))
+    values = client.spreadsheets().values()
+
+    values.get(spreadsheetId="abc", range="Clients!A:N").execute()
+    values.batchGet(spreadsheetId="abc", ranges=["Clients!A:N", "Sessions!A:N"]).execute()
+    values.append(spreadsheetId="abc", range="Clients!A:N", valueInputOption="USER_ENTERED",
+                  insertDataOption="INSERT_ROWS", body={"values": [["x"]]}).execute()
+    values.update(spreadsheetId="abc", range="Clients!F2", valueInputOption="USER_ENTERED",
+                  body={"values": [["2027-01-01"]]}).execute()
+    client.spreadsheets().batchUpdate(spreadsheetId="abc", body={"requests": []}).execute()
+
+    sent = [(r.method, urlsplit(r.url).path, parse_qs(urlsplit(r.url).query)) for r in adapter.sent]
+    assert sent[0] == ("GET", "/v4/spreadsheets/abc/values/Clients%21A%3AN", {})
+    assert sent[1] == ("GET", "/v4/spreadsheets/abc/values:batchGet", {"ranges": ["Clients!A:N", "Sessions!A:N"]})
+    assert sent[2][:2] == ("POST", "/v4/spreadsheets/abc/values/Clients%21A%3AN:append")
+    assert sent[2][2] == {"valueInputOption": ["USER_ENTERED"], "insertDataOption": ["INSERT_ROWS"]}
+    assert json.loads(adapter.sent[2].body) == {"values": [["x"]]}
+    assert sent[3][:2] == ("PUT", "/v4/spreadsheets/abc/values/Clients%21F2")
+    assert sent[4][:2] == ("POST", "/v4/spreadsheets/abc:batchUpdate")
+    assert all(r.headers["Authorization"] == "Bearer token-1" for r in adapter.sent)
+
+
+def test_token_is_cached_across_threads():
+    client, credentials, adapter = make_client(lambda request: (200, {"values": []}))
+
+    def read(_):
+        return client.spreadsheets().values().get(spreadsheetId="abc", range="A1").execute()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(read, range(40)))
+
+    assert results == [{"values": []}] * 40
+    assert len(adapter.sent) == 40
+    assert credentials.refreshes == 1
+
+
+def test_errors_raise_http_error_and_401_refreshes_once():
+    def handler(request):
+        if request.headers["Authorization"] == "Bearer token-1":
+            return 401, {"error": {"code": 401, "message": "expired"}}
+        return 429, {"error": {"code": 429, "message": "Quota exceeded"}}
+
+    client, credentials, _ = make_client(handler)
+    try:
+        client.spreadsheets().values().get(spreadsheetId="abc", range="A1").execute()
+        assert False, "expected HttpError"
+    except HttpError as e:
+        assert e.resp.status == 429
+        assert "Quota exceeded" in str(e)
+    assert credentials.refreshes == 2
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")
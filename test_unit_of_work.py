@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+"""Sheets call counts for one form submission through the unit of work (runs offline)."""
+
+import os
+import tempfile
+
+from models import ExistingClientFormData
+from offline_test_config import use_offline_config
+from services.ai_service import AIService
+from services.client_service import ClientService
+from services.email_pipeline import EmailPipeline
+from services.email_queue import EmailJobStore
+from services.fake_sheets_service import FakeSheetsAPI
+from services.google_sheets_service import GoogleSheetsService
+from services.unit_of_work import UnitOfWork
+
+
+use_offline_config()
+
+
+class NoEmail:
+    def is_configured(self):
+        return False
+
+
+def make_client_service():
+    api = FakeSheetsAPI.with_synthetic_data("clients", "sessions", clients=5, sessions=20)
+    sheets = GoogleSheetsService(service=api)
+    store = EmailJobStore(os.path.join(tempfile.mkdtemp(prefix="coaching-portal-test-"), "emails.db"))
+    pipeline = EmailPipeline(NoEmail(), store, workers=1)
+    return ClientService(sheets, NoEmail(), AIService(), email_pipeline=pipeline), sheets, api
+
+
+def session_form(client, **fields):
+    return ExistingClientFormData(**dict({
+        "client_name": client["name"],
+        "coaching_type": "1:1",
+        "coaching_hours": 1,
+        "participant_count": 1,
+        "amount_collected": 50,
+        "session_date": "2026-03-01"
+    }, **fields))
+
+
+def test_session_with_end_date_costs_one_read_per_sheet_and_one_write_per_sheet():
+    service, sheets, api = make_client_service()
+    client = sheets.get_all_clients()[0]
+    sheets.client_sheet.expire()
+    sheets.session_sheet.expire()
+    api.reset_stats()
+
+    with UnitOfWork(sheets) as uow:
+        result = service.process_existing_client_session(session_form(client, new_end_date="2027-01-31"), uow)
+
+    assert "sheets_calls" not in result
+    assert uow.calls == {"reads": 2, "writes": 2}
+    assert sorted(method for method, _, _ in api.calls) == [
+        "values.append", "values.batchGet", "values.batchGet", "values.batchUpdate"
+    ]
+    # The end date is written before the session row
+    writes = [method for method, _, _ in api.calls if method != "values.batchGet"]
+    assert writes == ["values.batchUpdate", "values.append"]
+    assert ("values.batchUpdate", "clients", (f"H{client['row_number']}",)) in api.calls
+    assert sheets.get_client_by_name(client["name"])["end_date"] == "2027-01-31"
+
+    # Warm caches: only the writes remain
+    api.reset_stats()
+    with UnitOfWork(sheets) as uow:
+        service.process_existing_client_session(session_form(client), uow)
+    assert uow.calls == {"writes": 1}
+    assert [method for method, _, _ in api.calls] == ["values.append"]
+    service.email_pipeline.shutdown()
+
+
+def test_uncommitted_work_writes_nothing():
+    service, sheets, api = make_client_service()
+    client = sheets.get_all_clients()[0]
+    api.reset_stats()
+
+    try:
+        service.process_existing_client_session(session_form(client, client_name="Nobody"))
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert [method for method, _, _ in api.calls] == ["values.batchGet"]  # the cold Sessions sheet
+    api.reset_stats()
+
+    with UnitOfWork(sheets) as uow:
+        assert uow.get_client_by_name(client["name"]) is uow.get_client_by_name(client["name"].upper())
+        uow.update_client(client["name"], end_date="2030-01-01")
+        uow.update_client(client["name"], notes="renewed")
+    assert not uow.calls and not api.calls
+    service.email_pipeline.shutdown()
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith("test_") and callable(test):
+            test()
+            print(f"✅ {name}")